@@ -0,0 +1,20 @@
+"""
+ASGI config for bangazon project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bangazon.settings')
+
+application = get_asgi_application()
+
+from bangazonapi import autocomplete  # noqa: E402
+
+autocomplete.preload()
@@ -11,6 +11,9 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
+import tempfile
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -56,17 +59,25 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    "bangazonapi.middleware.RequestTimingMiddleware",
+    "bangazonapi.middleware.SlowQueryLogMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "bangazonapi.middleware.ProfilingMiddleware",
+    "bangazonapi.middleware.CurrentCustomerMiddleware",
+    "bangazonapi.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 CORS_ORIGIN_WHITELIST = ("http://localhost:3000", "http://127.0.0.1:3000")
+# Clients echo the read-your-writes pin from bangazonapi/dbrouters.py
+CORS_ALLOW_HEADERS = (*default_headers, "x-bangazon-primary")
+CORS_EXPOSE_HEADERS = ("X-Bangazon-Primary",)
 
 ROOT_URLCONF = "bangazon.urls"
 
@@ -86,6 +97,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "bangazon.wsgi.application"
+ASGI_APPLICATION = "bangazon.asgi.application"
 
 
 # Database
@@ -99,6 +111,30 @@ DATABASES = {
 }
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
+# Read replicas for GET, HEAD and OPTIONS requests. Set BANGAZON_REPLICA_DBS
+# to a comma-separated list of SQLite files; `manage.py sync_replicas`
+# copies the primary into them.
+DATABASE_REPLICAS = []
+for index, replica_name in enumerate(
+    filter(None, os.environ.get("BANGAZON_REPLICA_DBS", "").split(",")), start=1
+):
+    DATABASES[f"replica{index}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": replica_name,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{index}")
+
+DATABASE_ROUTERS = ["bangazonapi.dbrouters.ReplicaRouter"]
+
+# How long a customer reads from the primary after writing. The pin is a
+# signed cookie and response header, so it holds across workers.
+REPLICA_STICKY_SECONDS = 10
+
+# Soft-deleted products and payment types older than this are moved to
+# archive tables by `manage.py archive_deleted`
+SOFT_DELETE_RETENTION_DAYS = 90
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -131,3 +167,138 @@ APPEND_SLASH = False
 
 MEDIA_ROOT = "media"
 MEDIA_URL = "/media/"
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+
+TESTING = sys.argv[1:2] == ["test"]
+
+# Adds a Server-Timing header with app, db and serialize durations
+SERVER_TIMING_HEADER = True
+
+# Request metrics served from /metrics. Every worker process on the host
+# writes its counters into METRICS_DIR, which the endpoint merges.
+METRICS_ENABLED = True
+METRICS_DIR = os.environ.get(
+    "BANGAZON_METRICS_DIR", os.path.join(tempfile.gettempdir(), "bangazon-metrics")
+)
+METRICS_FLUSH_INTERVAL = 5
+
+# Queries slower than this are logged with their EXPLAIN QUERY PLAN to a
+# rotating file that staff can browse at /slowqueries
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_LOG = os.environ.get(
+    "BANGAZON_SLOW_QUERY_LOG", os.path.join(tempfile.gettempdir(), "bangazon-slow-queries.log")
+)
+SLOW_QUERY_LOG_BACKUPS = 5
+
+# Products, Stores and Orders list views build their JSON from values()
+# rows instead of instantiating serializers for every object. The output
+# is identical, set this to False to compare against the serializers.
+FAST_READ_SERIALIZERS = True
+
+# Users, Products and Orders lists stream a JSON array with ?stream=true,
+# reading this many rows from the database at a time. Set the encoder to
+# "orjson" to encode rows faster once orjson is installed.
+STREAMING_CHUNK_SIZE = 500
+STREAMING_JSON_ENCODER = "json"
+
+# Profile.list, Stores.retrieve and Products.retrieve render their nested
+# serializers concurrently on a pool of this many threads, each with its
+# own database connection.
+FANOUT_QUERIES = True
+FANOUT_WORKERS = 8
+
+# Most sub-requests a single POST /batch may carry
+BATCH_MAX_REQUESTS = 25
+
+# Most ids one /products?ids= or POST /products/multiget request may ask for
+PRODUCT_MULTIGET_LIMIT = 1000
+
+# How long /products/facets reuses the counts for one set of filters
+PRODUCT_FACETS_CACHE_SECONDS = 60
+
+# /products/autocomplete answers from an in-memory index of product and
+# store names. Each worker builds it at startup when AUTOCOMPLETE_PRELOAD
+# is on, otherwise on the first lookup, and rebuilds it after
+# AUTOCOMPLETE_REBUILD_SECONDS to pick up other workers' writes. Every
+# prefix keeps its AUTOCOMPLETE_NODE_SIZE best names, which also caps
+# ?limit=.
+AUTOCOMPLETE_PRELOAD = not TESTING
+AUTOCOMPLETE_REBUILD_SECONDS = 300
+AUTOCOMPLETE_NODE_SIZE = 20
+
+# /products/:id/also_bought serves the best ALSO_BOUGHT_NEIGHBORS products
+# bought in the same paid orders, at least ALSO_BOUGHT_MIN_ORDERS times.
+# `manage.py refresh_also_bought` precomputes them, run it on a schedule.
+ALSO_BOUGHT_NEIGHBORS = 10
+ALSO_BOUGHT_MIN_ORDERS = 2
+
+# /products/:id/similar reads TF-IDF vectors that `manage.py
+# build_similar_products` writes to SIMILAR_PRODUCTS_DIR. Terms are hashed
+# into SIMILAR_PRODUCTS_DIMENSIONS columns. A build re-embeds every product
+# once more than SIMILAR_PRODUCTS_REBUILD_FRACTION of them have changed
+# since the last full build, and only the changed ones before that.
+SIMILAR_PRODUCTS_DIR = os.environ.get(
+    "BANGAZON_SIMILAR_PRODUCTS_DIR", os.path.join(tempfile.gettempdir(), "bangazon-similar-products")
+)
+SIMILAR_PRODUCTS_DIMENSIONS = 1024
+SIMILAR_PRODUCTS_REBUILD_FRACTION = 0.2
+
+# /products/trending ranks products by their likes, ratings and sales,
+# each weighted by TRENDING_WEIGHTS and halved in value every
+# TRENDING_HALF_LIFE_HOURS. Run `manage.py refresh_trending` after
+# changing either one.
+TRENDING_HALF_LIFE_HOURS = 72
+TRENDING_WEIGHTS = {"like": 1.0, "rating": 2.0, "sale": 3.0}
+
+# Staff can add ?__profile=cpu or ?__profile=mem to any request to get a
+# cProfile or tracemalloc report instead of the response. Each staff user
+# gets PROFILING_RATE_LIMIT reports a minute, and the newest
+# PROFILING_KEEP reports are kept in PROFILING_DIR.
+PROFILING_ENABLED = True
+PROFILING_RATE_LIMIT = 5
+PROFILING_DIR = os.environ.get(
+    "BANGAZON_PROFILING_DIR", os.path.join(tempfile.gettempdir(), "bangazon-profiles")
+)
+PROFILING_KEEP = 50
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {
+            "format": "%(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+        },
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SLOW_QUERY_LOG,
+            "maxBytes": 5 * 1024 * 1024,
+            "backupCount": SLOW_QUERY_LOG_BACKUPS,
+            "formatter": "message",
+            "delay": True,
+        },
+    },
+    "loggers": {
+        # One JSON line per request from RequestTimingMiddleware
+        "bangazonapi.timing": {
+            "handlers": ["console"],
+            "level": os.environ.get(
+                "BANGAZON_TIMING_LOG_LEVEL", "WARNING" if TESTING else "INFO"
+            ),
+            "propagate": False,
+        },
+        # One JSON line per slow query from SlowQueryLogMiddleware
+        "bangazonapi.slowqueries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
@@ -10,6 +10,7 @@ from bangazonapi.views import *
 router = routers.DefaultRouter(trailing_slash=False)
 router.register(r"products", Products, "product")
 router.register(r"productcategories", ProductCategories, "productcategory")
+router.register(r"locations", Locations, "location")
 router.register(r"lineitems", LineItems, "orderproduct")
 router.register(r"customers", Customers, "customer")
 router.register(r"users", Users, "user")
@@ -18,6 +19,7 @@ router.register(r"paymenttypes", Payments, "payment")
 router.register(r"profile", Profile, "profile")
 router.register(r"stores", Stores, "store" )
 router.register(r"reports", Reports, "report")
+router.register(r"slowqueries", SlowQueries, "slowquery")
 
 # Wire up our API using automatic URL routing.
 # Additionally, we include login URLs for the browsable API.
@@ -25,6 +27,8 @@ urlpatterns = [
     path("", include(router.urls)),
     path("register", register_user),
     path("login", login_user),
+    path("batch", batch_requests),
     path("api-token-auth", obtain_auth_token),
+    path("metrics", prometheus_metrics),
     path("api-auth", include("rest_framework.urls", namespace="rest_framework")),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,266 @@
+"""In-memory prefix index for product and store name typeahead
+
+Typeahead used `/products?name=`, a `name__icontains` scan over the
+whole product table on every keystroke. `/products/autocomplete?q=`
+answers from a trie of every product and store name instead. It is
+keyed on the lowercased name from each word onwards, so "kit" finds
+"Kite" and "Red Kite". Every node keeps its best
+`AUTOCOMPLETE_NODE_SIZE` completions, ranked by score, so a lookup is a
+walk down the query's characters and a slice.
+
+Products score units sold plus likes. Stores score the customers who
+favorited them. Each process builds its own index the first time it is
+used, or at startup when `AUTOCOMPLETE_PRELOAD` is on. Model signals
+keep it current for writes made by that process. Other processes catch
+up when their copy is rebuilt, after `AUTOCOMPLETE_REBUILD_SECONDS`.
+"""
+import heapq
+import logging
+import threading
+import time
+from itertools import chain
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from bangazonapi.fastread import sold_count
+from bangazonapi.models import Favorite, Product, ProductLike, Store
+
+logger = logging.getLogger(__name__)
+
+PRODUCT = "product"
+STORE = "store"
+
+_index = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+def _keys(name):
+    """The name from each of its words onwards"""
+    words = normalize(name).split(" ")
+    return {" ".join(words[start:]) for start in range(len(words)) if words[start]}
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children = {}
+        # Entries whose key ends at this node
+        self.entries = set()
+        # Best entries in this subtree, best first
+        self.top = []
+
+
+class PrefixIndex:
+    """A trie of names that keeps the best completions at every node
+
+    Entries are `(-score, lowercased name, kind, id, name)` tuples, so
+    the natural tuple order ranks them best first, then alphabetically.
+    """
+
+    def __init__(self, node_size):
+        self.node_size = node_size
+        self.root = _Node()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def build(cls, rows, node_size):
+        """An index over `(kind, id, name, score)` rows
+
+        Every entry is added before any node ranks its subtree, which is
+        then done once per node from the leaves up.
+        """
+        index = cls(node_size)
+        for kind, pk, name, score in rows:
+            entry = (-score, normalize(name), kind, pk, name)
+            index._entries[(kind, pk)] = entry
+            for key in _keys(name):
+                index._walk(key, create=True)[-1].entries.add(entry)
+
+        stack = [(index.root, False)]
+        while stack:
+            node, ranked_children = stack.pop()
+            if ranked_children:
+                index._rank(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+        return index
+
+    def _walk(self, key, create=False):
+        """The nodes from the root along key, or None when it is not indexed"""
+        node = self.root
+        path = [node]
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+            node = child
+            path.append(node)
+        return path
+
+    def _rank(self, node):
+        candidates = chain(node.entries, *(child.top for child in node.children.values()))
+        # The same entry can reach a node through two of its words
+        node.top = heapq.nsmallest(self.node_size, set(candidates))
+
+    def _rerank(self, path, key):
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if depth and not node.entries and not node.children:
+                del path[depth - 1].children[key[depth - 1]]
+            else:
+                self._rank(node)
+
+    def put(self, kind, pk, name, score):
+        """Add an entry, or replace its name and score"""
+        with self._lock:
+            self._remove((kind, pk))
+            entry = (-score, normalize(name), kind, pk, name)
+            self._entries[(kind, pk)] = entry
+            for key in _keys(name):
+                path = self._walk(key, create=True)
+                path[-1].entries.add(entry)
+                self._rerank(path, key)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            self._remove((kind, pk))
+
+    def _remove(self, identity):
+        entry = self._entries.pop(identity, None)
+        if entry is None:
+            return
+        for key in _keys(entry[4]):
+            path = self._walk(key)
+            path[-1].entries.discard(entry)
+            self._rerank(path, key)
+
+    def complete(self, prefix, limit):
+        """The best `limit` entries with a word starting with prefix"""
+        path = self._walk(normalize(prefix))
+        if path is None:
+            return []
+        return [
+            {"type": kind, "id": pk, "name": name, "score": -negated}
+            for negated, _, kind, pk, name in path[-1].top[:limit]
+        ]
+
+
+def _likes():
+    likes = (
+        ProductLike.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(likes, output_field=IntegerField()), Value(0))
+
+
+def _favorites():
+    favorites = (
+        Favorite.objects.filter(store=OuterRef("pk"))
+        .order_by()
+        .values("store")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(favorites, output_field=IntegerField()), Value(0))
+
+
+def product_rows(products):
+    rows = products.annotate(score=sold_count() + _likes()).values_list("id", "name", "score")
+    return ((PRODUCT, pk, name, score) for pk, name, score in rows.iterator())
+
+
+def store_rows(stores):
+    rows = stores.annotate(score=_favorites()).values_list("id", "name", "score")
+    return ((STORE, pk, name, score) for pk, name, score in rows.iterator())
+
+
+def build():
+    rows = chain(product_rows(Product.objects.all()), store_rows(Store.objects.all()))
+    return PrefixIndex.build(rows, settings.AUTOCOMPLETE_NODE_SIZE)
+
+
+def _stale():
+    return time.monotonic() - _built_at > settings.AUTOCOMPLETE_REBUILD_SECONDS
+
+
+def index():
+    """This process's index, built or rebuilt when it is due
+
+    While one thread rebuilds a stale index the others keep answering
+    from the old one.
+    """
+    global _index, _built_at
+    if _index is not None and not _stale():
+        return _index
+    if not _lock.acquire(blocking=_index is None):
+        return _index
+    try:
+        if _index is None or _stale():
+            _index = build()
+            _built_at = time.monotonic()
+        return _index
+    finally:
+        _lock.release()
+
+
+def loaded():
+    """The index if this process has built it, for incremental updates"""
+    return _index
+
+
+def reset():
+    """Drop the index so the next lookup rebuilds it"""
+    global _index
+    with _lock:
+        _index = None
+
+
+def preload():
+    """Build the index at worker startup so the first keystroke is fast"""
+    if not settings.AUTOCOMPLETE_PRELOAD:
+        return
+    try:
+        index()
+    except DatabaseError:
+        logger.warning("Could not preload the autocomplete index", exc_info=True)
+
+
+def refresh_products(product_ids):
+    """Re-read the names and scores of products after a write"""
+    current = loaded()
+    if current is None:
+        return
+    product_ids = set(product_ids)
+    for kind, pk, name, score in product_rows(Product.objects.filter(pk__in=product_ids)):
+        current.put(kind, pk, name, score)
+        product_ids.discard(pk)
+    for pk in product_ids:
+        current.remove(PRODUCT, pk)
+
+
+def refresh_store(store_id):
+    """Re-read a store's name and score after a write"""
+    current = loaded()
+    if current is None:
+        return
+    for kind, pk, name, score in store_rows(Store.objects.filter(pk=store_id)):
+        current.put(kind, pk, name, score)
+        return
+    current.remove(STORE, store_id)
@@ -0,0 +1,371 @@
+"""Endpoint benchmarks with query-count budgets
+
+Every GET route the API router exposes is requested repeatedly against a
+generated dataset. Each endpoint records latency percentiles and the
+number of SQL queries it ran, and results are compared with a stored
+baseline. An endpoint fails when it runs more queries than the baseline
+allows, since query counts do not drift with machine load. Latency only
+means something on the machine that recorded it, so it is kept in a
+separate baseline and compared on request.
+"""
+import asyncio
+import json
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import AsyncClient, Client, override_settings
+from rest_framework.authtoken.models import Token
+from bangazonapi.models import (
+    Customer,
+    Location,
+    Order,
+    OrderProduct,
+    Payment,
+    Product,
+    ProductCategory,
+    Store,
+)
+
+# generate_dataset volumes for each dataset size
+SIZES = {
+    "small": {"customers": 50, "categories": 5, "products": 200, "orders": 400,
+              "line_items": 1200, "likes": 800, "ratings": 400, "favorites": 100},
+    "medium": {"customers": 300, "categories": 10, "products": 1500, "orders": 3000,
+               "line_items": 9000, "likes": 6000, "ratings": 3000, "favorites": 600},
+    "large": {"customers": 1000, "categories": 20, "products": 5000, "orders": 10000,
+              "line_items": 30000, "likes": 20000, "ratings": 10000, "favorites": 2000},
+}
+
+# Query strings for routes that do nothing useful without one
+QUERY_STRINGS = {
+    "Reports.favoritesellers": "customer={customer}",
+    "Reports.orders": "status=complete",
+    "Products.autocomplete": "q=s",
+}
+
+# Detail views whose nested serializers run their queries concurrently
+FANOUT_ROUTES = ("Profile.list", "Stores.retrieve", "Products.retrieve")
+
+
+# Result fields kept in the shared baseline and in the per-machine one
+BUDGET_KEYS = ("path", "status", "queries")
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Endpoint:
+    route: str
+    path: str
+
+
+@dataclass
+class Result:
+    route: str
+    path: str
+    status: int
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass
+class Throughput:
+    route: str
+    handler: str
+    fanout: bool
+    rps: float
+    p50_ms: float
+    p95_ms: float
+
+
+class QueryCounter:
+    """Execute wrapper counting statements, with no cap on how many"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def benchmark_customer():
+    """The customer with the most orders, so per-customer views do the most work"""
+    return Customer.objects.annotate(orders=Count("order")).order_by("-orders", "id").first()
+
+
+def detail_ids(customer):
+    """A primary key to request for each router basename's detail route"""
+    order = Order.objects.filter(customer=customer).order_by("id").first()
+    store = Store.objects.annotate(size=Count("owner__products")).order_by("-size", "id").first()
+    return {
+        "product": Product.objects.order_by("id").values_list("id", flat=True).first(),
+        "productcategory": ProductCategory.objects.order_by("id").values_list("id", flat=True).first(),
+        "orderproduct": OrderProduct.objects.filter(order=order).values_list("id", flat=True).first(),
+        "customer": customer.id,
+        "user": customer.user_id,
+        "order": order.id if order else None,
+        "payment": Payment.objects.filter(customer=customer).values_list("id", flat=True).first(),
+        "store": store.id if store else None,
+        "location": Location.objects.order_by("id").values_list("id", flat=True).first(),
+    }
+
+
+def endpoints(customer):
+    """Every GET route registered on the API router"""
+    from bangazon.urls import router
+
+    ids = detail_ids(customer)
+    found = []
+    for prefix, viewset, basename in router.registry:
+        routes = []
+        if hasattr(viewset, "list"):
+            routes.append(("list", f"/{prefix}"))
+        if hasattr(viewset, "retrieve") and ids.get(basename):
+            routes.append(("retrieve", f"/{prefix}/{ids[basename]}"))
+        for action in viewset.get_extra_actions():
+            if "get" not in action.mapping:
+                continue
+            if action.detail:
+                if ids.get(basename):
+                    routes.append((action.__name__, f"/{prefix}/{ids[basename]}/{action.url_path}"))
+            else:
+                routes.append((action.__name__, f"/{prefix}/{action.url_path}"))
+
+        for action, path in routes:
+            route = f"{viewset.__name__}.{action}"
+            query = QUERY_STRINGS.get(route, "").format(customer=customer.id)
+            found.append(Endpoint(route, f"{path}?{query}" if query else path))
+    return found
+
+
+def run(iterations=10, warmup=1, routes=None):
+    """Benchmark every endpoint as the busiest customer
+
+    Returns:
+        list -- Result for each endpoint
+    """
+    customer = benchmark_customer()
+    token = Token.objects.get_or_create(user=User.objects.get(pk=customer.user_id))[0]
+    client = Client(raise_request_exception=False, headers={"Authorization": f"Token {token.key}"})
+
+    results = []
+    for endpoint in endpoints(customer):
+        if routes and endpoint.route not in routes:
+            continue
+        for _ in range(warmup):
+            client.get(endpoint.path)
+
+        samples = []
+        for _ in range(iterations):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = perf_counter()
+                response = client.get(endpoint.path)
+                samples.append((perf_counter() - started) * 1000)
+
+        results.append(Result(
+            route=endpoint.route,
+            path=endpoint.path,
+            status=response.status_code,
+            queries=counter.count,
+            p50_ms=round(statistics.median(samples), 2),
+            p95_ms=round(percentile(samples, 0.95), 2),
+            p99_ms=round(percentile(samples, 0.99), 2),
+        ))
+    return results
+
+
+def read_path_speedups(iterations=10, routes=("Products.list", "Stores.list", "Orders.list")):
+    """Median latency of list views with and without FAST_READ_SERIALIZERS
+
+    Both paths must render the same bytes, or ValueError is raised.
+
+    Returns:
+        list -- (route, serializer ms, fast ms, queries before, queries after)
+    """
+    customer = benchmark_customer()
+    token = Token.objects.get_or_create(user=User.objects.get(pk=customer.user_id))[0]
+    client = Client(headers={"Authorization": f"Token {token.key}"})
+
+    speedups = []
+    for endpoint in endpoints(customer):
+        if endpoint.route not in routes:
+            continue
+        measured = {}
+        for fast in (False, True):
+            with override_settings(FAST_READ_SERIALIZERS=fast):
+                content = client.get(endpoint.path).content
+                samples = []
+                for _ in range(iterations):
+                    counter = QueryCounter()
+                    with connection.execute_wrapper(counter):
+                        started = perf_counter()
+                        client.get(endpoint.path)
+                        samples.append((perf_counter() - started) * 1000)
+            measured[fast] = (content, statistics.median(samples), counter.count)
+
+        if measured[False][0] != measured[True][0]:
+            raise ValueError(f"{endpoint.route} renders differently on the fast read path")
+        speedups.append((
+            endpoint.route, measured[False][1], measured[True][1], measured[False][2], measured[True][2]
+        ))
+    return speedups
+
+
+def _shares(total, parts):
+    """total split into parts nearly equal counts"""
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+def _wsgi_load(path, headers, concurrency, requests):
+    """Latencies and elapsed seconds for requests sent from concurrent threads"""
+
+    def worker(count):
+        client = Client(raise_request_exception=False, headers=headers)
+        samples = []
+        try:
+            for _ in range(count):
+                started = perf_counter()
+                response = client.get(path)
+                samples.append((response.status_code, perf_counter() - started))
+        finally:
+            connections.close_all()
+        return samples
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        parts = list(pool.map(worker, _shares(requests, concurrency)))
+    return [sample for part in parts for sample in part], perf_counter() - started
+
+
+async def _asgi_load(path, headers, concurrency, requests):
+    """Latencies and elapsed seconds for requests sent from concurrent tasks"""
+    # AsyncClient ignores client-wide headers, so they go on every request
+    client = AsyncClient(raise_request_exception=False)
+
+    async def worker(count):
+        samples = []
+        for _ in range(count):
+            started = perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append((response.status_code, perf_counter() - started))
+        return samples
+
+    started = perf_counter()
+    parts = await asyncio.gather(*(worker(count) for count in _shares(requests, concurrency)))
+    return [sample for part in parts for sample in part], perf_counter() - started
+
+
+def server_throughput(concurrency=4, requests=40, routes=FANOUT_ROUTES):
+    """Throughput of the fan-out views through the WSGI and ASGI handlers
+
+    Each route is loaded with `concurrency` clients at once, through
+    Django's WSGI handler from threads and through its ASGI handler from
+    asyncio tasks, with FANOUT_QUERIES off and on. Every response must
+    be a 200, or ValueError is raised.
+
+    Returns:
+        list -- Throughput for each route, handler and fanout setting
+    """
+    customer = benchmark_customer()
+    token = Token.objects.get_or_create(user=User.objects.get(pk=customer.user_id))[0]
+    headers = {"Authorization": f"Token {token.key}"}
+
+    measured = []
+    for endpoint in endpoints(customer):
+        if endpoint.route not in routes:
+            continue
+        for handler in ("wsgi", "asgi"):
+            for fanout in (False, True):
+                with override_settings(FANOUT_QUERIES=fanout):
+                    if handler == "wsgi":
+                        samples, elapsed = _wsgi_load(endpoint.path, headers, concurrency, requests)
+                    else:
+                        samples, elapsed = asyncio.run(
+                            _asgi_load(endpoint.path, headers, concurrency, requests)
+                        )
+                failed = {status for status, _ in samples if status != 200}
+                if failed:
+                    raise ValueError(f"{endpoint.route} returned {sorted(failed)} over {handler}")
+                latencies = [seconds * 1000 for _, seconds in samples]
+                measured.append(Throughput(
+                    route=endpoint.route,
+                    handler=handler,
+                    fanout=fanout,
+                    rps=round(len(samples) / elapsed, 1),
+                    p50_ms=round(statistics.median(latencies), 2),
+                    p95_ms=round(percentile(latencies, 0.95), 2),
+                ))
+    return measured
+
+
+def compare(results, baseline, latencies=None, threshold=0.25, slack_ms=2.0):
+    """Failures of results against baselines for the same dataset size
+
+    An endpoint over its query budget always fails. When `latencies` is
+    given, an endpoint also fails when its median is more than
+    `threshold` slower than the recorded median, with `slack_ms` of
+    headroom so very fast endpoints do not flap.
+
+    Returns:
+        list -- Human readable failure messages
+    """
+    failures = []
+    for result in results:
+        expected = baseline.get(result.route)
+        if expected is not None and result.queries > expected["queries"]:
+            failures.append(
+                f"{result.route}: {result.queries} queries, budget is {expected['queries']}"
+            )
+        expected = (latencies or {}).get(result.route)
+        if expected is None:
+            continue
+        limit = expected["p50_ms"] * (1 + threshold) + slack_ms
+        if result.p50_ms > limit:
+            failures.append(
+                f"{result.route}: median {result.p50_ms}ms, baseline {expected['p50_ms']}ms "
+                f"allows {limit:.2f}ms"
+            )
+    return failures
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as source:
+            return json.load(source)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, baseline):
+    with open(path, "w", encoding="utf-8") as target:
+        json.dump(baseline, target, indent=2, sort_keys=True)
+        target.write("\n")
+
+
+def as_baseline(results):
+    """Query budgets of results, keyed by route"""
+    return {
+        result.route: {key: value for key, value in asdict(result).items() if key in BUDGET_KEYS}
+        for result in results
+    }
+
+
+def as_latencies(results):
+    """Latency percentiles of results, keyed by route"""
+    return {
+        result.route: {key: value for key, value in asdict(result).items() if key in LATENCY_KEYS}
+        for result in results
+    }
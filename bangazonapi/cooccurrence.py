@@ -0,0 +1,85 @@
+"""Item-to-item co-occurrence over order baskets, vectorized with NumPy
+
+The baskets are an (order, product) array with one row per product in
+each paid order. Every basket row is paired with every other row of the
+same basket, without a Python loop. This gives the rows of the sparse
+product x product co-occurrence matrix in coordinate form, and
+`np.unique` sums the duplicate coordinates. Only the rows for the
+products being refreshed are expanded, so the work is proportional to
+the baskets those products are in.
+
+A neighbor's score is the share of the product's orders that also held
+it, `together / orders(product)`. The score does not depend on how
+often the neighbor sells elsewhere, so a product's neighbors only change
+when one of its own orders does. `manage.py refresh_also_bought` relies
+on that to refresh incrementally.
+"""
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class Neighbors:
+    """Parallel arrays, grouped by product and best neighbor first"""
+
+    product: np.ndarray
+    other: np.ndarray
+    together: np.ndarray
+    score: np.ndarray
+
+    def __len__(self):
+        return len(self.product)
+
+
+def baskets(rows):
+    """Unique (order, product) pairs as an int64 array sorted by order"""
+    pairs = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    return np.unique(pairs, axis=0)
+
+
+def order_counts(pairs):
+    """Product ids and how many baskets each is in"""
+    return np.unique(pairs[:, 1], return_counts=True)
+
+
+def neighbors(pairs, products, top_k, min_orders=1):
+    """The top_k products bought together with each of products
+
+    Arguments:
+        pairs -- Output of baskets()
+        products -- Product ids to compute neighbors for
+        top_k -- Most neighbors to keep per product
+        min_orders -- Fewest shared orders a neighbor needs
+    """
+    order, product = pairs[:, 0], pairs[:, 1]
+    starts = np.flatnonzero(np.r_[True, order[1:] != order[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    basket = np.repeat(np.arange(len(starts)), sizes)
+
+    # Pair each row of a wanted product with every row of its basket
+    anchors = np.flatnonzero(np.isin(product, products))
+    repeats = sizes[basket[anchors]]
+    offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    left = product[np.repeat(anchors, repeats)]
+    right = product[np.repeat(starts[basket[anchors]], repeats) + offsets]
+    distinct = left != right
+
+    # Sum the duplicate (product, other) coordinates
+    keys, together = np.unique(
+        (left[distinct] << 32) | right[distinct], return_counts=True
+    )
+    left, right = keys >> 32, keys & 0xFFFFFFFF
+    kept = together >= min_orders
+    left, right, together = left[kept], right[kept], together[kept]
+
+    ids, counts = order_counts(pairs)
+    score = together / counts[np.searchsorted(ids, left)]
+
+    # Best first within each product, ties to the lower id
+    ranked = np.lexsort((right, -together, left))
+    left, right, together, score = left[ranked], right[ranked], together[ranked], score[ranked]
+    group_starts = np.flatnonzero(np.r_[True, left[1:] != left[:-1]])
+    rank = np.arange(len(left)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(left)]))
+    top = rank < top_k
+
+    return Neighbors(left[top], right[top], together[top], score[top])
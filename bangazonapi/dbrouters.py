@@ -0,0 +1,132 @@
+"""Database router that sends safe-method reads to read replicas
+
+ReplicaRoutingMiddleware marks each GET, HEAD or OPTIONS request as
+replica-safe. Reads made while handling it go to one of the aliases in
+`DATABASE_REPLICAS`; everything else, including all writes, uses the
+primary. A customer who has just written is pinned to the primary for
+`REPLICA_STICKY_SECONDS` so they always read their own writes.
+
+The pin travels with the client rather than living in one worker's
+memory. The response to a write carries a signed, timestamped pin as a
+cookie and as the `X-Bangazon-Primary` header. A client that does not
+keep cookies sends the header back. Whichever worker takes the next
+request checks the signature and age itself.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core import signing
+
+PRIMARY = "default"
+
+# Authentication must see tokens and users the moment they are created
+PRIMARY_ONLY_APPS = ("auth", "authtoken", "sessions", "contenttypes")
+
+PIN_COOKIE = "bangazon_primary"
+PIN_HEADER = "X-Bangazon-Primary"
+_PIN_SALT = "bangazonapi.dbrouters.pin"
+
+_routing = ContextVar("replica_routing", default=None)
+
+
+def stick_to_primary(request, user_id):
+    """Read from the primary for this user until replicas catch up
+
+    Pins the rest of this request. ReplicaRoutingMiddleware hands the
+    pin to the client with pin_response().
+    """
+    request.primary_pin = user_id
+
+
+def pinned_user(request):
+    """The user this request is pinned to the primary for, or None"""
+    user_id = getattr(request, "primary_pin", None)
+    if user_id is not None:
+        return user_id
+    value = request.COOKIES.get(PIN_COOKIE) or request.headers.get(PIN_HEADER)
+    if not value:
+        return None
+    try:
+        return signing.loads(value, salt=_PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS)
+    except signing.BadSignature:
+        # Also raised once the pin is older than REPLICA_STICKY_SECONDS
+        return None
+
+
+def pin_response(request, response):
+    """Send the request's pin, if any, back to the client"""
+    user_id = getattr(request, "primary_pin", None)
+    if user_id is None:
+        return
+    value = signing.dumps(user_id, salt=_PIN_SALT)
+    response.set_cookie(
+        PIN_COOKIE, value, max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax"
+    )
+    response[PIN_HEADER] = value
+
+
+class ReplicaRouting:
+    """Request-level hint deciding whether reads may use a replica"""
+
+    __slots__ = ("request", "allowed", "sticky")
+
+    def __init__(self, request, allowed):
+        self.request = request
+        self.allowed = allowed
+        self.sticky = None
+
+    def use_replica(self):
+        if not self.allowed:
+            return False
+        if self.sticky is None:
+            # DRF authenticates inside the view, so the user is only known
+            # once the token has been read (always from the primary).
+            user = getattr(self.request, "user", None)
+            if user is None or not user.is_authenticated:
+                return True
+            self.sticky = pinned_user(self.request) == user.pk
+        return not self.sticky
+
+
+def begin_request(request):
+    """Attach a routing hint for this request, returning a reset token"""
+    return _routing.set(ReplicaRouting(request, request.method in ("GET", "HEAD", "OPTIONS")))
+
+
+def end_request(token):
+    _routing.reset(token)
+
+
+@contextmanager
+def primary():
+    """Force every read inside the block to the primary"""
+    token = _routing.set(None)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+    """Routes replica-safe reads to `DATABASE_REPLICAS`, all else to primary"""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+
+        routing = _routing.get()
+        if routing is None or not routing.use_replica():
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,114 @@
+"""Facet counts for a filtered set of products
+
+`/products/facets` returns, for the same filters `/products` takes, how
+many products fall in each category, price band, location and star
+rating. Clients use them to draw filter sidebars without downloading
+every product. The price bands and rating buckets are conditional counts
+in one `aggregate()` query, and categories and locations are grouped
+`values().annotate()` queries, so no product rows reach Python.
+Locations are grouped on the normalized location, an indexed key.
+
+Counts are cached per filter set for `PRODUCT_FACETS_CACHE_SECONDS`.
+They can lag behind new products and ratings by that long.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from bangazonapi.fastread import average_rating
+from bangazonapi.models import Location
+
+# Lower bound of each price band. The last band has no upper bound.
+PRICE_BANDS = (0, 10, 25, 50, 100, 250, 500, 1000)
+
+# How many locations to list, most products first
+TOP_LOCATIONS = 10
+
+# Whole stars, an average of 4.5 counts towards 4. Ratings start at 0,
+# so every rated product falls in one of these.
+STARS = (0, 1, 2, 3, 4, 5)
+
+
+def _cache_key(params):
+    filters = "&".join(f"{key}={params[key]}" for key in sorted(params))
+    return "product-facets:" + hashlib.sha1(filters.encode()).hexdigest()
+
+
+def _price_bands():
+    bounds = list(zip(PRICE_BANDS, PRICE_BANDS[1:] + (None,)))
+    counts = {}
+    for index, (low, high) in enumerate(bounds):
+        band = Q(price__gte=low)
+        if high is not None:
+            band &= Q(price__lt=high)
+        counts[f"price_{index}"] = Count("pk", filter=band)
+    return bounds, counts
+
+
+def _rating_buckets():
+    counts = {}
+    for stars in STARS:
+        bucket = Q(rating__gte=stars)
+        if stars < STARS[-1]:
+            bucket &= Q(rating__lt=stars + 1)
+        counts[f"stars_{stars}"] = Count("pk", filter=bucket)
+    counts["unrated"] = Count("pk", filter=Q(rating__isnull=True))
+    return counts
+
+
+def compute(products):
+    """Facet counts for a queryset of products"""
+    bounds, price_counts = _price_bands()
+    totals = products.annotate(rating=average_rating()).aggregate(
+        count=Count("pk"), **price_counts, **_rating_buckets()
+    )
+
+    categories = (
+        products.order_by()
+        .values("category_id", "category__name")
+        .annotate(count=Count("pk"))
+        .order_by("category__name", "category_id")
+    )
+    locations = (
+        products.order_by()
+        .filter(normalized_location__isnull=False)
+        .values("normalized_location_id", "normalized_location__city", "normalized_location__region")
+        .annotate(count=Count("pk"))
+        .order_by("-count", "normalized_location__city", "normalized_location__region")[:TOP_LOCATIONS]
+    )
+
+    return {
+        "count": totals["count"],
+        "categories": [
+            {"id": row["category_id"], "name": row["category__name"], "count": row["count"]}
+            for row in categories
+        ],
+        "price": [
+            {"min": low, "max": high, "count": totals[f"price_{index}"]}
+            for index, (low, high) in enumerate(bounds)
+        ],
+        "locations": [
+            {
+                "id": row["normalized_location_id"],
+                "location": Location.display_name(
+                    row["normalized_location__city"], row["normalized_location__region"]
+                ),
+                "count": row["count"],
+            }
+            for row in locations
+        ],
+        "ratings": [
+            *({"stars": stars, "count": totals[f"stars_{stars}"]} for stars in STARS),
+            {"stars": None, "count": totals["unrated"]},
+        ],
+    }
+
+
+def facets(products, params):
+    """Cached facet counts for products filtered by params"""
+    key = _cache_key(params)
+    result = cache.get(key)
+    if result is None:
+        result = compute(products)
+        cache.set(key, result, settings.PRODUCT_FACETS_CACHE_SECONDS)
+    return result
@@ -0,0 +1,140 @@
+"""Run the independent parts of a read concurrently
+
+Detail views such as `Profile.list` render several nested serializers,
+and each of them runs its own queries. In the stock serializer these
+run one after another. Here every field that may hit the database is
+rendered with `sync_to_async(thread_sensitive=False)` on a bounded
+worker pool, and `asyncio.gather` waits for all of them. The output is
+the same dict `serializer.data` returns, with keys in the same order.
+
+Worker threads have their own database connections. Execute wrappers
+installed on the calling thread, such as request timing, slow query
+logging and benchmark query counters, are installed on the worker's
+connections for the duration of each task. That way their queries are
+still recorded.
+
+Inside a transaction the workers could not see its uncommitted rows, so
+fields are rendered in the calling thread instead. The same happens
+when `FANOUT_QUERIES` is off.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+_executor = None
+
+# Marks a field whose get_attribute() raised SkipField
+_SKIPPED = object()
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.FANOUT_WORKERS, thread_name_prefix="fanout"
+        )
+    return _executor
+
+
+def enabled():
+    if not settings.FANOUT_QUERIES:
+        return False
+    return not any(connection.in_atomic_block for connection in connections.all())
+
+
+def _with_wrappers(function, wrappers):
+    """Run function on a worker with the caller's execute wrappers installed"""
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            for alias, installed in wrappers.items():
+                for wrapper in installed:
+                    stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            return function()
+    finally:
+        close_old_connections()
+
+
+def _installed_wrappers():
+    return {
+        connection.alias: list(connection.execute_wrappers) for connection in connections.all()
+    }
+
+
+async def gather(*functions, wrappers=None):
+    """Call each function on a worker thread and wait for all the results
+
+    Connections belong to a thread, so a sync caller passes the wrappers
+    installed on its own connections.
+    """
+    if wrappers is None:
+        wrappers = _installed_wrappers()
+    return await asyncio.gather(*(
+        sync_to_async(partial(_with_wrappers, function, wrappers),
+                      thread_sensitive=False, executor=executor())()
+        for function in functions
+    ))
+
+
+def run(*functions):
+    """Results of each function, called concurrently when that is safe"""
+    if len(functions) < 2 or not enabled():
+        return [function() for function in functions]
+    return async_to_sync(gather)(*functions, wrappers=_installed_wrappers())
+
+
+def _local_columns(model):
+    return {"pk", *(field.name for field in model._meta.concrete_fields if not field.is_relation)}
+
+
+def _is_local(field, columns):
+    """Whether rendering field only reads the instance's own columns"""
+    if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField,
+                          serializers.SerializerMethodField)):
+        return False
+    if isinstance(field, serializers.HyperlinkedIdentityField):
+        return True
+    return field.source in columns
+
+
+def _render(field, instance):
+    try:
+        attribute = field.get_attribute(instance)
+    except SkipField:
+        return _SKIPPED
+    check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+    if check_for_none is None:
+        return None
+    return field.to_representation(attribute)
+
+
+def serialize(serializer):
+    """`serializer.data` for a single instance, rendering fields concurrently
+
+    Fields that only read the instance's own columns are rendered in the
+    calling thread. Nested serializers, related fields, method fields and
+    model properties are rendered concurrently with each other.
+    """
+    instance = serializer.instance
+    fields = list(serializer._readable_fields)
+    columns = _local_columns(serializer.Meta.model)
+    remote = [field for field in fields if not _is_local(field, columns)]
+
+    values = dict(zip(
+        (field.field_name for field in remote),
+        run(*(partial(_render, field, instance) for field in remote)),
+    ))
+    data = {}
+    for field in fields:
+        value = values[field.field_name] if field.field_name in values else _render(field, instance)
+        if value is not _SKIPPED:
+            data[field.field_name] = value
+    return ReturnDict(data, serializer=serializer)
@@ -0,0 +1,99 @@
+"""Hyperlink fields that build URLs from a template compiled once per route
+
+DRF's hyperlinked fields call `reverse()` and `build_absolute_uri()` for
+every object and every related field they render. Both resolve the
+route from scratch each time. These fields reverse each route once,
+with a placeholder where the lookup value goes, and keep the absolute
+form of that template on the request. Rendering a link is then two
+string concatenations.
+
+Requests that DRF would treat specially, because of a versioning
+scheme, a format suffix or a `?format=` override, fall back to the
+stock implementation.
+"""
+from functools import lru_cache
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf, reverse as django_reverse
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+
+PLACEHOLDER = "__lookup__"
+
+
+@lru_cache(maxsize=None)
+def path_template(view_name, lookup_url_kwarg, urlconf, script_prefix):
+    """The route's path split around its lookup value
+
+    The URL conf and script prefix are part of the cache key because
+    `reverse()` depends on both. Routes whose converter rejects the
+    placeholder, like `<int:pk>`, have no template and return None.
+    """
+    try:
+        path = django_reverse(view_name, kwargs={lookup_url_kwarg: PLACEHOLDER}, urlconf=urlconf)
+    except NoReverseMatch:
+        return None
+    head, _, tail = path.partition(PLACEHOLDER)
+    return head, tail
+
+
+def _needs_reverse(request):
+    """Whether DRF's reverse() would change the URL for this request"""
+    if getattr(request, "versioning_scheme", None) is not None:
+        return True
+    override = api_settings.URL_FORMAT_OVERRIDE
+    return bool(override) and override in getattr(request, "GET", ())
+
+
+def hyperlink(view_name, lookup_url_kwarg, lookup_value, request=None):
+    """The URL of one object, matching `rest_framework.reverse.reverse`"""
+    if request is not None and _needs_reverse(request):
+        return reverse(view_name, kwargs={lookup_url_kwarg: lookup_value}, request=request)
+
+    key = (view_name, lookup_url_kwarg)
+    templates = getattr(request, "_hyperlink_templates", None)
+    template = templates.get(key) if templates is not None else None
+
+    if template is None:
+        template = path_template(view_name, lookup_url_kwarg, get_urlconf(), get_script_prefix())
+        if template is None:
+            return reverse(view_name, kwargs={lookup_url_kwarg: lookup_value}, request=request)
+        head, tail = template
+        if request is not None:
+            # Absolute URLs only differ by the scheme and host in front
+            absolute = request.build_absolute_uri(f"{head}{PLACEHOLDER}{tail}")
+            head, _, tail = absolute.partition(PLACEHOLDER)
+            if templates is None:
+                templates = request._hyperlink_templates = {}
+            templates[key] = (head, tail)
+        template = (head, tail)
+
+    return f"{template[0]}{lookup_value}{template[1]}"
+
+
+class TemplateHyperlinkMixin:
+    """Formats integer lookups into a cached URL template"""
+
+    def get_url(self, obj, view_name, request, format):
+        if hasattr(obj, "pk") and obj.pk in (None, ""):
+            return None
+
+        lookup_value = getattr(obj, self.lookup_field)
+        # Other lookups may need quoting, which reverse() takes care of
+        if format or not isinstance(lookup_value, int):
+            return super().get_url(obj, view_name, request, format)
+        return hyperlink(view_name, self.lookup_url_kwarg, lookup_value, request)
+
+
+class TemplateHyperlinkedRelatedField(TemplateHyperlinkMixin, serializers.HyperlinkedRelatedField):
+    pass
+
+
+class TemplateHyperlinkedIdentityField(TemplateHyperlinkMixin, serializers.HyperlinkedIdentityField):
+    pass
+
+
+class TemplateHyperlinkedModelSerializer(serializers.HyperlinkedModelSerializer):
+    """HyperlinkedModelSerializer whose `url` and related links use templates"""
+
+    serializer_related_field = TemplateHyperlinkedRelatedField
+    serializer_url_field = TemplateHyperlinkedIdentityField
@@ -0,0 +1,460 @@
+"""Find table scans in captured SQL and suggest indexes for them
+
+IndexAdvisor is an execute wrapper. While it is installed it records
+every statement with the route that issued it and the statement's
+`EXPLAIN QUERY PLAN`. Afterwards it reports scan-heavy queries per
+endpoint and ranks candidate indexes by the rows they would stop the
+database from reading.
+
+Besides full scans it flags weak searches, where SQLite walks an index
+on a column with few distinct values, such as the soft-delete
+`deleted IS NULL` check, and filters the other predicates row by row.
+
+Django names the table of every subquery `U0`, so one statement can use
+the same alias for several tables. Each plan step is resolved against
+the SELECT it belongs to, and predicates are only read from that SELECT.
+"""
+import hashlib
+import re
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from django.apps import apps
+from django.db import connections
+from bangazonapi.middleware.timing import current_timing
+from bangazonapi.slowqueries import query_plan_rows
+
+SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$")
+SEARCH = re.compile(r"^SEARCH (?:TABLE )?(\w+)(?: AS (\w+))? USING (?:COVERING )?INDEX (\w+) \((.+)\)$")
+CONSTRAINT_COLUMN = re.compile(r"^(\w+)")
+# A term of a partial index condition that the advisor understands
+NULL_CONDITION = re.compile(r'^\(?"?(\w+)"? IS NULL\)?$')
+TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+# Django aliases repeated joins as T2, T3... and subquery tables as U0, V0...
+TABLE_ALIAS = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+TABLE_NAME = re.compile(r'(?:FROM|JOIN) "(\w+)"')
+SUBQUERY_START = re.compile(r"\(\s*SELECT\b")
+# SQLite labels the steps of a subquery with the number it gave its SELECT
+SUBQUERY = re.compile(r"SUBQUERY (\d+)$")
+EQUALITY = ("=", "IN", "IS NULL", "IS")
+RANGE = (">", ">=", "<", "<=")
+
+
+@dataclass
+class Statement:
+    """A distinct SQL statement issued by one route"""
+
+    route: str
+    sql: str
+    executions: int = 0
+    plan: list = field(default_factory=list)
+    # (table, name in the plan, index columns used, estimated rows read,
+    # SQL of the SELECT the table is read in)
+    scans: list = field(default_factory=list)
+    sorts: bool = False
+
+    @property
+    def rows_read(self):
+        return self.executions * sum(rows for _, _, _, rows, _ in self.scans)
+
+
+@dataclass
+class Scope:
+    """One SELECT of a statement, without the subqueries nested in it"""
+
+    sql: str
+    # Alias or table name -> table
+    tables: dict
+
+
+def scopes(sql):
+    """The SELECTs of a statement, numbered the way SQLite numbers them
+
+    SQLite numbers a SELECT when its parser finishes it, so subqueries
+    come before the SELECT that holds them and the statement itself is
+    last. Each subquery is cut out of its parent's text as "()".
+    """
+    finished = []
+    pieces = [[]]
+    # For each open parenthesis, whether it starts a subquery
+    opened = []
+    quote = None
+    position = 0
+    while position < len(sql):
+        char = sql[position]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "(" and SUBQUERY_START.match(sql, position):
+            pieces[-1].append("()")
+            pieces.append([])
+            opened.append(True)
+            position += 1
+            continue
+        elif char == "(":
+            opened.append(False)
+        elif char == ")" and opened and opened.pop():
+            finished.append(_scope("".join(pieces.pop())))
+            position += 1
+            continue
+        pieces[-1].append(char)
+        position += 1
+    finished.append(_scope("".join(pieces[0])))
+    return finished
+
+
+def _scope(sql):
+    tables = {table: table for table in TABLE_NAME.findall(sql)}
+    tables.update((alias, table) for table, alias in TABLE_ALIAS.findall(sql))
+    return Scope(sql, tables)
+
+
+def _resolve(name, number, found):
+    """The table a plan step reads and the SELECT it is read in
+
+    Steps outside a numbered subquery, such as flattened ones, fall back
+    to the first SELECT that defines the name.
+    """
+    if 0 < number <= len(found) and name in found[number - 1].tables:
+        scope = found[number - 1]
+    elif name in found[-1].tables:
+        scope = found[-1]
+    else:
+        scope = next((scope for scope in found if name in scope.tables), found[-1])
+    return scope.tables.get(name, name), scope.sql
+
+
+def _subquery_numbers(rows):
+    """For each plan row, the number of the subquery it belongs to, or 0"""
+    parents = {}
+    labels = {}
+    for row_id, parent, detail in rows:
+        parents[row_id] = parent
+        labels[row_id] = detail
+
+    numbers = []
+    for row_id, parent, _ in rows:
+        number = 0
+        while parent in parents:
+            match = SUBQUERY.search(labels[parent])
+            if match:
+                number = int(match.group(1))
+                break
+            parent = parents[parent]
+        numbers.append(number)
+    return numbers
+
+
+@dataclass
+class Candidate:
+    """An index that would turn a full scan into a search"""
+
+    table: str
+    columns: tuple
+    benefit: int = 0
+    executions: int = 0
+    routes: set = field(default_factory=set)
+
+    @property
+    def model(self):
+        return model_for_table(self.table)
+
+    @property
+    def fields(self):
+        model = self.model
+        by_column = {f.column: f.name for f in model._meta.concrete_fields}
+        return [by_column.get(column, column) for column in self.columns]
+
+    @property
+    def index_name(self):
+        digest = hashlib.md5(
+            f"{self.table}:{','.join(self.columns)}".encode()
+        ).hexdigest()[:8]
+        return f"{self.model._meta.model_name[:13]}_{digest}_adv"
+
+
+def model_for_table(table):
+    for model in apps.get_models():
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+def _predicates(sql, names):
+    """Columns of a table compared in a statement, by kind of comparison"""
+    identifiers = "|".join(re.escape(name) for name in names)
+    column = rf'(?:{identifiers})\."(\w+)"'
+    operator = r"(>=|<=|=|>|<|IN|IS NULL|IS|LIKE)"
+
+    equality, ranges, unindexable = [], [], []
+    for match in re.finditer(rf"{column} {operator}\s*(\S*)", sql):
+        name, op, operand = match.groups()
+        if op in EQUALITY:
+            equality.append(name)
+        elif op in RANGE:
+            ranges.append(name)
+        elif op == "LIKE":
+            unindexable.append(name)
+    # Join conditions are written with the joined table on the right
+    for match in re.finditer(rf"= {column}", sql):
+        equality.append(match.group(1))
+    return equality, ranges, unindexable
+
+
+def _null_checks(sql, names):
+    """Columns of a table a statement requires to be NULL"""
+    identifiers = "|".join(re.escape(name) for name in names)
+    return set(re.findall(rf'(?:{identifiers})\."(\w+)" IS NULL', sql))
+
+
+def _covers(index, condition, columns, checked):
+    """Whether an existing index already serves a candidate's columns"""
+    if not condition <= checked:
+        return False
+    remaining = tuple(column for column in columns if column not in condition)
+    return index[: len(remaining)] == remaining
+
+
+def index_conditions(connection, table):
+    """Columns each partial index on a table requires to be NULL, by name
+
+    An index whose condition is anything but NULL checks maps to None.
+    Indexes without a condition are not listed.
+    """
+    # A raw cursor, so an installed advisor does not record this query
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+            [table],
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    conditions = {}
+    for name, sql in rows:
+        _, where, condition = sql.partition(" WHERE ")
+        if not where:
+            continue
+        terms = [NULL_CONDITION.match(term.strip()) for term in condition.split(" AND ")]
+        conditions[name] = frozenset(term.group(1) for term in terms) if all(terms) else None
+    return conditions
+
+
+def _order_columns(sql, names):
+    order_by = sql.rpartition(" ORDER BY ")[2] if " ORDER BY " in sql else ""
+    identifiers = "|".join(re.escape(name) for name in names)
+    return re.findall(rf'(?:{identifiers})\."(\w+)"', order_by)
+
+
+def _unique(values):
+    return tuple(dict.fromkeys(values))
+
+
+class IndexAdvisor:
+    """Execute wrapper that captures statements and their query plans"""
+
+    def __init__(self):
+        self.statements = {}
+        self.plans = {}
+        self.row_counts = {}
+        self.distinct_counts = {}
+        self.conditions = {}
+        self.unindexable = defaultdict(set)
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.lstrip().upper().startswith("SELECT") and not many:
+            timing = current_timing()
+            route = timing.route if timing and timing.route else "unrouted"
+            self.record(route, sql, params, context["connection"])
+        return result
+
+    @contextmanager
+    def capture(self):
+        """Capture statements on every database alias inside the block"""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def record(self, route, sql, params, connection):
+        key = (route, sql)
+        statement = self.statements.get(key)
+        if statement is None:
+            if sql not in self.plans:
+                self.plans[sql] = query_plan_rows(connection, sql, params) or []
+            rows = self.plans[sql]
+            statement = self.statements[key] = Statement(route, sql)
+            statement.plan = [detail for _, _, detail in rows]
+            found = scopes(sql)
+            for step, number in zip(statement.plan, _subquery_numbers(rows)):
+                step = step.strip()
+                scan, search = SCAN.match(step), SEARCH.match(step)
+                if scan:
+                    name = scan.group(2) or scan.group(1)
+                    table, scope = _resolve(name, number, found)
+                    self.unindexable[table].update(_predicates(scope, {f'"{table}"', name})[2])
+                    statement.scans.append((table, name, (), self._rows(connection, table), scope))
+                elif search:
+                    name = search.group(2) or search.group(1)
+                    table, scope = _resolve(name, number, found)
+                    used = tuple(
+                        CONSTRAINT_COLUMN.match(part).group(1)
+                        for part in search.group(4).split(" AND ")
+                    )
+                    # A partial index also serves the NULL checks it is built on
+                    condition = self._conditions(connection, table).get(search.group(3)) or frozenset()
+                    equality, ranges, unindexable = _predicates(scope, {f'"{table}"', name})
+                    self.unindexable[table].update(unindexable)
+                    if used[0] in ("rowid", "id") or set(equality + ranges) <= {*used, *condition, "id"}:
+                        # The index serves every predicate on the table
+                        continue
+                    rows_read = self._rows(connection, table) // max(self._distinct(connection, table, used[0]), 1)
+                    if rows_read > 1:
+                        statement.scans.append((table, name, used, rows_read, scope))
+                elif step.startswith(TEMP_SORT):
+                    statement.sorts = True
+        statement.executions += 1
+
+    def _conditions(self, connection, table):
+        if table not in self.conditions:
+            self.conditions[table] = index_conditions(connection, table)
+        return self.conditions[table]
+
+    def _count(self, connection, sql):
+        cursor = connection.create_cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def _rows(self, connection, table):
+        if table not in self.row_counts:
+            self.row_counts[table] = self._count(connection, f'SELECT COUNT(*) FROM "{table}"')
+        return self.row_counts[table]
+
+    def _distinct(self, connection, table, column):
+        """Distinct values of a column, counting NULL as one of them"""
+        key = (table, column)
+        if key not in self.distinct_counts:
+            self.distinct_counts[key] = self._count(
+                connection, f'SELECT COUNT(*) FROM (SELECT DISTINCT "{column}" FROM "{table}")'
+            )
+        return self.distinct_counts[key]
+
+    def endpoints(self):
+        """Queries, executions and full scans per route, most scans first"""
+        summary = defaultdict(lambda: {"statements": 0, "executions": 0, "scans": 0, "rows_scanned": 0})
+        for statement in self.statements.values():
+            totals = summary[statement.route]
+            totals["statements"] += 1
+            totals["executions"] += statement.executions
+            totals["scans"] += statement.executions * len(statement.scans)
+            totals["rows_scanned"] += statement.rows_read
+        return sorted(summary.items(), key=lambda item: -item[1]["rows_scanned"])
+
+    def scan_statements(self):
+        return sorted(
+            (s for s in self.statements.values() if s.scans), key=lambda s: -s.rows_read
+        )
+
+    def candidates(self, existing_indexes=None):
+        """Candidate indexes ranked by estimated rows scanned avoided
+
+        Equality columns lead and at most one range column follows, so
+        the index can serve the whole predicate. Columns of a weak index
+        the plan already uses come first. When the statement also sorts
+        through a temporary B-tree the ORDER BY columns are appended.
+        Candidates already covered by the leading columns of an existing
+        index are skipped, and so are any with a column the model does
+        not have. A partial index on `deleted IS NULL` covers that check,
+        so only the other columns have to lead it.
+        """
+        if existing_indexes is None:
+            existing_indexes = self.existing_indexes()
+
+        ranked = {}
+        for statement in self.statements.values():
+            for table, name, used, rows, scope in statement.scans:
+                model = model_for_table(table)
+                if model is None:
+                    continue
+                names = {f'"{table}"', name}
+                equality, ranges, _ = _predicates(scope, names)
+                checked = _null_checks(scope, names)
+
+                columns = list(_unique([*used, *equality]))
+                if len(columns) == len(used):
+                    # Nothing beyond what the weak index already serves
+                    continue
+                if ranges:
+                    columns.append(ranges[0])
+                elif statement.sorts:
+                    columns.extend(c for c in _order_columns(scope, names) if c not in columns)
+                columns = tuple(c for c in _unique(columns) if c != "id")
+                if not columns:
+                    continue
+                if not set(columns) <= {f.column for f in model._meta.concrete_fields}:
+                    continue
+                if any(
+                    _covers(index, condition, columns, checked)
+                    for index, condition in existing_indexes.get(table, ())
+                ):
+                    continue
+
+                candidate = ranked.setdefault((table, columns), Candidate(table, columns))
+                candidate.executions += statement.executions
+                candidate.benefit += statement.executions * rows
+                candidate.routes.add(statement.route)
+
+        return sorted(ranked.values(), key=lambda c: (-c.benefit, c.table, c.columns))
+
+    def existing_indexes(self):
+        """(columns, condition) of every index, keyed by table
+
+        The condition is the set of columns a partial index requires to be
+        NULL, empty for a full index. Partial indexes on any other
+        condition cannot be relied on and are left out.
+        """
+        indexes = defaultdict(list)
+        connection = connections["default"]
+        tables = {scan[0] for statement in self.statements.values() for scan in statement.scans}
+        with connection.cursor() as cursor:
+            for table in tables:
+                conditions = self._conditions(connection, table)
+                constraints = connection.introspection.get_constraints(cursor, table)
+                for name, constraint in constraints.items():
+                    if constraint["index"] or constraint["unique"] or constraint["primary_key"]:
+                        condition = conditions.get(name, frozenset())
+                        if condition is not None:
+                            indexes[table].append((tuple(constraint["columns"]), condition))
+        return indexes
+
+
+def migration_source(candidates, dependency):
+    """A migration module adding each candidate index"""
+    lines = [
+        "from django.db import migrations, models",
+        "",
+        "",
+        "class Migration(migrations.Migration):",
+        "",
+        f"    dependencies = [{dependency!r}]" if dependency else "    dependencies = []",
+        "",
+        "    operations = [",
+    ]
+    for candidate in candidates:
+        lines.extend(
+            [
+                "        migrations.AddIndex(",
+                f"            model_name={candidate.model._meta.model_name!r},",
+                f"            index=models.Index(fields={candidate.fields!r}, name={candidate.index_name!r}),",
+                "        ),",
+            ]
+        )
+    lines.append("    ]")
+    return "\n".join(lines) + "\n"
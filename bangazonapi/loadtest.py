@@ -0,0 +1,279 @@
+"""Replay the request collection against a running server with asyncio
+
+Each virtual user holds one keep-alive HTTP/1.1 connection and works
+through its own copy of the workload, with tokens and ids swapped for
+rows that exist in the server's database. Samples are grouped by
+endpoint, with numeric path segments folded into `{id}`, so the report
+reads like the router rather than like individual URLs.
+"""
+import asyncio
+import json
+import random
+import re
+import statistics
+from collections import Counter, defaultdict
+from dataclasses import dataclass, replace
+from time import perf_counter
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from bangazonapi.models import (
+    Customer,
+    Order,
+    OrderProduct,
+    Payment,
+    Product,
+    ProductCategory,
+    Store,
+)
+
+NUMERIC_SEGMENT = re.compile(r"^\d+$")
+
+# Body fields holding ids, and the id pool to draw them from
+BODY_IDS = {
+    "product_id": "products",
+    "category_id": "productcategories",
+    "recipient": "customers",
+    "payment_type": "paymenttypes",
+}
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    seconds: float
+    error: str = ""
+
+    @property
+    def failed(self):
+        return bool(self.error) or self.status >= 400
+
+
+def endpoint_name(request):
+    """`GET /products/{id}`, with query parameter names but not values"""
+    segments = ["{id}" if NUMERIC_SEGMENT.match(part) else part for part in request.path.split("/")]
+    name = f"{request.method} {'/'.join(segments)}"
+    keys = sorted({key for key, _ in parse_qsl(request.query)})
+    return f"{name}?{'&'.join(keys)}" if keys else name
+
+
+class VirtualUsers:
+    """Tokens, credentials and ids of real rows for each virtual user"""
+
+    def __init__(self, count, password, seed=0):
+        self.rng = random.Random(seed)
+        self.password = password
+        customers = list(
+            Customer.objects.filter(user__auth_token__isnull=False)
+            .order_by("id")
+            .values_list("id", "user__username", "user__auth_token__key")
+        )
+        if not customers:
+            raise ValueError("No customers with tokens, run generate_dataset first")
+        self.users = [self.rng.choice(customers) for _ in range(count)]
+        self.pools = {
+            "products": list(Product.objects.values_list("id", flat=True)),
+            "productcategories": list(ProductCategory.objects.values_list("id", flat=True)),
+            "customers": [customer_id for customer_id, *_ in customers],
+            "users": list(Customer.objects.values_list("user_id", flat=True)),
+            "stores": list(Store.objects.values_list("id", flat=True)),
+        }
+        self.registered = 0
+
+    def owned(self, customer_id):
+        return {
+            "orders": list(Order.objects.filter(customer_id=customer_id).values_list("id", flat=True)),
+            "lineitems": list(
+                OrderProduct.objects.filter(order__customer_id=customer_id).values_list("id", flat=True)
+            ),
+            "paymenttypes": list(Payment.objects.filter(customer_id=customer_id).values_list("id", flat=True)),
+        }
+
+    def plans(self, workload):
+        """The workload rewritten for each virtual user"""
+        plans = []
+        for customer_id, username, token in self.users:
+            pools = {**self.pools, **self.owned(customer_id)}
+            # A customer's own profile is the natural target of /customers/:id
+            pools["customers"] = [customer_id]
+            plan = []
+            for request in workload:
+                request = request.with_token(token)
+                request = replace(request, path=self._path(request.path, pools))
+                plan.append(replace(request, body=self._body(request, pools, username)))
+            plans.append(plan)
+        return plans
+
+    def _pick(self, pools, name, fallback):
+        pool = pools.get(name)
+        return self.rng.choice(pool) if pool else fallback
+
+    def _path(self, path, pools):
+        parts = path.split("/")
+        for index, part in enumerate(parts):
+            if NUMERIC_SEGMENT.match(part) and index > 0:
+                parts[index] = str(self._pick(pools, parts[index - 1], part))
+        return "/".join(parts)
+
+    def _body(self, request, pools, username):
+        if not request.body:
+            return request.body
+        is_json = request.content_type == "application/json"
+        try:
+            values = json.loads(request.body) if is_json else dict(parse_qsl(request.body.decode()))
+        except ValueError:
+            return request.body
+        if not isinstance(values, dict):
+            return request.body
+
+        for key, pool in BODY_IDS.items():
+            if key in values:
+                values[key] = self._pick(pools, pool, values[key])
+        if request.path == "/login":
+            values.update(username=username, password=self.password)
+        elif request.path == "/register":
+            # Every registration needs a username nobody has taken yet
+            self.registered += 1
+            values["username"] = f"loadtest{self.rng.getrandbits(32):08x}{self.registered}"
+
+        return json.dumps(values).encode() if is_json else urlencode(values).encode()
+
+
+class Connection:
+    """A minimal keep-alive HTTP/1.1 client on asyncio streams"""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, request):
+        """Send a WorkloadRequest and return its status code"""
+        return await asyncio.wait_for(self._request(request), self.timeout)
+
+    async def _request(self, request):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        headers = {
+            "Host": f"{self.host}:{self.port}",
+            "Connection": "keep-alive",
+            "Content-Length": str(len(request.body)),
+            **request.headers,
+        }
+        if request.content_type:
+            headers["Content-Type"] = request.content_type
+        head = f"{request.method} {request.url} HTTP/1.1\r\n" + "".join(
+            f"{key}: {value}\r\n" for key, value in headers.items()
+        )
+        self.writer.write(head.encode("latin-1") + b"\r\n" + request.body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif "content-length" in response_headers:
+            await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            await self.reader.read()
+            await self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status
+
+
+async def virtual_user(url, plan, deadline, iterations, think, timeout, samples):
+    connection = Connection(url, timeout)
+    rounds = 0
+    try:
+        while rounds < iterations and perf_counter() < deadline:
+            for request in plan:
+                if perf_counter() >= deadline:
+                    break
+                endpoint = endpoint_name(request)
+                started = perf_counter()
+                try:
+                    status = await connection.request(request)
+                    samples.append(Sample(endpoint, status, perf_counter() - started))
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as ex:
+                    samples.append(Sample(endpoint, 0, perf_counter() - started, type(ex).__name__))
+                    await connection.close()
+                if think:
+                    await asyncio.sleep(think)
+            rounds += 1
+    finally:
+        await connection.close()
+
+
+async def run(url, plans, duration, iterations=float("inf"), think=0.0, timeout=30.0):
+    """Run every plan concurrently until the duration or iterations run out
+
+    Returns:
+        tuple -- Samples and elapsed seconds
+    """
+    samples = []
+    started = perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        virtual_user(url, plan, deadline, iterations, think, timeout, samples) for plan in plans
+    ))
+    return samples, perf_counter() - started
+
+
+def percentile(ordered, fraction):
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def summarize(samples, elapsed):
+    """Throughput, latency percentiles and error rate per endpoint and overall"""
+    grouped = defaultdict(list)
+    for sample in samples:
+        grouped[sample.endpoint].append(sample)
+    grouped["total"] = samples
+
+    summary = {}
+    for endpoint, group in grouped.items():
+        if not group:
+            continue
+        latencies = sorted(sample.seconds * 1000 for sample in group)
+        errors = [sample for sample in group if sample.failed]
+        summary[endpoint] = {
+            "requests": len(group),
+            "rps": round(len(group) / elapsed, 2) if elapsed else 0,
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "error_rate": round(len(errors) / len(group), 4),
+            "statuses": dict(sorted(
+                (str(status), count)
+                for status, count in Counter(s.error or s.status for s in group).items()
+            )),
+        }
+    return summary
@@ -0,0 +1,171 @@
+"""Replay the request collection and suggest indexes for full table scans"""
+import logging
+import os
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import Client, override_settings
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.authtoken.models import Token
+from bangazonapi.indexadvisor import IndexAdvisor, migration_source
+from bangazonapi.workload import load_collection
+
+# Same order as seed_data.sh, so foreign keys resolve as rows load
+FIXTURES = (
+    "users",
+    "tokens",
+    "customers",
+    "product_category",
+    "product",
+    "productrating",
+    "payment",
+    "order",
+    "order_product",
+    "productlikes",
+    "stores",
+    "favoritesellers",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays the API request collection against a throwaway copy of the "
+        "fixture data, records the query plan of every statement and ranks "
+        "candidate indexes for the full table scans it finds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workload",
+            default=os.path.join(settings.BASE_DIR, "api-requests-collection.json"),
+            help="Postman collection to replay.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Replay the collection this many times.",
+        )
+        parser.add_argument(
+            "--token",
+            help="Token used for authenticated requests whose token is not in the fixtures.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=10,
+            help="Number of candidate indexes to suggest.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the suggested indexes to this migration file.",
+        )
+
+    def handle(self, *args, **options):
+        workload = load_collection(options["workload"])
+        if not workload:
+            raise CommandError(f"No requests found in {options['workload']}")
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        try:
+            call_command("loaddata", *FIXTURES, verbosity=0)
+            advisor = self.replay(workload, options)
+            candidates = advisor.candidates()[: options["top"]]
+            self.report(advisor, candidates)
+            source = migration_source(candidates, self.latest_migration())
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if not candidates:
+            return
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as migration:
+                migration.write(source)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write("\nSuggested migration:\n")
+            self.stdout.write(source)
+
+    def replay(self, workload, options):
+        tokens = set(Token.objects.values_list("key", flat=True))
+        fallback = options["token"] or Token.objects.order_by("user_id").values_list("key", flat=True).first()
+
+        # Replayed writes can conflict with fixture rows, e.g. registering
+        # an existing username, which should not stop the replay
+        client = Client(raise_request_exception=False)
+        advisor = IndexAdvisor()
+        # Request, timing and slow query logs would bury the report
+        logging.disable(logging.CRITICAL)
+        try:
+            with override_settings(ALLOWED_HOSTS=["*"]), advisor.capture():
+                self.run_workload(client, workload, tokens, fallback, options["repeat"])
+        finally:
+            logging.disable(logging.NOTSET)
+        return advisor
+
+    @staticmethod
+    def run_workload(client, workload, tokens, fallback, repeat):
+        for _ in range(repeat):
+            for request in workload:
+                token = request.headers.get("Authorization", "").partition(" ")[2]
+                if request.authenticated and token not in tokens:
+                    request = request.with_token(fallback)
+                client.generic(
+                    request.method,
+                    request.url,
+                    request.body,
+                    content_type=request.content_type or "application/octet-stream",
+                    headers=request.headers,
+                )
+
+    def report(self, advisor, candidates):
+        self.stdout.write(self.style.MIGRATE_HEADING("Endpoints by rows read in table scans"))
+        self.stdout.write(f"  {'endpoint':<40}{'queries':>9}{'scans':>9}{'rows':>10}")
+        for route, totals in advisor.endpoints():
+            self.stdout.write(
+                f"  {route:<40}{totals['executions']:>9}{totals['scans']:>9}{totals['rows_scanned']:>10}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nStatements reading most of a table"))
+        for statement in advisor.scan_statements():
+            tables = ", ".join(
+                f"{table} using ({', '.join(used)})" if used else table
+                for table, _, used, _, _ in statement.scans
+            )
+            self.stdout.write(
+                f"  {statement.route} x{statement.executions}: ~{statement.rows_read} rows from {tables}"
+            )
+            self.stdout.write(f"    {statement.sql[:200]}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nCandidate indexes"))
+        if not candidates:
+            self.stdout.write("  None, every scan is already covered or unindexable")
+        for rank, candidate in enumerate(candidates, 1):
+            self.stdout.write(
+                f"  {rank}. {candidate.model._meta.label} ({', '.join(candidate.fields)}) "
+                f"~{candidate.benefit} rows avoided over {candidate.executions} queries "
+                f"from {', '.join(sorted(candidate.routes))}"
+            )
+
+        for table, columns in sorted(advisor.unindexable.items()):
+            if not columns:
+                continue
+            self.stdout.write(
+                f"  {table}.{', '.join(sorted(columns))}: LIKE with a leading wildcard "
+                "cannot use a B-tree index"
+            )
+
+    @staticmethod
+    def latest_migration():
+        loader = MigrationLoader(connection, ignore_no_migrations=True)
+        leaves = loader.graph.leaf_nodes("bangazonapi")
+        return leaves[0] if leaves else None
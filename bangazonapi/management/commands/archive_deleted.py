@@ -0,0 +1,80 @@
+"""Move old soft-deleted products and payment types into archive tables"""
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from safedelete.models import HARD_DELETE
+from bangazonapi.models import (
+    ArchivedPayment,
+    ArchivedProduct,
+    Payment,
+    Product,
+    Recommendation,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves products and payment types soft-deleted more than the "
+        "retention window ago into archive tables, in batches. They keep "
+        "their ids, and line items and orders that point at them read them "
+        "from the archive. Recommendations of archived products are removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SOFT_DELETE_RETENTION_DAYS,
+            help="Archive rows deleted more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows moved per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many rows would move without moving them.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+
+        products = Product.deleted_objects.filter(deleted__lt=cutoff)
+        payments = Payment.deleted_objects.filter(deleted__lt=cutoff)
+
+        self.archive(products, ArchivedProduct, options, self.drop_recommendations)
+        self.archive(payments, ArchivedPayment, options)
+
+    def archive(self, queryset, archive_model, options, before_delete=None):
+        name = queryset.model._meta.verbose_name_plural
+        if options["dry_run"]:
+            self.stdout.write(f"Would archive {queryset.count()} {name}")
+            return
+
+        moved = 0
+        while True:
+            with transaction.atomic():
+                rows = list(queryset.order_by("pk")[: options["batch_size"]])
+                if not rows:
+                    break
+                archive_model.objects.bulk_create(
+                    [archive_model.from_live(row) for row in rows], ignore_conflicts=True
+                )
+                if before_delete is not None:
+                    before_delete([row.pk for row in rows])
+                queryset.model.all_objects.filter(
+                    pk__in=[row.pk for row in rows]
+                ).delete(force_policy=HARD_DELETE)
+            moved += len(rows)
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} {name}"))
+
+    @staticmethod
+    def drop_recommendations(product_ids):
+        # Nobody can buy an archived product, so recommending it is moot
+        Recommendation.objects.filter(product_id__in=product_ids).delete()
@@ -0,0 +1,210 @@
+"""Benchmark every API endpoint against generated datasets"""
+import logging
+import os
+import tempfile
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from bangazonapi import autocomplete, benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates small, medium and large datasets in a throwaway database, "
+        "requests every GET endpoint on the router and reports latency "
+        "percentiles and query counts. Fails when an endpoint exceeds its "
+        "query budget, or with --threshold when its median latency regresses "
+        "past this machine's recorded latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            action="append",
+            choices=sorted(benchmarks.SIZES),
+            help="Dataset size to benchmark. Repeat for several. Defaults to all.",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=10,
+            help="Timed requests per endpoint.",
+        )
+        parser.add_argument(
+            "--route",
+            action="append",
+            help="Only benchmark this route, e.g. Products.list. Repeat for several.",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=os.path.join(settings.BASE_DIR, "benchmarks", "baseline.json"),
+            help="Query budgets to compare against.",
+        )
+        parser.add_argument(
+            "--latency-baseline",
+            default=os.path.join(settings.BASE_DIR, "benchmarks", "latency.local.json"),
+            help="Latencies recorded on this machine, kept out of git.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=None,
+            help=(
+                "Also fail when the median latency regresses by more than this fraction "
+                "of the latency baseline, e.g. 0.25. Off by default."
+            ),
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store the query budgets and this machine's latencies instead of comparing.",
+        )
+        parser.add_argument(
+            "--read-paths",
+            action="store_true",
+            help="Compare the list views with and without FAST_READ_SERIALIZERS instead.",
+        )
+        parser.add_argument(
+            "--servers",
+            action="store_true",
+            help="Compare WSGI and ASGI throughput of the fan-out detail views instead.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Concurrent clients for --servers. Each sends --iterations requests.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Dataset seed.")
+
+    def handle(self, *args, **options):
+        sizes = options["size"] or list(benchmarks.SIZES)
+        baseline = benchmarks.load_baseline(options["baseline"])
+        latencies = benchmarks.load_baseline(options["latency_baseline"])
+        if options["threshold"] is not None and not latencies and not options["update_baseline"]:
+            raise CommandError(
+                f"No latencies recorded in {options['latency_baseline']}. "
+                "Run with --update-baseline on this machine first."
+            )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        # Request timing and slow query logs would bury the report
+        logging.disable(logging.CRITICAL)
+        failures = []
+        try:
+            # Facets are timed without their cache, and the similar products
+            # index is built in a throwaway directory. The setup commands'
+            # output is discarded
+            with (
+                open(os.devnull, "w") as devnull,
+                tempfile.TemporaryDirectory() as similar_products,
+                override_settings(
+                    ALLOWED_HOSTS=["*"],
+                    PRODUCT_FACETS_CACHE_SECONDS=0,
+                    SIMILAR_PRODUCTS_DIR=similar_products,
+                ),
+            ):
+                for size in sizes:
+                    call_command("flush", interactive=False, verbosity=0)
+                    call_command(
+                        "generate_dataset",
+                        seed=options["seed"],
+                        stdout=devnull,
+                        **benchmarks.SIZES[size],
+                    )
+                    # Built from the previous dataset, if any
+                    autocomplete.reset()
+                    call_command("refresh_also_bought", stdout=devnull)
+                    call_command("build_similar_products", full=True, stdout=devnull)
+                    call_command("refresh_trending", stdout=devnull)
+                    if options["read_paths"]:
+                        self.report_read_paths(size, options["iterations"])
+                        continue
+                    if options["servers"]:
+                        self.report_servers(size, options["concurrency"], options["iterations"])
+                        continue
+                    results = benchmarks.run(options["iterations"], routes=options["route"])
+                    self.report(size, results)
+
+                    if options["update_baseline"]:
+                        baseline.setdefault(size, {}).update(benchmarks.as_baseline(results))
+                        latencies.setdefault(size, {}).update(benchmarks.as_latencies(results))
+                    else:
+                        failures += [
+                            f"[{size}] {failure}"
+                            for failure in benchmarks.compare(
+                                results,
+                                baseline.get(size, {}),
+                                latencies.get(size, {}) if options["threshold"] is not None else None,
+                                options["threshold"],
+                            )
+                        ]
+        finally:
+            logging.disable(logging.NOTSET)
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options["read_paths"] or options["servers"]:
+            return
+        if options["update_baseline"]:
+            for path, results in ((options["baseline"], baseline), (options["latency_baseline"], latencies)):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                benchmarks.save_baseline(path, results)
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {options['baseline']} and {options['latency_baseline']}"
+            ))
+        elif failures:
+            raise CommandError("\n".join(["Benchmarks regressed:", *failures]))
+        else:
+            self.stdout.write(self.style.SUCCESS("All endpoints within budget"))
+
+    def report(self, size, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{size} dataset"))
+        self.stdout.write(
+            f"  {'route':<32}{'status':>7}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"  {result.route:<32}{result.status:>7}{result.queries:>9}"
+                f"{result.p50_ms:>10.2f}{result.p95_ms:>10.2f}{result.p99_ms:>10.2f}"
+            )
+
+    def report_read_paths(self, size, iterations):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{size} dataset, serializers vs values() rows"))
+        self.stdout.write(
+            f"  {'route':<16}{'serializer ms':>15}{'fast ms':>10}{'speedup':>9}{'queries':>16}"
+        )
+        try:
+            speedups = benchmarks.read_path_speedups(iterations)
+        except ValueError as ex:
+            raise CommandError(ex.args[0])
+        for route, slow, fast, slow_queries, fast_queries in speedups:
+            self.stdout.write(
+                f"  {route:<16}{slow:>15.2f}{fast:>10.2f}{slow / fast:>8.1f}x"
+                f"{f'{slow_queries} -> {fast_queries}':>16}"
+            )
+
+    def report_servers(self, size, concurrency, iterations):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{size} dataset, WSGI vs ASGI with {concurrency} concurrent clients"
+        ))
+        self.stdout.write(
+            f"  {'route':<20}{'handler':>8}{'fanout':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+        )
+        try:
+            measured = benchmarks.server_throughput(concurrency, concurrency * iterations)
+        except ValueError as ex:
+            raise CommandError(ex.args[0])
+        for result in measured:
+            self.stdout.write(
+                f"  {result.route:<20}{result.handler:>8}{'on' if result.fanout else 'off':>8}"
+                f"{result.rps:>10.1f}{result.p50_ms:>10.2f}{result.p95_ms:>10.2f}"
+            )
@@ -0,0 +1,34 @@
+"""Build or update the TF-IDF index behind /products/:id/similar"""
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from bangazonapi import similarity
+from bangazonapi.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Embeds product names, descriptions and categories as TF-IDF vectors "
+        "and writes them to SIMILAR_PRODUCTS_DIR as a memory-mapped matrix. "
+        "Only new and changed products are embedded unless --full is given "
+        "or too many have changed since the last full build."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-embed every product with fresh IDF weights.",
+        )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        products = Product.objects.order_by("id").values_list(
+            "id", "name", "description", "category_id"
+        )
+        meta = similarity.build(products.iterator(), full=options["full"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote version {meta['version']} to {settings.SIMILAR_PRODUCTS_DIR}: "
+            f"embedded {meta['embedded']} products and reused {meta['reused']} "
+            f"in {perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,74 @@
+"""Remove duplicate likes, favorites, ratings and recommendations"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from bangazonapi.models import Favorite, ProductLike, ProductRating, Recommendation
+
+# Model, the fields its unique constraint covers, and which row to keep.
+# Ratings keep the newest row, since it holds the customer's latest review.
+INTERACTIONS = (
+    (ProductLike, ("customer", "product"), Min),
+    (Favorite, ("customer", "store"), Min),
+    (ProductRating, ("customer", "product"), Max),
+    (Recommendation, ("recommender", "customer", "product"), Min),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes duplicate interaction rows so the unique constraints on "
+        "likes, favorites, ratings and recommendations can be applied."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report duplicates without deleting them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of duplicate groups handled per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        for model, fields, keep in INTERACTIONS:
+            groups = (
+                model.objects.values(*fields)
+                .annotate(rows=Count("id"), keep_id=keep("id"))
+                .filter(rows__gt=1)
+                .order_by()
+            )
+
+            removed = 0
+            batch = []
+            for group in groups.iterator():
+                batch.append(group)
+                if len(batch) >= options["batch_size"]:
+                    removed += self.remove(model, fields, batch, options["dry_run"])
+                    batch = []
+            if batch:
+                removed += self.remove(model, fields, batch, options["dry_run"])
+
+            verb = "Would remove" if options["dry_run"] else "Removed"
+            self.stdout.write(
+                f"{verb} {removed} duplicate {model._meta.verbose_name_plural}"
+            )
+
+    def remove(self, model, fields, groups, dry_run):
+        if dry_run:
+            return sum(group["rows"] - 1 for group in groups)
+
+        removed = 0
+        with transaction.atomic():
+            for group in groups:
+                lookup = {field: group[field] for field in fields}
+                removed += (
+                    model.objects.filter(**lookup)
+                    .exclude(pk=group["keep_id"])
+                    .delete()[1]
+                    .get(model._meta.label, 0)
+                )
+        return removed
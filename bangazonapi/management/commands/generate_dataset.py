@@ -0,0 +1,323 @@
+"""Generate a large synthetic dataset for load tests and benchmarks"""
+import bisect
+import datetime
+import hashlib
+import itertools
+import random
+from time import perf_counter
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from bangazonapi.models import (
+    Customer,
+    Favorite,
+    Location,
+    Order,
+    OrderProduct,
+    Payment,
+    Product,
+    ProductCategory,
+    ProductLike,
+    ProductRating,
+    Store,
+)
+
+# Every generated user can log in with this password
+PASSWORD = "Bangazon8*"
+
+ADJECTIVES = ("Classic", "Compact", "Deluxe", "Ergonomic", "Handmade", "Heavy Duty",
+              "Portable", "Rustic", "Sleek", "Vintage", "Wireless", "Organic")
+NOUNS = ("Backpack", "Bicycle", "Blender", "Chair", "Desk Lamp", "Guitar", "Headphones",
+         "Kite", "Mug", "Skillet", "Sneakers", "Tent", "Watch", "Yoga Mat")
+CITIES = ("Nashville", "Pittsburgh", "Austin", "Seoul", "Denver", "Portland", "Chicago",
+          "Atlanta", "Boston", "Memphis", "Detroit", "Seattle")
+MERCHANTS = ("Visa", "Mastercard", "Amex", "Discover")
+REVIEWS = ("Terrible", "Not great", "It's fine", "Pretty good", "Love it", "Best purchase ever")
+# Ratings lean positive, as they do on most storefronts
+RATING_WEIGHTS = (1, 2, 4, 10, 30, 53)
+# Likes, ratings and line items happen over this many recent days
+INTERACTION_DAYS = 30
+
+
+class Zipf:
+    """Draw ids so a few are popular and most are rarely picked
+
+    The rank order is shuffled, so the popular ids are spread across the
+    id range instead of being the lowest ones.
+    """
+
+    def __init__(self, rng, ids, exponent):
+        self.rng = rng
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self.cumulative = list(
+            itertools.accumulate(1 / (rank ** exponent) for rank in range(1, len(self.ids) + 1))
+        )
+
+    def __call__(self):
+        point = self.rng.random() * self.cumulative[-1]
+        return self.ids[min(bisect.bisect(self.cumulative, point), len(self.ids) - 1)]
+
+
+def next_id(model):
+    manager = getattr(model, "all_objects", model.objects)
+    return (manager.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates users, customers, stores, products, orders, line items, "
+        "likes, ratings and favorites with skewed popularity, inserted with "
+        "bulk_create in batches. The same seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        counts = (
+            ("--customers", 1000, "Customers, each with a user and a token."),
+            ("--categories", 20, "Product categories."),
+            ("--products", 10000, "Products."),
+            ("--orders", 20000, "Orders."),
+            ("--line-items", 60000, "Line items, at least one per order."),
+            ("--likes", 50000, "Product likes."),
+            ("--ratings", 20000, "Product ratings."),
+            ("--favorites", 5000, "Favorited stores."),
+        )
+        for flag, default, help_text in counts:
+            parser.add_argument(flag, type=int, default=default, help=help_text)
+        parser.add_argument(
+            "--sellers",
+            type=float,
+            default=0.1,
+            help="Fraction of customers that own a store and sell products.",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=0.8,
+            help="Zipf exponent for product popularity and customer activity.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per bulk_create call.",
+        )
+
+    def handle(self, *args, **options):
+        if options["customers"] < 1 or options["categories"] < 1:
+            raise CommandError("At least one customer and one category are required")
+        if options["orders"] and not options["products"]:
+            raise CommandError("Orders need products to put in them")
+        if options["line_items"] < options["orders"]:
+            raise CommandError("Every order needs at least one line item")
+
+        self.seed = options["seed"]
+        self.rng = random.Random(self.seed)
+        self.batch_size = options["batch_size"]
+        self.today = datetime.date.today()
+        # Interaction times draw from their own generator, so the rest of
+        # the data stays the same for a seed as before they were added
+        self.clock = random.Random(self.seed + 1)
+        self.now = timezone.now()
+
+        customers = self.customers(options["customers"])
+        sellers = customers[: max(1, int(len(customers) * options["sellers"]))]
+        categories = self.categories(options["categories"])
+        stores = self.stores(sellers)
+        payments = self.payments(customers)
+        products = self.products(options["products"], sellers, categories, options["skew"])
+
+        popular_products = Zipf(self.rng, products, options["skew"]) if products else None
+        active_customers = Zipf(self.rng, customers, options["skew"])
+        self.orders(options["orders"], options["line_items"], active_customers, popular_products, payments)
+        self.interactions(ProductLike, "product", options["likes"], active_customers, popular_products)
+        self.interactions(ProductRating, "product", options["ratings"], active_customers, popular_products)
+        self.interactions(Favorite, "store", options["favorites"], active_customers,
+                          Zipf(self.rng, stores, options["skew"]))
+
+    def insert(self, model, rows):
+        """bulk_create rows from an iterable in batches
+
+        Returns:
+            int -- Number of rows inserted
+        """
+        started = perf_counter()
+        inserted = 0
+        with transaction.atomic():
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+                inserted += len(batch)
+        self.stdout.write(
+            f"Created {inserted} {model._meta.verbose_name_plural} in {perf_counter() - started:.1f}s"
+        )
+        return inserted
+
+    def days_ago(self, most):
+        return self.today - datetime.timedelta(days=self.rng.randrange(most))
+
+    def moment(self):
+        """A time within the last INTERACTION_DAYS, for trending scores"""
+        return self.now - datetime.timedelta(seconds=self.clock.random() * INTERACTION_DAYS * 86400)
+
+    def customers(self, count):
+        # Hashing is deliberately slow, so every user shares one hash
+        password = make_password(PASSWORD)
+        first = next_id(User)
+        ids = range(first, first + count)
+
+        self.insert(User, (
+            User(
+                id=user_id,
+                username=f"shopper{user_id}",
+                password=password,
+                email=f"shopper{user_id}@example.com",
+                first_name=self.rng.choice(("Ada", "Grace", "Alan", "Linus", "Margaret", "Dennis")),
+                last_name=f"Shopper{user_id}",
+            )
+            for user_id in ids
+        ))
+        # Keys derive from the seed and user id, so they are reproducible
+        # and a second run with the same seed does not collide
+        self.insert(Token, (
+            Token(key=hashlib.sha1(f"{self.seed}:{user_id}".encode()).hexdigest(), user_id=user_id)
+            for user_id in ids
+        ))
+
+        first_customer = next_id(Customer)
+        self.insert(Customer, (
+            Customer(
+                id=first_customer + offset,
+                user_id=user_id,
+                phone_number=f"555-{self.rng.randrange(10000):04d}",
+                address=f"{self.rng.randrange(1, 9999)} {self.rng.choice(CITIES)} Way",
+            )
+            for offset, user_id in enumerate(ids)
+        ))
+        return list(range(first_customer, first_customer + count))
+
+    def categories(self, count):
+        first = next_id(ProductCategory)
+        self.insert(ProductCategory, (
+            ProductCategory(id=category_id, name=f"Category {category_id}")
+            for category_id in range(first, first + count)
+        ))
+        return list(range(first, first + count))
+
+    def stores(self, sellers):
+        first = next_id(Store)
+        self.insert(Store, (
+            Store(
+                id=first + offset,
+                name=f"{self.rng.choice(ADJECTIVES)} Goods {first + offset}",
+                description=f"Selling since {self.days_ago(2000).year}",
+                owner_id=owner_id,
+            )
+            for offset, owner_id in enumerate(sellers)
+        ))
+        return list(range(first, first + len(sellers)))
+
+    def payments(self, customers):
+        """One or two payment types per customer, keyed by customer"""
+        owned = {}
+        first = next_id(Payment)
+        rows = []
+        for customer_id in customers:
+            for _ in range(self.rng.choice((1, 1, 2))):
+                payment_id = first + len(rows)
+                owned.setdefault(customer_id, []).append(payment_id)
+                rows.append(Payment(
+                    id=payment_id,
+                    merchant_name=self.rng.choice(MERCHANTS),
+                    account_number=f"{self.rng.getrandbits(50):016d}"[:16],
+                    customer_id=customer_id,
+                    expiration_date=self.today + datetime.timedelta(days=self.rng.randrange(30, 1500)),
+                ))
+        self.insert(Payment, iter(rows))
+        return owned
+
+    def products(self, count, sellers, categories, skew):
+        # A few sellers list most of the catalog
+        seller = Zipf(self.rng, sellers, skew)
+        locations = [
+            {"location": city, "normalized_location": Location.objects.for_text(city)}
+            for city in CITIES
+        ]
+        first = next_id(Product)
+        self.insert(Product, (
+            Product(
+                id=product_id,
+                name=f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)}"[:50],
+                customer_id=seller(),
+                price=round(self.rng.lognormvariate(3.5, 1.0), 2),
+                description=f"{self.rng.choice(ADJECTIVES)} and built to last",
+                quantity=self.rng.randrange(0, 200),
+                category_id=self.rng.choice(categories),
+                **self.rng.choice(locations),
+            )
+            for product_id in range(first, first + count)
+        ))
+        return list(range(first, first + count))
+
+    def orders(self, count, line_items, active_customers, popular_products, payments):
+        # Every order gets one line item and the rest land on random orders,
+        # so basket sizes vary the way they do on a real storefront
+        sizes = [1] * count
+        for _ in range(line_items - count):
+            sizes[self.rng.randrange(count)] += 1
+
+        # Only a customer's latest order can be an open cart
+        first = next_id(Order)
+        placed = []
+        open_carts = set()
+        for order_id in range(first, first + count):
+            customer_id = active_customers()
+            is_open = customer_id not in open_carts and self.rng.random() < 0.05
+            if is_open:
+                open_carts.add(customer_id)
+            placed.append(Order(
+                id=order_id,
+                customer_id=customer_id,
+                payment_type_id=None if is_open else self.rng.choice(payments[customer_id]),
+                created_date=self.days_ago(730),
+            ))
+        self.insert(Order, iter(placed))
+
+        self.insert(OrderProduct, (
+            OrderProduct(order_id=order_id, product_id=popular_products(), created_at=self.moment())
+            for order_id, size in zip(range(first, first + count), sizes)
+            for _ in range(size)
+        ))
+
+    def interactions(self, model, target, count, active_customers, popular_targets):
+        """Unique customer interactions with products or stores
+
+        Draws are skewed, so repeats are common. Pairs already drawn are
+        redrawn, up to a limit that keeps tiny catalogs from spinning.
+        """
+        if not count or popular_targets is None:
+            return
+        seen = set()
+        attempts = 0
+        while len(seen) < count and attempts < count * 20:
+            seen.add((active_customers(), popular_targets()))
+            attempts += 1
+
+        def rows():
+            for customer_id, target_id in sorted(seen):
+                values = {"customer_id": customer_id, f"{target}_id": target_id}
+                if model is ProductRating:
+                    rating = self.rng.choices(range(6), weights=RATING_WEIGHTS)[0]
+                    values.update(rating=rating, review=REVIEWS[rating])
+                if model is not Favorite:
+                    values["created_at"] = self.moment()
+                yield model(**values)
+
+        self.insert(model, rows())
@@ -0,0 +1,141 @@
+"""Replay the request collection concurrently against a running server"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from bangazonapi import loadtest
+from bangazonapi.management.commands.generate_dataset import PASSWORD
+from bangazonapi.workload import load_collection
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays api-requests-collection.json with concurrent virtual users "
+        "against a server using this project's database, with tokens and "
+        "ids taken from that database. Reports throughput, latency "
+        "percentiles and error rates per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Server to load. It must use the same database as this command.",
+        )
+        parser.add_argument(
+            "--start-server",
+            action="store_true",
+            help="Start runserver at --url for the duration of the test.",
+        )
+        parser.add_argument(
+            "--workload",
+            default=os.path.join(settings.BASE_DIR, "api-requests-collection.json"),
+            help="Postman collection to replay.",
+        )
+        parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users.")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds to run for.")
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            help="Stop each virtual user after this many passes through the workload.",
+        )
+        parser.add_argument(
+            "--think-ms",
+            type=float,
+            default=0,
+            help="Pause between a virtual user's requests.",
+        )
+        parser.add_argument(
+            "--safe-only",
+            action="store_true",
+            help="Replay only GET requests, leaving the data unchanged.",
+        )
+        parser.add_argument(
+            "--password",
+            default=PASSWORD,
+            help="Password of the virtual users, for the login request.",
+        )
+        parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for picking users and ids.")
+        parser.add_argument("--json", help="Also write the report to this file.")
+
+    def handle(self, *args, **options):
+        workload = load_collection(options["workload"])
+        if options["safe_only"]:
+            workload = [request for request in workload if request.method == "GET"]
+        if not workload:
+            raise CommandError(f"No requests to replay from {options['workload']}")
+
+        try:
+            users = loadtest.VirtualUsers(options["users"], options["password"], options["seed"])
+        except ValueError as ex:
+            raise CommandError(ex.args[0])
+        plans = users.plans(workload)
+
+        server = self.start_server(options["url"]) if options["start_server"] else None
+        try:
+            samples, elapsed = asyncio.run(loadtest.run(
+                options["url"],
+                plans,
+                options["duration"],
+                options["iterations"] or float("inf"),
+                options["think_ms"] / 1000,
+                options["timeout"],
+            ))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        summary = loadtest.summarize(samples, elapsed)
+        self.report(summary, elapsed, options["users"])
+        if options["json"]:
+            with open(options["json"], "w", encoding="utf-8") as target:
+                json.dump({"users": options["users"], "seconds": round(elapsed, 2),
+                           "endpoints": summary}, target, indent=2)
+
+    def start_server(self, url):
+        parts = urlsplit(url)
+        address = f"{parts.hostname}:{parts.port or 80}"
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), "runserver", "--noreload", address],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((parts.hostname, parts.port or 80), timeout=1).close()
+                return server
+            except OSError:
+                if server.poll() is not None:
+                    break
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"Server did not start at {address}")
+
+    def report(self, summary, elapsed, users):
+        total = summary.get("total")
+        if total is None:
+            raise CommandError("No requests completed")
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{total['requests']} requests from {users} users in {elapsed:.1f}s, "
+            f"{total['rps']} req/s, {total['error_rate']:.1%} errors"
+        ))
+        self.stdout.write(
+            f"  {'endpoint':<44}{'reqs':>7}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}  statuses"
+        )
+        for endpoint, row in sorted(summary.items()):
+            if endpoint == "total":
+                continue
+            statuses = " ".join(f"{status}x{count}" for status, count in row["statuses"].items())
+            self.stdout.write(
+                f"  {endpoint:<44}{row['requests']:>7}{row['rps']:>8}{row['p50_ms']:>9.1f}"
+                f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['error_rate']:>8.1%}  {statuses}"
+            )
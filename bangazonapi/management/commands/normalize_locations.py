@@ -0,0 +1,87 @@
+"""Parse free text product locations into shared Location rows"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bangazonapi.models import Location, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Parses every distinct Product.location string into a city and "
+        "region, creates one Location for each after deduplicating them, "
+        "and points the products at it. Only products without a location "
+        "are updated unless --all is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also re-parse products that already have a location.",
+        )
+        parser.add_argument(
+            "--rewrite",
+            action="store_true",
+            help='Also rewrite the text to its normalized form, e.g. "nashville,tn" to "Nashville, TN".',
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without changing it.",
+        )
+
+    def handle(self, *args, **options):
+        # Soft-deleted products too, so they are filtered correctly if restored
+        products = Product.all_objects.all()
+        if not options["all"]:
+            products = products.filter(normalized_location__isnull=True)
+
+        parsed = {
+            text: Location.parse(text)
+            for text in products.order_by().values_list("location", flat=True).distinct()
+        }
+        wanted = set(filter(None, parsed.values()))
+        unparsed = [text for text, location in parsed.items() if location is None]
+        existing = {
+            (city, region): pk
+            for pk, city, region in Location.objects.filter(
+                city__in={city for city, _ in wanted}
+            ).values_list("id", "city", "region")
+        }
+        new = wanted - existing.keys()
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would map {len(parsed) - len(unparsed)} location strings onto "
+                f"{len(wanted)} locations, {len(new)} of them new"
+            )
+            if unparsed:
+                self.stdout.write(f"Would skip {len(unparsed)} blank locations")
+            return
+
+        with transaction.atomic():
+            Location.objects.bulk_create(
+                [Location(city=city, region=region) for city, region in sorted(new)],
+                ignore_conflicts=True,
+            )
+            ids = dict(existing)
+            ids.update(
+                ((city, region), pk)
+                for pk, city, region in Location.objects.filter(
+                    city__in={city for city, _ in new}
+                ).values_list("id", "city", "region")
+            )
+
+            updated = 0
+            for text, location in parsed.items():
+                if location is None:
+                    continue
+                changes = {"normalized_location_id": ids[location]}
+                if options["rewrite"]:
+                    changes["location"] = Location.display_name(*location)
+                updated += products.filter(location=text).update(**changes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Mapped {updated} products onto {len(wanted)} locations, {len(new)} of them new"
+        ))
+        if unparsed:
+            self.stdout.write(self.style.WARNING(f"Skipped {len(unparsed)} blank locations"))
@@ -0,0 +1,89 @@
+"""Rebuild "customers also bought" neighbors from paid order history"""
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bangazonapi import cooccurrence
+from bangazonapi.models import AlsoBought, AlsoBoughtSource, OrderProduct
+from bangazonapi.streaming import batched
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts how often products are bought in the same paid orders and "
+        "stores each product's best neighbors for /products/:id/also_bought. "
+        "Only products whose paid orders changed since the last run are "
+        "recomputed unless --full is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every product. Needed after changing --neighbors or --min-orders.",
+        )
+        parser.add_argument(
+            "--neighbors",
+            type=int,
+            default=settings.ALSO_BOUGHT_NEIGHBORS,
+            help="Neighbors to keep per product.",
+        )
+        parser.add_argument(
+            "--min-orders",
+            type=int,
+            default=settings.ALSO_BOUGHT_MIN_ORDERS,
+            help="Fewest paid orders two products must share to be neighbors.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows deleted or inserted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        rows = OrderProduct.objects.filter(order__payment_type__isnull=False).values_list(
+            "order_id", "product_id"
+        )
+        pairs = cooccurrence.baskets(list(rows.iterator()))
+        ids, counts = cooccurrence.order_counts(pairs)
+        current = dict(zip(ids.tolist(), counts.tolist()))
+        stored = dict(AlsoBoughtSource.objects.values_list("product_id", "orders"))
+
+        changed = sorted(
+            product for product in current.keys() | stored.keys()
+            if options["full"] or current.get(product) != stored.get(product)
+        )
+        found = cooccurrence.neighbors(
+            pairs, changed, options["neighbors"], options["min_orders"]
+        )
+
+        batch_size = options["batch_size"]
+        with transaction.atomic():
+            for batch in batched(changed, batch_size):
+                AlsoBought.objects.filter(product_id__in=batch).delete()
+                AlsoBoughtSource.objects.filter(product_id__in=batch).delete()
+            AlsoBought.objects.bulk_create(
+                (
+                    AlsoBought(product_id=product, other_id=other, orders=together, score=score)
+                    for product, other, together, score in zip(
+                        found.product.tolist(), found.other.tolist(),
+                        found.together.tolist(), found.score.tolist(),
+                    )
+                ),
+                batch_size=batch_size,
+            )
+            AlsoBoughtSource.objects.bulk_create(
+                (
+                    AlsoBoughtSource(product_id=product, orders=current[product])
+                    for product in changed if product in current
+                ),
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {len(changed)} of {len(current)} sold products from "
+            f"{len(pairs)} paid line items, {len(found)} neighbors, "
+            f"in {perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,69 @@
+"""Rebuild trending scores from the timestamps of every interaction"""
+from time import perf_counter
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bangazonapi import trending
+from bangazonapi.models import OrderProduct, Product, ProductLike, ProductRating, ProductTrend
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes every product's trending score from its likes, ratings "
+        "and paid line items. Signals keep the scores current as they "
+        "happen. Run this to backfill them, or after changing "
+        "TRENDING_HALF_LIFE_HOURS or TRENDING_WEIGHTS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows inserted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        events = (
+            (trending.LIKE, ProductLike.objects.all()),
+            (trending.RATING, ProductRating.objects.all()),
+            (trending.SALE, OrderProduct.objects.filter(order__payment_type__isnull=False)),
+        )
+        products, terms = [], []
+        for kind, rows in events:
+            for product_id, created_at in rows.values_list("product_id", "created_at").iterator():
+                products.append(product_id)
+                terms.append(trending.log_term(kind, created_at))
+        products = np.array(products, dtype=np.int64)
+        terms = np.array(terms, dtype=np.float64)
+
+        # log(sum(exp(term))) per product, shifted by each product's
+        # largest term so nothing overflows
+        order = np.lexsort((terms, products))
+        products, terms = products[order], terms[order]
+        starts = np.flatnonzero(np.r_[True, products[1:] != products[:-1]])[:len(products)]
+        ids = products[starts]
+        if len(terms):
+            largest = np.maximum.reduceat(terms, starts)
+            shifted = np.exp(terms - np.repeat(largest, np.diff(np.r_[starts, len(terms)])))
+            scores = largest + np.log(np.add.reduceat(shifted, starts))
+        else:
+            scores = terms
+
+        categories = dict(Product.all_objects.values_list("id", "category_id"))
+        with transaction.atomic():
+            ProductTrend.objects.all().delete()
+            ProductTrend.objects.bulk_create(
+                (
+                    ProductTrend(product_id=product, category_id=categories[product], log_score=score)
+                    for product, score in zip(ids.tolist(), scores.tolist())
+                    if product in categories
+                ),
+                batch_size=options["batch_size"],
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {len(ids)} products from {len(terms)} events "
+            f"in {perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,36 @@
+"""Copy the primary SQLite database into each configured read replica"""
+import sqlite3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Copies the primary SQLite database into every DATABASE_REPLICAS file."
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                "No replicas configured. Set BANGAZON_REPLICA_DBS to a "
+                "comma-separated list of SQLite files."
+            )
+
+        primary = settings.DATABASES["default"]
+        if primary["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("sync_replicas only copies SQLite databases.")
+
+        source = sqlite3.connect(primary["NAME"])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                connections[alias].close()
+                name = settings.DATABASES[alias]["NAME"]
+                target = sqlite3.connect(name)
+                try:
+                    # The online backup API gives a consistent snapshot even
+                    # while the primary is taking writes
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(f"Copied primary to {alias} ({name})"))
+        finally:
+            source.close()
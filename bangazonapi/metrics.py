@@ -0,0 +1,397 @@
+"""Prometheus metrics shared by every worker process on a host
+
+Each process keeps its own counters in memory and periodically writes them
+to `METRICS_DIR/metrics-<pid>-<id>.json`. The `/metrics` endpoint merges
+every file in that directory, so any gunicorn worker can answer a scrape
+for the whole deployment without an external service. Files of workers
+that have died are folded into a single file when a scrape finds them.
+"""
+import fcntl
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+REQUEST_DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Totals of processes that have exited, and the lock guarding them
+RETIRED_FILE = "metrics-retired.json"
+RETIRED_LOCK = "retired.lock"
+
+
+class Metric:
+    """Name, help text and label names of an exposed metric"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames, buckets=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+
+
+class Counter(Metric):
+    kind = "counter"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+
+REQUEST_DURATION = Histogram(
+    "bangazon_request_duration_seconds",
+    "Wall time spent handling a request.",
+    ("view", "action"),
+    REQUEST_DURATION_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "bangazon_request_queries",
+    "SQL queries issued while handling a request.",
+    ("view", "action"),
+    QUERY_COUNT_BUCKETS,
+)
+REQUESTS = Counter(
+    "bangazon_requests_total",
+    "Requests handled.",
+    ("view", "action"),
+)
+REQUEST_ERRORS = Counter(
+    "bangazon_request_errors_total",
+    "Requests answered with a 4xx or 5xx status.",
+    ("view", "action", "status"),
+)
+CACHE_REQUESTS = Counter(
+    "bangazon_cache_requests_total",
+    "Cache lookups by result.",
+    ("cache", "result"),
+)
+CACHE_HIT_RATIO = Gauge(
+    "bangazon_cache_hit_ratio",
+    "Share of cache lookups that were hits.",
+    ("cache",),
+)
+DB_CONNECTIONS_OPENED = Counter(
+    "bangazon_db_connections_opened_total",
+    "Database connections opened.",
+    ("alias",),
+)
+DB_QUERIES = Counter(
+    "bangazon_db_queries_total",
+    "SQL queries issued during requests.",
+    ("alias",),
+)
+DB_QUERY_SECONDS = Counter(
+    "bangazon_db_query_seconds_total",
+    "Time spent in SQL queries during requests.",
+    ("alias",),
+)
+PROCESSES = Gauge(
+    "bangazon_worker_processes",
+    "Live worker processes reporting metrics.",
+    (),
+)
+
+METRICS = (
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUESTS,
+    REQUEST_ERRORS,
+    CACHE_REQUESTS,
+    CACHE_HIT_RATIO,
+    DB_CONNECTIONS_OPENED,
+    DB_QUERIES,
+    DB_QUERY_SECONDS,
+    PROCESSES,
+)
+
+
+def _label_key(metric, values):
+    return json.dumps(list(zip(metric.labelnames, values)))
+
+
+def _write(path, text):
+    """Atomically replace path, so readers never see a partial file"""
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(handle, "w") as output:
+        output.write(text)
+    os.replace(temporary, path)
+
+
+class ProcessMetrics:
+    """Metric values recorded by this process"""
+
+    def __init__(self, directory, flush_interval):
+        self.pid = os.getpid()
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.filename = os.path.join(
+            directory, f"metrics-{self.pid}-{uuid.uuid4().hex[:8]}.json"
+        )
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    def inc(self, metric, labels, amount=1):
+        key = _label_key(metric, labels)
+        with self.lock:
+            values = self.counters.setdefault(metric.name, {})
+            values[key] = values.get(key, 0) + amount
+
+    def observe(self, metric, labels, value):
+        key = _label_key(metric, labels)
+        with self.lock:
+            values = self.histograms.setdefault(metric.name, {})
+            series = values.get(key)
+            if series is None:
+                series = values[key] = {
+                    "buckets": [0] * (len(metric.buckets) + 1),
+                    "sum": 0,
+                }
+            index = len(metric.buckets)
+            for position, bound in enumerate(metric.buckets):
+                if value <= bound:
+                    index = position
+                    break
+            series["buckets"][index] += 1
+            series["sum"] += value
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Atomically replace this process's file in the shared directory"""
+        with self.lock:
+            payload = json.dumps(
+                {
+                    "pid": self.pid,
+                    "counters": self.counters,
+                    "histograms": self.histograms,
+                }
+            )
+            self.last_flush = time.monotonic()
+
+        os.makedirs(self.directory, exist_ok=True)
+        _write(self.filename, payload)
+
+
+_process_metrics = None
+_process_lock = threading.Lock()
+
+
+def process_metrics():
+    """This process's metrics, recreated after a fork"""
+    global _process_metrics
+    pid = os.getpid()
+    if _process_metrics is None or _process_metrics.pid != pid:
+        with _process_lock:
+            if _process_metrics is None or _process_metrics.pid != pid:
+                _process_metrics = ProcessMetrics(
+                    settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL
+                )
+    return _process_metrics
+
+
+def record_request(timing, status_code):
+    """Record a finished request from its RequestTiming"""
+    store = process_metrics()
+    view, _, action = (timing.route or "unresolved").partition(".")
+    labels = (view, action)
+
+    store.inc(REQUESTS, labels)
+    store.observe(REQUEST_DURATION, labels, timing.wall_time)
+    store.observe(REQUEST_QUERIES, labels, timing.queries)
+    if status_code >= 400:
+        store.inc(REQUEST_ERRORS, (view, action, str(status_code)))
+    for alias, (queries, seconds) in timing.aliases.items():
+        store.inc(DB_QUERIES, (alias,), queries)
+        store.inc(DB_QUERY_SECONDS, (alias,), seconds)
+
+    store.maybe_flush()
+
+
+def record_cache(cache, hit):
+    """Count a lookup against one of the application's caches"""
+    process_metrics().inc(CACHE_REQUESTS, (cache, "hit" if hit else "miss"))
+
+
+def _connection_opened(sender, connection, **kwargs):
+    process_metrics().inc(DB_CONNECTIONS_OPENED, (connection.alias,))
+
+
+connection_created.connect(_connection_opened)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(counters, histograms, payload):
+    """Add one process's payload to the running totals"""
+    for name, values in payload["counters"].items():
+        merged = counters.setdefault(name, {})
+        for key, value in values.items():
+            merged[key] = merged.get(key, 0) + value
+    for name, values in payload["histograms"].items():
+        merged = histograms.setdefault(name, {})
+        for key, series in values.items():
+            total = merged.get(key)
+            if total is None:
+                merged[key] = {
+                    "buckets": list(series["buckets"]),
+                    "sum": series["sum"],
+                }
+            else:
+                total["buckets"] = [
+                    a + b for a, b in zip(total["buckets"], series["buckets"])
+                ]
+                total["sum"] += series["sum"]
+
+
+def retire(directory, filenames):
+    """Fold the files of dead processes into RETIRED_FILE and remove them
+
+    Counters must not go backwards, so a dead worker's totals are kept
+    rather than dropped, but in one file however many workers have died.
+    The lock stops two scrapes from folding the same file twice.
+    """
+    with open(os.path.join(directory, RETIRED_LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        path = os.path.join(directory, RETIRED_FILE)
+        try:
+            with open(path) as source:
+                retired = json.load(source)
+        except FileNotFoundError:
+            retired = {"pid": None, "counters": {}, "histograms": {}}
+
+        folded = []
+        for filename in filenames:
+            try:
+                with open(os.path.join(directory, filename)) as source:
+                    payload = json.load(source)
+            except FileNotFoundError:
+                # Already folded by a concurrent scrape
+                continue
+            _merge(retired["counters"], retired["histograms"], payload)
+            folded.append(filename)
+
+        if folded:
+            _write(path, json.dumps(retired))
+            for filename in folded:
+                os.remove(os.path.join(directory, filename))
+
+
+def collect():
+    """Merge the files written by every process on this host
+
+    Files left by processes that have exited are retired on the way.
+
+    Returns:
+        tuple -- (counters, histograms, live process count)
+    """
+    store = process_metrics()
+    store.flush()
+
+    counters = {}
+    histograms = {}
+    live = 0
+    dead = []
+    for filename in os.listdir(store.directory):
+        if not (filename.startswith("metrics-") and filename.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(store.directory, filename)) as source:
+                payload = json.load(source)
+        except (OSError, ValueError):
+            continue
+
+        if payload["pid"] is not None:
+            if _pid_alive(payload["pid"]):
+                live += 1
+            else:
+                dead.append(filename)
+        _merge(counters, histograms, payload)
+
+    if dead:
+        retire(store.directory, dead)
+    return counters, histograms, live
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def render():
+    """Prometheus text exposition of the merged metrics"""
+    counters, histograms, live = collect()
+
+    hits = {}
+    for key, value in counters.get(CACHE_REQUESTS.name, {}).items():
+        pairs = dict(json.loads(key))
+        totals = hits.setdefault(pairs["cache"], [0, 0])
+        totals[0 if pairs["result"] == "hit" else 1] += value
+
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+        if metric is PROCESSES:
+            lines.append(f"{metric.name} {live}")
+        elif metric is CACHE_HIT_RATIO:
+            for cache, (hit, miss) in sorted(hits.items()):
+                ratio = hit / (hit + miss) if hit + miss else 0.0
+                labels = _format_labels([("cache", cache)])
+                lines.append(f"{metric.name}{labels} {_format_value(ratio)}")
+        elif metric.kind == "counter":
+            for key, value in sorted(counters.get(metric.name, {}).items()):
+                labels = _format_labels(json.loads(key))
+                lines.append(f"{metric.name}{labels} {_format_value(value)}")
+        elif metric.kind == "histogram":
+            for key, series in sorted(histograms.get(metric.name, {}).items()):
+                pairs = json.loads(key)
+                cumulative = 0
+                bounds = list(metric.buckets) + [math.inf]
+                for bound, count in zip(bounds, series["buckets"]):
+                    cumulative += count
+                    labels = _format_labels(pairs + [["le", _format_value(float(bound))]])
+                    lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(pairs)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(series['sum'])}")
+                lines.append(f"{metric.name}_count{labels} {cumulative}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,5 @@
+from .customer import CurrentCustomerMiddleware
+from .timing import RequestTimingMiddleware
+from .slowqueries import SlowQueryLogMiddleware
+from .replicas import ReplicaRoutingMiddleware
+from .profiling import ProfilingMiddleware
@@ -0,0 +1,38 @@
+"""Middleware that attaches the current customer to each request"""
+from django.utils.functional import SimpleLazyObject
+from bangazonapi.models import Customer
+
+
+def get_customer(request):
+    """Resolve the customer for the authenticated user, once per request
+
+    DRF authenticates inside the view and copies the user back onto the
+    underlying Django request, so this must run lazily, after the view
+    has started, rather than when the middleware is called.
+
+    Raises:
+        Customer.DoesNotExist -- The request has no customer profile
+    """
+    if not hasattr(request, "_cached_customer"):
+        user = request.user
+        if not user.is_authenticated:
+            raise Customer.DoesNotExist("Authentication required.")
+        request._cached_customer = Customer.objects.select_related("user").get(
+            user=user
+        )
+    return request._cached_customer
+
+
+class CurrentCustomerMiddleware:
+    """Sets `request.customer` to a lazily resolved Customer
+
+    The lookup happens the first time the attribute is used and the
+    result is shared by the view and every serializer in the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.customer = SimpleLazyObject(lambda: get_customer(request))
+        return self.get_response(request)
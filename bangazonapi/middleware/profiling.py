@@ -0,0 +1,57 @@
+"""Middleware that profiles a request when a staff user asks for it"""
+import time
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from bangazonapi import profiling
+from .timing import current_timing
+
+
+class ProfilingMiddleware:
+    """Answers `?__profile=cpu|mem` from staff with a profiler report
+
+    The report replaces the response body. The view's own status code
+    is sent in an `X-Profiled-Status` header, and the stored report's
+    name in `X-Profile-Report`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get(profiling.PARAMETER)
+        if mode not in profiling.MODES or not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+
+        user = profiling.staff_user(request)
+        if user is None:
+            return self.get_response(request)
+        if not profiling.allow(user):
+            return JsonResponse(
+                {"message": f"At most {settings.PROFILING_RATE_LIMIT} profiles per minute"}, status=429
+            )
+        if not profiling.profiler_lock.acquire(blocking=False):
+            return JsonResponse({"message": "Another request is being profiled"}, status=429)
+
+        try:
+            handle = lambda: self.get_response(request)
+            if mode == "cpu":
+                sort = request.GET.get("__profile_sort", "cumulative")
+                if sort not in profiling.SORT_KEYS:
+                    sort = "cumulative"
+                response, report, stats = profiling.profile_cpu(handle, sort)
+            else:
+                response, report = profiling.profile_memory(handle)
+                stats = None
+        finally:
+            profiling.profiler_lock.release()
+
+        timing = current_timing()
+        route = timing.route if timing and timing.route else "unresolved"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{mode}"
+        header = f"{request.method} {request.get_full_path()} -> {response.status_code} ({route})\n\n"
+        profiling.store_report(name, header + report, stats)
+
+        profiled = HttpResponse(header + report, content_type="text/plain; charset=utf-8")
+        profiled["X-Profiled-Status"] = str(response.status_code)
+        profiled["X-Profile-Report"] = name
+        return profiled
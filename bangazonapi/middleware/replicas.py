@@ -0,0 +1,30 @@
+"""Middleware that lets safe-method requests read from replicas"""
+from bangazonapi import dbrouters
+
+
+class ReplicaRoutingMiddleware:
+    """Routes reads for GET, HEAD and OPTIONS requests to read replicas
+
+    After a successful write the authenticated user is pinned to the
+    primary for `REPLICA_STICKY_SECONDS`, so their next reads see it. The
+    pin goes back to the client with the response, so it holds whichever
+    worker takes the next request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = dbrouters.begin_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            dbrouters.end_request(token)
+
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                dbrouters.stick_to_primary(request, user.pk)
+
+        dbrouters.pin_response(request, response)
+        return response
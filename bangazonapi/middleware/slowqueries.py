@@ -0,0 +1,14 @@
+"""Middleware that logs slow SQL issued while handling a request"""
+from django.conf import settings
+from bangazonapi import slowqueries
+
+
+class SlowQueryLogMiddleware:
+    """Logs queries slower than `SLOW_QUERY_THRESHOLD_MS` with their plans"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with slowqueries.slow_query_log(settings.SLOW_QUERY_THRESHOLD_MS):
+            return self.get_response(request)
@@ -0,0 +1,182 @@
+"""Middleware that measures where time goes in each request"""
+import json
+import logging
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+from bangazonapi import metrics
+
+logger = logging.getLogger("bangazonapi.timing")
+
+_current_timing = ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """Counters collected while a single request is handled"""
+
+    __slots__ = (
+        "route",
+        "started",
+        "wall_time",
+        "queries",
+        "sql_time",
+        "serialize_time",
+        "serializing",
+        "response_bytes",
+        "aliases",
+    )
+
+    def __init__(self):
+        self.route = None
+        self.started = perf_counter()
+        self.wall_time = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.response_bytes = None
+        self.aliases = {}
+
+    def as_dict(self):
+        return {
+            "route": self.route,
+            "wall_ms": round(self.wall_time * 1000, 2),
+            "queries": self.queries,
+            "sql_ms": round(self.sql_time * 1000, 2),
+            "serialize_ms": round(self.serialize_time * 1000, 2),
+            "bytes": self.response_bytes,
+        }
+
+    def server_timing(self):
+        """Value for the Server-Timing response header"""
+        return ", ".join(
+            (
+                f"app;dur={self.wall_time * 1000:.2f}",
+                f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries"',
+                f"serialize;dur={self.serialize_time * 1000:.2f}",
+            )
+        )
+
+
+def current_timing():
+    """The RequestTiming for the request being handled, if any"""
+    return _current_timing.get()
+
+
+def route_name(view_func, method):
+    """Tag a resolved view as `ViewSet.action`, e.g. `Profile.cart`"""
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        return view_func.__name__
+
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+def _record_query(execute, sql, params, many, context):
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = perf_counter() - start
+        timing.sql_time += elapsed
+        timing.queries += 1
+        per_alias = timing.aliases.setdefault(context["connection"].alias, [0, 0.0])
+        per_alias[0] += 1
+        per_alias[1] += elapsed
+
+
+def _timed_data(data_property):
+    """Wrap a serializer `data` property so the outermost call is timed
+
+    Serializer method fields often build nested serializers and read their
+    `data`, so only the first call in a request is counted.
+    """
+    fget = data_property.fget
+
+    @wraps(fget)
+    def data(self):
+        timing = _current_timing.get()
+        if timing is None or timing.serializing:
+            return fget(self)
+
+        timing.serializing = True
+        start = perf_counter()
+        try:
+            return fget(self)
+        finally:
+            timing.serialize_time += perf_counter() - start
+            timing.serializing = False
+
+    data.timed = True
+    return property(data)
+
+
+def instrument_serializers():
+    """Time `Serializer.data` and `ListSerializer.data` for every request"""
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(serializer_class.data.fget, "timed", False):
+            serializer_class.data = _timed_data(serializer_class.data)
+
+
+class RequestTimingMiddleware:
+    """Records wall time, SQL and serializer cost for every request
+
+    The totals are sent back in a `Server-Timing` header and logged as a
+    single JSON line on the `bangazonapi.timing` logger, and feed the
+    histograms served from `/metrics`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.emit_header = getattr(settings, "SERVER_TIMING_HEADER", True)
+        self.record_metrics = getattr(settings, "METRICS_ENABLED", True)
+        instrument_serializers()
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_record_query))
+                response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+
+        timing.wall_time = perf_counter() - timing.started
+        if timing.route is None:
+            timing.route = "unresolved"
+        if not response.streaming:
+            timing.response_bytes = len(response.content)
+
+        if self.emit_header:
+            response["Server-Timing"] = timing.server_timing()
+
+        if logger.isEnabledFor(logging.INFO):
+            record = timing.as_dict()
+            record.update(
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+            )
+            logger.info(json.dumps(record), extra={"timing": record})
+
+        if self.record_metrics:
+            metrics.record_request(timing, response.status_code)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = _current_timing.get()
+        if timing is not None:
+            timing.route = route_name(view_func, request.method)
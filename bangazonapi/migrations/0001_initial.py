@@ -0,0 +1,346 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:44
+
+import bangazonapi.models.archive
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted', models.DateTimeField(db_index=True, editable=False, null=True)),
+                ('deleted_by_cascade', models.BooleanField(default=False, editable=False)),
+                ('name', models.CharField(max_length=50)),
+                ('price', models.FloatField()),
+                ('description', models.CharField(max_length=255)),
+                ('quantity', models.IntegerField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('created_date', models.DateField(auto_now_add=True)),
+                ('location', models.CharField(max_length=50)),
+                ('image_path', models.ImageField(null=True, upload_to='products')),
+            ],
+            options={
+                'verbose_name': 'product',
+                'verbose_name_plural': 'products',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('merchant_name', models.CharField(max_length=25)),
+                ('account_number', models.CharField(max_length=25)),
+                ('customer_id', models.IntegerField(db_index=True)),
+                ('expiration_date', models.DateField()),
+                ('create_date', models.DateField()),
+                ('deleted', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedProduct',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50)),
+                ('customer_id', models.IntegerField(db_index=True)),
+                ('price', models.FloatField()),
+                ('description', models.CharField(max_length=255)),
+                ('quantity', models.IntegerField()),
+                ('created_date', models.DateField()),
+                ('category_id', models.IntegerField()),
+                ('location', models.CharField(max_length=50)),
+                ('image_path', models.CharField(max_length=100, null=True)),
+                ('deleted', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Customer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=15)),
+                ('address', models.CharField(max_length=55)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=50)),
+                ('region', models.CharField(blank=True, default='', max_length=50)),
+            ],
+            options={
+                'verbose_name': 'location',
+                'verbose_name_plural': 'locations',
+            },
+        ),
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_date', models.DateField(default='0000-00-00')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrderProduct',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted', models.DateTimeField(db_index=True, editable=False, null=True)),
+                ('deleted_by_cascade', models.BooleanField(default=False, editable=False)),
+                ('merchant_name', models.CharField(max_length=25)),
+                ('account_number', models.CharField(max_length=25)),
+                ('expiration_date', models.DateField(default='0000-00-00')),
+                ('create_date', models.DateField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductCategory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=55)),
+            ],
+            options={
+                'verbose_name': 'productcategory',
+                'verbose_name_plural': 'productcategories',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductLike',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductRating',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(5)])),
+                ('review', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'productrating',
+                'verbose_name_plural': 'productratings',
+            },
+        ),
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Store',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=55)),
+                ('description', models.CharField(max_length=155)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlsoBoughtSource',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='bangazonapi.product')),
+                ('orders', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductTrend',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='bangazonapi.product')),
+                ('log_score', models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlsoBought',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orders', models.IntegerField()),
+                ('score', models.FloatField()),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='bangazonapi.product')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='also_bought', to='bangazonapi.product')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='products', to='bangazonapi.customer'),
+        ),
+        migrations.CreateModel(
+            name='Favorite',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='favorited_stores', to='bangazonapi.customer')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='normalized_location',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='products', to='bangazonapi.location'),
+        ),
+        migrations.AddConstraint(
+            model_name='location',
+            constraint=models.UniqueConstraint(fields=('city', 'region'), name='unique_location_city_region'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='orderproduct',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='lineitems', to='bangazonapi.order'),
+        ),
+        migrations.AddField(
+            model_name='orderproduct',
+            name='product',
+            field=bangazonapi.models.archive.ArchivableForeignKey(archive='bangazonapi.ArchivedProduct', on_delete=django.db.models.deletion.DO_NOTHING, related_name='lineitems', to='bangazonapi.product'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='payment_types', to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='payment_type',
+            field=bangazonapi.models.archive.ArchivableForeignKey(archive='bangazonapi.ArchivedPayment', null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='bangazonapi.payment'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='products', to='bangazonapi.productcategory'),
+        ),
+        migrations.AddField(
+            model_name='productlike',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='liked_products', to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='productlike',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='likes', to='bangazonapi.product'),
+        ),
+        migrations.AddField(
+            model_name='productrating',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='productrating',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='bangazonapi.product'),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='customer', to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='bangazonapi.product'),
+        ),
+        migrations.AddField(
+            model_name='recommendation',
+            name='recommender',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='recommender', to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='store',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='store', to='bangazonapi.customer'),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='store',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='favorites', to='bangazonapi.store'),
+        ),
+        migrations.AddField(
+            model_name='producttrend',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bangazonapi.productcategory'),
+        ),
+        migrations.AddIndex(
+            model_name='alsobought',
+            index=models.Index(fields=['product', '-score'], name='alsobought_product_score'),
+        ),
+        migrations.AddConstraint(
+            model_name='alsobought',
+            constraint=models.UniqueConstraint(fields=('product', 'other'), name='unique_alsobought_product_other'),
+        ),
+        migrations.AddIndex(
+            model_name='orderproduct',
+            index=models.Index(fields=['product', 'order'], name='orderproduct_product_order'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['customer', 'id'], name='payment_live_customer'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['category'], name='product_live_category'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['customer'], name='product_live_customer'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['price'], name='product_live_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['normalized_location'], name='product_live_location'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted__isnull', True)), fields=['created_date'], name='product_live_created_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='productlike',
+            constraint=models.UniqueConstraint(fields=('customer', 'product'), name='unique_productlike_customer_product'),
+        ),
+        migrations.AddConstraint(
+            model_name='productrating',
+            constraint=models.UniqueConstraint(fields=('customer', 'product'), name='unique_productrating_customer_product'),
+        ),
+        migrations.AddConstraint(
+            model_name='recommendation',
+            constraint=models.UniqueConstraint(fields=('recommender', 'customer', 'product'), name='unique_recommendation_recommender_customer_product'),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('customer', 'store'), name='unique_favorite_customer_store'),
+        ),
+        migrations.AddIndex(
+            model_name='producttrend',
+            index=models.Index(fields=['-log_score'], name='producttrend_score'),
+        ),
+        migrations.AddIndex(
+            model_name='producttrend',
+            index=models.Index(fields=['category', '-log_score'], name='producttrend_category_score'),
+        ),
+    ]
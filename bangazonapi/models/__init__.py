@@ -1,4 +1,5 @@
 from .customer import Customer
+from .location import Location
 from .order import Order
 from .orderproduct import OrderProduct
 from .payment import Payment
@@ -8,4 +9,7 @@ from .recommendation import Recommendation
 from .favorite import Favorite
 from .productrating import ProductRating
 from .productlike import ProductLike
-from .store import Store
\ No newline at end of file
+from .store import Store
+from .archive import ArchivedProduct, ArchivedPayment
+from .alsobought import AlsoBought, AlsoBoughtSource
+from .producttrend import ProductTrend
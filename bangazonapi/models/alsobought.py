@@ -0,0 +1,36 @@
+from django.db import models
+
+
+class AlsoBought(models.Model):
+    """A product bought in the same paid orders as another
+
+    Rows are derived from order history by `manage.py refresh_also_bought`.
+    """
+
+    product = models.ForeignKey("Product", on_delete=models.CASCADE, related_name="also_bought")
+    other = models.ForeignKey("Product", on_delete=models.CASCADE, related_name="+")
+    # Paid orders holding both products
+    orders = models.IntegerField()
+    # Share of the product's paid orders that also held the other product
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "other"], name="unique_alsobought_product_other"),
+        ]
+        indexes = [
+            models.Index(fields=["product", "-score"], name="alsobought_product_score"),
+        ]
+
+
+class AlsoBoughtSource(models.Model):
+    """How many paid orders of a product the stored neighbors were built from
+
+    The refresh recomputes neighbors only for products whose count has
+    changed since.
+    """
+
+    product = models.OneToOneField(
+        "Product", on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    orders = models.IntegerField()
@@ -0,0 +1,134 @@
+from django.apps import apps
+from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+
+class ArchiveFallbackDescriptor(ForwardManyToOneDescriptor):
+    """Reads an archived row when the live row is gone"""
+
+    def get_object(self, instance):
+        try:
+            return super().get_object(instance)
+        except self.field.related_model.DoesNotExist:
+            archived = (
+                self.field.archive_model().objects.filter(pk=getattr(instance, self.field.attname)).first()
+            )
+            if archived is None:
+                raise
+            return archived.revive()
+
+
+class ArchivableForeignKey(models.ForeignKey):
+    """Foreign key to rows that `manage.py archive_deleted` may move away
+
+    An archived row keeps its id in the archive table, so the column has
+    no database constraint. Reading the relation falls back to the
+    archive and returns an unsaved live instance rebuilt from it, so
+    order history still resolves.
+    """
+
+    forward_related_accessor_class = ArchiveFallbackDescriptor
+
+    def __init__(self, to, on_delete, archive=None, **kwargs):
+        kwargs["db_constraint"] = False
+        self.archive = archive
+        super().__init__(to, on_delete, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop("db_constraint", None)
+        kwargs["archive"] = self.archive
+        return name, path, args, kwargs
+
+    def archive_model(self):
+        return apps.get_model(self.archive)
+
+
+class ArchivedProduct(models.Model):
+    """Soft-deleted product moved out of the live table
+
+    Keeps the original primary key and plain ids for the customer and
+    category, so an archived row can be matched back to old references.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=50)
+    customer_id = models.IntegerField(db_index=True)
+    price = models.FloatField()
+    description = models.CharField(max_length=255)
+    quantity = models.IntegerField()
+    created_date = models.DateField()
+    category_id = models.IntegerField()
+    location = models.CharField(max_length=50)
+    image_path = models.CharField(max_length=100, null=True)
+    deleted = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_live(cls, product):
+        return cls(
+            id=product.id,
+            name=product.name,
+            customer_id=product.customer_id,
+            price=product.price,
+            description=product.description,
+            quantity=product.quantity,
+            created_date=product.created_date,
+            category_id=product.category_id,
+            location=product.location,
+            image_path=product.image_path.name or None,
+            deleted=product.deleted,
+        )
+
+    def revive(self):
+        """An unsaved Product with this row's values"""
+        return apps.get_model("bangazonapi", "Product")(
+            id=self.id,
+            name=self.name,
+            customer_id=self.customer_id,
+            price=self.price,
+            description=self.description,
+            quantity=self.quantity,
+            created_date=self.created_date,
+            category_id=self.category_id,
+            location=self.location,
+            image_path=self.image_path or "",
+            deleted=self.deleted,
+        )
+
+
+class ArchivedPayment(models.Model):
+    """Soft-deleted payment type moved out of the live table"""
+
+    id = models.IntegerField(primary_key=True)
+    merchant_name = models.CharField(max_length=25)
+    account_number = models.CharField(max_length=25)
+    customer_id = models.IntegerField(db_index=True)
+    expiration_date = models.DateField()
+    create_date = models.DateField()
+    deleted = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_live(cls, payment):
+        return cls(
+            id=payment.id,
+            merchant_name=payment.merchant_name,
+            account_number=payment.account_number,
+            customer_id=payment.customer_id,
+            expiration_date=payment.expiration_date,
+            create_date=payment.create_date,
+            deleted=payment.deleted,
+        )
+
+    def revive(self):
+        """An unsaved Payment with this row's values"""
+        return apps.get_model("bangazonapi", "Payment")(
+            id=self.id,
+            merchant_name=self.merchant_name,
+            account_number=self.account_number,
+            customer_id=self.customer_id,
+            expiration_date=self.expiration_date,
+            create_date=self.create_date,
+            deleted=self.deleted,
+        )
@@ -6,8 +6,18 @@ from .productcategory import ProductCategory
 from .orderproduct import OrderProduct
 from safedelete.models import SafeDeleteModel
 from safedelete.models import SOFT_DELETE
+from .managers import InteractionManager
 
 class Favorite(models.Model):
 
     customer = models.ForeignKey(Customer, on_delete=models.DO_NOTHING, related_name='favorited_stores')
     store = models.ForeignKey(Store, on_delete=models.DO_NOTHING, related_name='favorites')
+
+    objects = InteractionManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "store"], name="unique_favorite_customer_store"
+            ),
+        ]
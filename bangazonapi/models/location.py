@@ -0,0 +1,51 @@
+from django.db import models
+from .managers import LocationManager
+
+
+class Location(models.Model):
+    """A city, and optionally its region, that products are listed in"""
+
+    city = models.CharField(max_length=50)
+    region = models.CharField(max_length=50, blank=True, default="")
+
+    objects = LocationManager()
+
+    @staticmethod
+    def parse(text):
+        """The (city, region) a free text location names
+
+        "  nashville,tn " and "Nashville, TN" both give ("Nashville", "TN").
+        Regions of up to three letters are taken to be abbreviations.
+
+        Returns:
+            tuple -- City and region, or None for blank text
+        """
+        city, _, region = " ".join((text or "").split()).partition(",")
+        city = " ".join(word.capitalize() for word in city.split())
+        region = region.strip()
+        if len(region) <= 3:
+            region = region.upper()
+        else:
+            region = " ".join(word.capitalize() for word in region.split())
+        if not city:
+            return None
+        return city, region
+
+    @staticmethod
+    def display_name(city, region):
+        return f"{city}, {region}" if region else city
+
+    @property
+    def name(self):
+        return self.display_name(self.city, self.region)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = "location"
+        verbose_name_plural = "locations"
+        # Also serves equality lookups on city alone
+        constraints = [
+            models.UniqueConstraint(fields=["city", "region"], name="unique_location_city_region"),
+        ]
@@ -0,0 +1,131 @@
+from django.db import connections, models, router
+from django.db.models import Model
+from django.db.models.signals import post_save
+
+
+class InteractionManager(models.Manager):
+    """Manager for customer interaction rows guarded by a unique constraint
+
+    Inserts use `INSERT ... ON CONFLICT DO NOTHING`, so two concurrent
+    requests cannot both create a row and neither of them fails. Upserts
+    use `ON CONFLICT (...) DO UPDATE` the same way. A row that is inserted
+    still sends `post_save`, with an instance that has the inserted values
+    but no primary key.
+    """
+
+    def _insert(self, values):
+        """Connection, fields, parameters and INSERT statement for values"""
+        meta = self.model._meta
+        # Raw SQL skips model defaults such as created_at, so add them here
+        for field in meta.concrete_fields:
+            if field.name not in values and not field.primary_key and field.has_default():
+                values[field.name] = field.get_default()
+        fields = [meta.get_field(name) for name in values]
+        connection = connections[router.db_for_write(self.model)]
+        quote = connection.ops.quote_name
+
+        params = []
+        for field, value in zip(fields, values.values()):
+            if isinstance(value, Model):
+                value = value.pk
+            params.append(field.get_db_prep_save(value, connection))
+
+        sql = "INSERT INTO {table} ({columns}) VALUES ({placeholders})".format(
+            table=quote(meta.db_table),
+            columns=", ".join(quote(field.column) for field in fields),
+            placeholders=", ".join(["%s"] * len(fields)),
+        )
+        return connection, fields, params, sql
+
+    def _inserted(self, connection, values):
+        post_save.send(
+            sender=self.model,
+            instance=self.model(**values),
+            created=True,
+            raw=False,
+            using=connection.alias,
+            update_fields=None,
+        )
+
+    def _from_db(self, field, value, connection):
+        """A raw column value converted as a queryset would convert it"""
+        expression = field.get_col(self.model._meta.db_table)
+        converters = connection.ops.get_db_converters(expression) + expression.get_db_converters(connection)
+        for converter in converters:
+            value = converter(value, expression, connection)
+        return value
+
+    def insert_ignore(self, **values):
+        """Insert a row unless it would violate a unique constraint
+
+        Returns:
+            bool -- True if a row was inserted
+        """
+        connection, _, params, sql = self._insert(values)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} ON CONFLICT DO NOTHING", params)
+            inserted = cursor.rowcount == 1
+
+        if inserted:
+            self._inserted(connection, values)
+        return inserted
+
+    def upsert(self, defaults, **lookup):
+        """Insert a row, or update `defaults` on the row matching `lookup`
+
+        One `INSERT ... ON CONFLICT (lookup) DO UPDATE` statement, so it is
+        atomic without a transaction. The lookup must be the fields of a
+        unique constraint. SQLite cannot say which of the two happened,
+        so the statement returns the columns the update leaves alone,
+        such as `created_at`. They only hold the values just sent when
+        the row is new.
+
+        Returns:
+            bool -- True if a row was inserted rather than updated
+        """
+        values = {**lookup, **defaults}
+        connection, fields, params, sql = self._insert(values)
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+
+        conflict = [meta.get_field(name).column for name in lookup]
+        updated = [meta.get_field(name).column for name in defaults]
+        untouched = [
+            (position, field.column) for position, field in enumerate(fields)
+            if field.name not in lookup and field.name not in defaults
+        ]
+        if not untouched:
+            raise ValueError(
+                f"{meta.label} needs a column with a default, such as created_at, to upsert"
+            )
+
+        sql += " ON CONFLICT ({conflict}) DO UPDATE SET {assignments} RETURNING {returning}".format(
+            conflict=", ".join(quote(column) for column in conflict),
+            assignments=", ".join(f"{quote(column)} = excluded.{quote(column)}" for column in updated),
+            returning=", ".join(quote(column) for _, column in untouched),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            returned = cursor.fetchone()
+
+        inserted = all(
+            self._from_db(fields[position], value, connection) == values[fields[position].name]
+            for (position, _), value in zip(untouched, returned)
+        )
+        if inserted:
+            self._inserted(connection, values)
+        return inserted
+
+
+class LocationManager(models.Manager):
+    def for_text(self, text):
+        """The location free text names, created if it is new
+
+        Returns:
+            Location -- Or None for blank text
+        """
+        parsed = self.model.parse(text)
+        if parsed is None:
+            return None
+        city, region = parsed
+        return self.get_or_create(city=city, region=region)[0]
@@ -1,10 +1,13 @@
 """Customer order model"""
 from django.db import models
+from .archive import ArchivableForeignKey
 from .customer import Customer
 from .payment import Payment
 
 
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.DO_NOTHING,)
-    payment_type = models.ForeignKey(Payment, on_delete=models.DO_NOTHING, null=True)
+    payment_type = ArchivableForeignKey(
+        Payment, on_delete=models.DO_NOTHING, null=True, archive="bangazonapi.ArchivedPayment"
+    )
     created_date = models.DateField(default="0000-00-00",)
@@ -1,4 +1,6 @@
 from django.db import models
+from django.utils import timezone
+from .archive import ArchivableForeignKey
 
 
 class OrderProduct(models.Model):
@@ -7,6 +9,17 @@ class OrderProduct(models.Model):
         "Order", on_delete=models.DO_NOTHING, related_name="lineitems"
     )
 
-    product = models.ForeignKey(
-        "Product", on_delete=models.DO_NOTHING, related_name="lineitems"
+    product = ArchivableForeignKey(
+        "Product", on_delete=models.DO_NOTHING, related_name="lineitems",
+        archive="bangazonapi.ArchivedProduct",
     )
+    # When the product went into the cart
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # A cart may hold the same product more than once, so this is an
+        # index rather than a unique constraint. It covers sales counts per
+        # product joined to their orders.
+        indexes = [
+            models.Index(fields=["product", "order"], name="orderproduct_product_order"),
+        ]
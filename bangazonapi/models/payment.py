@@ -11,3 +11,13 @@ class Payment(SafeDeleteModel):
     customer = models.ForeignKey(Customer, on_delete=models.DO_NOTHING, related_name="payment_types")
     expiration_date = models.DateField(default="0000-00-00",)
     create_date = models.DateField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Payments.list pages through a customer's payment types by id
+            models.Index(
+                fields=["customer", "id"],
+                condition=models.Q(deleted__isnull=True),
+                name="payment_live_customer",
+            ),
+        ]
@@ -3,6 +3,7 @@ from django.db import models
 from safedelete.models import SafeDeleteModel
 from safedelete.models import SOFT_DELETE
 from .customer import Customer
+from .location import Location
 from .productcategory import ProductCategory
 from .orderproduct import OrderProduct
 from .productrating import ProductRating
@@ -31,6 +32,11 @@ class Product(SafeDeleteModel):
     location = models.CharField(
         max_length=50,
     )
+    # `location` parsed into a shared row, for indexed filters and counts.
+    # `manage.py normalize_locations` fills it in for older products.
+    normalized_location = models.ForeignKey(
+        Location, on_delete=models.DO_NOTHING, related_name="products", null=True
+    )
     image_path = models.ImageField(
         upload_to="products",
         height_field=None,
@@ -84,3 +90,32 @@ class Product(SafeDeleteModel):
     class Meta:
         verbose_name = "product"
         verbose_name_plural = "products"
+        # Soft-deleted rows stay in the table, and every query filters on
+        # `deleted IS NULL`, so index only the live rows
+        indexes = [
+            models.Index(
+                fields=["category"],
+                condition=models.Q(deleted__isnull=True),
+                name="product_live_category",
+            ),
+            models.Index(
+                fields=["customer"],
+                condition=models.Q(deleted__isnull=True),
+                name="product_live_customer",
+            ),
+            models.Index(
+                fields=["price"],
+                condition=models.Q(deleted__isnull=True),
+                name="product_live_price",
+            ),
+            models.Index(
+                fields=["normalized_location"],
+                condition=models.Q(deleted__isnull=True),
+                name="product_live_location",
+            ),
+            models.Index(
+                fields=["created_date"],
+                condition=models.Q(deleted__isnull=True),
+                name="product_live_created_date",
+            ),
+        ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from .customer import Customer
+from .managers import InteractionManager
 
 
 class ProductLike(models.Model):
@@ -9,3 +11,13 @@ class ProductLike(models.Model):
     product = models.ForeignKey(
         "Product", on_delete=models.CASCADE, related_name="likes"
     )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = InteractionManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "product"], name="unique_productlike_customer_product"
+            ),
+        ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MaxValueValidator, MinValueValidator
 from .customer import Customer
+from .managers import InteractionManager
 
 
 class ProductRating(models.Model):
@@ -9,10 +11,18 @@ class ProductRating(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     rating = models.IntegerField(validators=[MinValueValidator(0), MaxValueValidator(5)])
     review = models.CharField(max_length=50)
+    created_at = models.DateTimeField(default=timezone.now)
 
-class Meta:
-    verbose_name = ("productrating")
-    verbose_name_plural = ("productratings")
+    objects = InteractionManager()
+
+    class Meta:
+        verbose_name = ("productrating")
+        verbose_name_plural = ("productratings")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "product"], name="unique_productrating_customer_product"
+            ),
+        ]
 
 def __str__(self):
     return self.rating
@@ -0,0 +1,27 @@
+from django.db import models
+from .managers import InteractionManager
+
+
+class ProductTrend(models.Model):
+    """A product's time-decayed interaction score, kept in ranked order
+
+    See bangazonapi/trending.py for how `log_score` is defined and kept
+    current.
+    """
+
+    product = models.OneToOneField(
+        "Product", on_delete=models.CASCADE, primary_key=True, related_name="trend"
+    )
+    # Copied from the product, so each category is its own ranked index
+    category = models.ForeignKey(
+        "ProductCategory", on_delete=models.DO_NOTHING, related_name="+"
+    )
+    log_score = models.FloatField()
+
+    objects = InteractionManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-log_score"], name="producttrend_score"),
+            models.Index(fields=["category", "-log_score"], name="producttrend_category_score"),
+        ]
@@ -1,6 +1,7 @@
 from django.db import models
 from .customer import Customer
 from .product import Product
+from .managers import InteractionManager
 
 
 class Recommendation(models.Model):
@@ -8,3 +9,13 @@ class Recommendation(models.Model):
     customer = models.ForeignKey(Customer, related_name='customer', on_delete=models.DO_NOTHING,)
     product = models.ForeignKey(Product, on_delete=models.DO_NOTHING,)
     recommender = models.ForeignKey(Customer, related_name='recommender', on_delete=models.DO_NOTHING,)
+
+    objects = InteractionManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recommender", "customer", "product"],
+                name="unique_recommendation_recommender_customer_product",
+            ),
+        ]
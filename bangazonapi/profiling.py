@@ -0,0 +1,128 @@
+"""On-demand cProfile and tracemalloc reports for staff requests
+
+A staff user adds `?__profile=cpu` or `?__profile=mem` to any request.
+The request is handled as usual under the chosen profiler. The response
+is then replaced with a plain text report, and the report is written
+to `PROFILING_DIR` so it can be compared with later runs.
+
+Profiling is switched off with `PROFILING_ENABLED`, limited to
+`PROFILING_RATE_LIMIT` reports per staff user per minute, and only one
+request per process is profiled at a time. Requests from anyone else
+ignore the parameter.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+PARAMETER = "__profile"
+MODES = ("cpu", "mem")
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+# cProfile and tracemalloc are both process-wide
+profiler_lock = threading.Lock()
+
+
+def staff_user(request):
+    """The staff user behind the request's token, if there is one
+
+    DRF authenticates inside the view, which is too late to decide
+    whether to profile the view, so the token is checked here.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+
+    keyword, _, key = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if keyword != "Token" or not key:
+        return None
+    token = Token.objects.select_related("user").filter(key=key).first()
+    if token is None or not token.user.is_active or not token.user.is_staff:
+        return None
+    return token.user
+
+
+def allow(user):
+    """Count a profile against the user's budget for this minute
+
+    Returns:
+        bool -- False if the user has used up this minute's profiles
+    """
+    key = f"profile-rate:{user.pk}:{int(time.time() // 60)}"
+    cache.add(key, 0, 60)
+    try:
+        return cache.incr(key) <= settings.PROFILING_RATE_LIMIT
+    except ValueError:
+        # The key expired between add and incr
+        return True
+
+
+def profile_cpu(handle, sort="cumulative", limit=40):
+    """Run `handle` under cProfile
+
+    Returns:
+        tuple -- handle's result, the text report and the raw stats
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(handle)
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return result, stream.getvalue(), stats
+
+
+def profile_memory(handle, limit=30, frames=10):
+    """Run `handle` under tracemalloc
+
+    Returns:
+        tuple -- handle's result and the text report
+    """
+    tracemalloc.start(frames)
+    try:
+        result = handle()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    lines = [
+        f"Peak traced memory: {peak / 1024:.1f} KiB, still allocated: {current / 1024:.1f} KiB",
+        "",
+        f"Top {limit} allocations still held at the end of the request, by line:",
+    ]
+    for index, stat in enumerate(snapshot.statistics("lineno")[:limit], 1):
+        frame = stat.traceback[0]
+        lines.append(
+            f"{index:>3}. {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks"
+        )
+    return result, "\n".join(lines) + "\n"
+
+
+def store_report(name, text, stats=None):
+    """Write a report, and pstats data for CPU profiles, to PROFILING_DIR
+
+    Only the newest PROFILING_KEEP reports are kept.
+    """
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    with open(os.path.join(settings.PROFILING_DIR, f"{name}.txt"), "w", encoding="utf-8") as report:
+        report.write(text)
+    if stats is not None:
+        stats.dump_stats(os.path.join(settings.PROFILING_DIR, f"{name}.prof"))
+
+    reports = sorted(
+        entry.path for entry in os.scandir(settings.PROFILING_DIR) if entry.name.endswith(".txt")
+    )
+    for stale in reports[: -settings.PROFILING_KEEP or None]:
+        for path in (stale, stale[: -len(".txt")] + ".prof"):
+            if os.path.exists(path):
+                os.remove(path)
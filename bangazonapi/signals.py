@@ -0,0 +1,106 @@
+"""Receivers that keep the autocomplete index and trending scores current"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from bangazonapi import autocomplete, trending
+from bangazonapi.models import (
+    Favorite, Order, OrderProduct, Product, ProductLike, ProductRating, ProductTrend, Store
+)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, raw=False, **kwargs):
+    # Soft deletes are saves, and refreshing drops the deleted product
+    if not raw:
+        autocomplete.refresh_products([instance.pk])
+
+
+@receiver(post_save, sender=ProductLike)
+@receiver(post_delete, sender=ProductLike)
+@receiver(post_delete, sender=OrderProduct)
+def product_score_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete.refresh_products([instance.product_id])
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, raw=False, **kwargs):
+    # Line items count as sold once their order has been paid for
+    if raw or instance.payment_type_id is None or autocomplete.loaded() is None:
+        return
+    autocomplete.refresh_products(
+        OrderProduct.objects.filter(order=instance).values_list("product_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def store_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete.refresh_store(instance.pk)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def store_score_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete.refresh_store(instance.store_id)
+
+
+@receiver(post_save, sender=ProductLike)
+def like_trending(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        trending.record(trending.LIKE, instance.product_id, instance.created_at)
+
+
+@receiver(post_delete, sender=ProductLike)
+def unlike_trending(sender, instance, **kwargs):
+    trending.retract(trending.LIKE, instance.product_id, instance.created_at)
+
+
+@receiver(post_save, sender=ProductRating)
+def rating_trending(sender, instance, created, raw=False, **kwargs):
+    # Changing a rating is not a new event, so only the first one counts
+    if created and not raw:
+        trending.record(trending.RATING, instance.product_id, instance.created_at)
+
+
+@receiver(post_delete, sender=ProductRating)
+def unrating_trending(sender, instance, **kwargs):
+    trending.retract(trending.RATING, instance.product_id, instance.created_at)
+
+
+@receiver(pre_save, sender=Order)
+def order_paying(sender, instance, raw=False, **kwargs):
+    # Remember whether this save is the one that pays for the order
+    instance._paying = (
+        not raw
+        and instance.payment_type_id is not None
+        and not Order.objects.filter(pk=instance.pk, payment_type__isnull=False).exists()
+    )
+
+
+@receiver(post_save, sender=Order)
+def order_paid_trending(sender, instance, raw=False, **kwargs):
+    if not getattr(instance, "_paying", False):
+        return
+    instance._paying = False
+    for product_id, created_at in OrderProduct.objects.filter(order=instance).values_list(
+        "product_id", "created_at"
+    ):
+        trending.record(trending.SALE, product_id, created_at)
+
+
+@receiver(post_delete, sender=OrderProduct)
+def unsold_trending(sender, instance, **kwargs):
+    if Order.objects.filter(pk=instance.order_id, payment_type__isnull=False).exists():
+        trending.retract(trending.SALE, instance.product_id, instance.created_at)
+
+
+@receiver(post_save, sender=Product)
+def product_category_trending(sender, instance, raw=False, **kwargs):
+    # Trends are ranked per category, so they follow the product's
+    if not raw:
+        ProductTrend.objects.filter(product_id=instance.pk).exclude(
+            category_id=instance.category_id
+        ).update(category_id=instance.category_id)
@@ -0,0 +1,258 @@
+"""Content-based similar products from a TF-IDF index of names and descriptions
+
+Each product is a vector of TF-IDF weights over the words of its name
+and description, with name words counted `NAME_WEIGHT` times. Its
+category is one more term. Terms are hashed into
+`SIMILAR_PRODUCTS_DIMENSIONS` columns with a sign, so the vocabulary
+never has to be refit and a product can be embedded on its own.
+Vectors are L2 normalized, so a dot product is the cosine similarity.
+
+`manage.py build_similar_products` computes the vectors in batches with
+NumPy and writes them to `SIMILAR_PRODUCTS_DIR`:
+
+- a float32 matrix with one row per product, memory-mapped by readers
+- the product ids of its rows, sorted
+- a fingerprint of each product's text, for incremental builds
+- the document frequency of every column
+- `meta.json`, which names the files of the current version
+
+A build reuses the rows of products whose fingerprint is unchanged and
+only embeds the new and changed ones. Reused rows keep the IDF weights
+they were built with. Once more than `SIMILAR_PRODUCTS_REBUILD_FRACTION`
+of the products have changed since the last full build, every row is
+rebuilt. New files are written under a new version and `meta.json` is
+swapped in last. Readers notice the new version on their next lookup,
+and lookups already running keep the mapping they opened.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from django.conf import settings
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+# A name word counts as much as this many description words
+NAME_WEIGHT = 2.0
+
+META = "meta.json"
+
+_loaded = None
+_lock = threading.Lock()
+
+
+def terms(name, description, category_id):
+    """Weighted term counts for one product"""
+    counts = {}
+    for text, weight in ((name, NAME_WEIGHT), (description, 1.0)):
+        for token in TOKEN.findall((text or "").lower()):
+            counts[token] = counts.get(token, 0.0) + weight
+    counts[f"category:{category_id}"] = 1.0
+    return counts
+
+
+def fingerprint(name, description, category_id):
+    digest = hashlib.blake2b(
+        f"{name}\x00{description}\x00{category_id}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _column(term, dimensions):
+    # crc32 is stable across processes, unlike hash()
+    code = zlib.crc32(term.encode())
+    return code % dimensions, 1.0 if code & 0x80000000 else -1.0
+
+
+def term_frequencies(products, dimensions):
+    """Signed sublinear term frequencies, one row per (name, description, category_id)"""
+    rows, columns, values = [], [], []
+    for row, product in enumerate(products):
+        for term, count in terms(*product).items():
+            column, sign = _column(term, dimensions)
+            rows.append(row)
+            columns.append(column)
+            values.append(sign * (1.0 + np.log(count)))
+    matrix = np.zeros((len(products), dimensions), dtype=np.float32)
+    # Terms that hash to the same column add up
+    np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)),
+              np.array(values, dtype=np.float32))
+    return matrix
+
+
+def inverse_document_frequencies(df, documents):
+    return (np.log((1.0 + documents) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def weigh(frequencies, idf):
+    """TF-IDF vectors with unit length, from term_frequencies() output"""
+    vectors = frequencies * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class SimilarityIndex:
+    """One version of the on-disk index, memory-mapped"""
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self.dimensions = meta["dimensions"]
+        self.ids = np.load(self._path("ids"))
+        self.fingerprints = np.load(self._path("fingerprints"))
+        self.df = np.load(self._path("df"))
+        self.idf = inverse_document_frequencies(self.df, meta["documents"])
+        if len(self.ids):
+            self.vectors = np.memmap(
+                self._path("vectors"), dtype=np.float32, mode="r",
+                shape=(len(self.ids), self.dimensions),
+            )
+        else:
+            self.vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+
+    def _path(self, name):
+        return os.path.join(self.directory, self.meta["files"][name])
+
+    @classmethod
+    def open(cls, directory):
+        """The current version in directory, or None if nothing was built"""
+        try:
+            with open(os.path.join(directory, META)) as meta:
+                return cls(directory, json.load(meta))
+        except FileNotFoundError:
+            return None
+
+    def row(self, product_id):
+        position = np.searchsorted(self.ids, product_id)
+        if position < len(self.ids) and self.ids[position] == product_id:
+            return position
+        return None
+
+    def vector(self, product_id, name, description, category_id):
+        """The product's stored vector, or one embedded now if it is newer"""
+        position = self.row(product_id)
+        if position is not None:
+            return np.asarray(self.vectors[position])
+        return weigh(term_frequencies([(name, description, category_id)], self.dimensions), self.idf)[0]
+
+    def nearest(self, vector, count, exclude=None):
+        """The count best (product id, similarity) pairs, best first"""
+        scores = np.asarray(self.vectors @ vector)
+        if exclude is not None:
+            position = self.row(exclude)
+            if position is not None:
+                scores[position] = -np.inf
+        count = min(count, len(scores))
+        if count <= 0:
+            return []
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.lexsort((self.ids[best], -scores[best]))]
+        return [
+            (int(product_id), float(score))
+            for product_id, score in zip(self.ids[best], scores[best]) if score > 0
+        ]
+
+
+def _write(directory, version, ids, fingerprints, df, vectors, meta):
+    """Write a new version, then point meta.json at it"""
+    files = {
+        "ids": f"ids-{version}.npy",
+        "fingerprints": f"fingerprints-{version}.npy",
+        "df": f"df-{version}.npy",
+        "vectors": f"vectors-{version}.f32",
+    }
+    np.save(os.path.join(directory, files["ids"]), ids)
+    np.save(os.path.join(directory, files["fingerprints"]), fingerprints)
+    np.save(os.path.join(directory, files["df"]), df)
+    vectors.astype(np.float32, copy=False).tofile(os.path.join(directory, files["vectors"]))
+
+    meta = {**meta, "version": version, "files": files}
+    staged = os.path.join(directory, f"{META}.{version}")
+    with open(staged, "w") as out:
+        json.dump(meta, out)
+    os.replace(staged, os.path.join(directory, META))
+
+    # Keep the previous version for readers that read the old meta.json
+    # but have not opened its files yet. Readers that already opened a
+    # version keep their mappings.
+    for name in os.listdir(directory):
+        kind, _, rest = name.partition("-")
+        built = rest.split(".")[0]
+        if kind in files and built.isdigit() and int(built) < version - 1:
+            os.remove(os.path.join(directory, name))
+    return meta
+
+
+def build(products, directory=None, full=False):
+    """Bring the index up to date with products
+
+    Arguments:
+        products -- (id, name, description, category_id) rows
+        full -- Rebuild every row instead of only the changed ones
+
+    Returns:
+        dict -- The new meta, with the counts of embedded and reused rows
+    """
+    directory = directory or settings.SIMILAR_PRODUCTS_DIR
+    dimensions = settings.SIMILAR_PRODUCTS_DIMENSIONS
+    os.makedirs(directory, exist_ok=True)
+
+    products = sorted(products)
+    ids = np.array([row[0] for row in products], dtype=np.int64)
+    texts = [row[1:] for row in products]
+    fingerprints = np.array([fingerprint(*text) for text in texts], dtype=np.int64)
+
+    old = SimilarityIndex.open(directory)
+    if old is not None and old.dimensions != dimensions:
+        old = None
+    version = old.meta["version"] + 1 if old is not None else 1
+    # An index built from an empty catalog has no rows to reuse
+    full = full or old is None or not len(old.ids)
+
+    if not full:
+        position = np.searchsorted(old.ids, ids)
+        position = np.minimum(position, len(old.ids) - 1)
+        found = old.ids[position] == ids
+        kept = found & (old.fingerprints[position] == fingerprints)
+        # Old rows whose product changed or is gone
+        stale = np.ones(len(old.ids), dtype=bool)
+        stale[position[kept]] = False
+        changed = int(stale.sum() + (~kept).sum() - (found & ~kept).sum())
+        drift = old.meta["drift"] + changed
+        full = drift > settings.SIMILAR_PRODUCTS_REBUILD_FRACTION * max(len(ids), 1)
+
+    if full:
+        frequencies = term_frequencies(texts, dimensions)
+        df = np.count_nonzero(frequencies, axis=0).astype(np.int64)
+        vectors = weigh(frequencies, inverse_document_frequencies(df, len(ids)))
+        meta = {"dimensions": dimensions, "documents": len(ids), "drift": 0,
+                "embedded": len(ids), "reused": 0}
+        return _write(directory, version, ids, fingerprints, df, vectors, meta)
+
+    embed = np.flatnonzero(~kept)
+    frequencies = term_frequencies([texts[row] for row in embed], dimensions)
+    df = old.df - np.count_nonzero(old.vectors[stale], axis=0) + np.count_nonzero(frequencies, axis=0)
+    vectors = np.empty((len(ids), dimensions), dtype=np.float32)
+    vectors[kept] = old.vectors[position[kept]]
+    vectors[embed] = weigh(frequencies, inverse_document_frequencies(df, len(ids)))
+    meta = {"dimensions": dimensions, "documents": len(ids), "drift": drift,
+            "embedded": len(embed), "reused": int(kept.sum())}
+    return _write(directory, version, ids, fingerprints, df, vectors, meta)
+
+
+def index():
+    """The current index in SIMILAR_PRODUCTS_DIR, reopened when a build replaces it"""
+    global _loaded
+    directory = settings.SIMILAR_PRODUCTS_DIR
+    try:
+        stamp = (directory, os.stat(os.path.join(directory, META)).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded is None or _loaded[0] != stamp:
+            _loaded = (stamp, SimilarityIndex.open(directory))
+        return _loaded[1]
@@ -0,0 +1,160 @@
+"""Slow query log with SQLite query plans
+
+Queries slower than `SLOW_QUERY_THRESHOLD_MS` are written as JSON lines to
+the `bangazonapi.slowqueries` logger, which settings route to a rotating
+file at `SLOW_QUERY_LOG`. Each entry records the SQL, its parameters, the
+view or serializer frame that issued it and `EXPLAIN QUERY PLAN` output,
+so full table scans show up before customers notice them. Parameters of
+statements on tokens, sessions and passwords are redacted.
+"""
+import json
+import logging
+import os
+import sys
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from bangazonapi.middleware.timing import current_timing
+
+logger = logging.getLogger("bangazonapi.slowqueries")
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MIDDLEWARE_DIR = os.path.join(APP_DIR, "middleware")
+# Statements naming any of these bind API tokens, session keys or password
+# hashes, so their parameters are logged as placeholders
+SECRET_IDENTIFIERS = ('"authtoken_token"', '"django_session"', '"password"')
+REDACTED = "[redacted]"
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _redacted(value):
+    return REDACTED
+
+
+def _params(sql, params):
+    if params is None:
+        return None
+    secret = any(identifier in sql for identifier in SECRET_IDENTIFIERS)
+    convert = _redacted if secret else _jsonable
+    if isinstance(params, dict):
+        return {key: convert(value) for key, value in params.items()}
+    return [convert(value) for value in params]
+
+
+def calling_frame():
+    """The innermost application frame outside of the instrumentation"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(APP_DIR)
+            and filename != __file__
+            and not filename.startswith(MIDDLEWARE_DIR)
+        ):
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def query_plan(connection, sql, params):
+    """`EXPLAIN QUERY PLAN` rows for a statement, or None off SQLite"""
+    rows = query_plan_rows(connection, sql, params)
+    return None if rows is None else [detail for _, _, detail in rows]
+
+
+def query_plan_rows(connection, sql, params):
+    """`EXPLAIN QUERY PLAN` as (id, parent id, detail) rows, or None off SQLite
+
+    Uses the backend cursor directly so the EXPLAIN is not itself timed
+    or logged by the execute wrappers.
+    """
+    if connection.vendor != "sqlite":
+        return None
+
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [(row[0], row[1], row[-1]) for row in cursor.fetchall()]
+    except Exception as ex:
+        return [(0, 0, f"EXPLAIN failed: {ex}")]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Execute wrapper that logs statements slower than a threshold"""
+
+    def __init__(self, threshold_ms):
+        self.threshold = threshold_ms / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = perf_counter() - start
+        if elapsed >= self.threshold:
+            self.record(sql, params, many, context["connection"], elapsed)
+        return result
+
+    def record(self, sql, params, many, connection, elapsed):
+        timing = current_timing()
+        plan_params = params[0] if many and params else params
+        entry = {
+            "logged_at": timezone.now().isoformat(),
+            "duration_ms": round(elapsed * 1000, 2),
+            "alias": connection.alias,
+            "route": timing.route if timing else None,
+            "caller": calling_frame(),
+            "sql": sql,
+            "params": _params(sql, plan_params),
+            "many": many,
+            "plan": query_plan(connection, sql, plan_params),
+        }
+        logger.warning(json.dumps(entry))
+
+
+@contextmanager
+def slow_query_log(threshold_ms=None):
+    """Log slow queries on every database alias inside the block"""
+    if threshold_ms is None:
+        threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+    wrapper = SlowQueryLog(threshold_ms)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+def log_files():
+    """The current slow query log followed by its rotated backups"""
+    path = settings.SLOW_QUERY_LOG
+    names = [path] + [f"{path}.{index}" for index in range(1, settings.SLOW_QUERY_LOG_BACKUPS + 1)]
+    return [name for name in names if os.path.exists(name)]
+
+
+def read_entries(route=None, min_ms=None, limit=100):
+    """Newest logged slow queries, optionally filtered by route and duration"""
+    entries = []
+    for name in log_files():
+        with open(name, encoding="utf-8") as source:
+            lines = source.readlines()
+        for line in reversed(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if route is not None and entry.get("route") != route:
+                continue
+            if min_ms is not None and entry["duration_ms"] < min_ms:
+                continue
+            entries.append(entry)
+            if len(entries) >= limit:
+                return entries
+    return entries
@@ -0,0 +1,95 @@
+"""Stream large list responses as a JSON array, one chunk of rows at a time
+
+`Response(serializer.data)` holds every serialized row and then the
+whole encoded body in memory. Here the queryset is read with
+`.iterator()`, a chunk of objects is serialized at a time, and each row
+is encoded and written to a `StreamingHttpResponse` as the array is
+built. Peak memory grows with the chunk size, not the table.
+
+Clients opt in with `?stream=true`. The bytes match what `JSONRenderer`
+renders for the same rows. The exception is the optional `orjson`
+encoder, which is faster but formats some floats differently.
+
+The status line goes out before the first row is read, so an error
+part way through truncates the body instead of returning a 500.
+"""
+import json
+from itertools import islice
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+PARAMETER = "stream"
+
+# Encoded rows are written to the server in pieces of about this size
+BUFFER_SIZE = 64 * 1024
+
+
+def requested(request):
+    return request.query_params.get(PARAMETER, "").lower() in ("1", "true", "yes")
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def serialized(queryset, serializer_class, context, chunk_size=None):
+    """Serializer output for each object, serializing a chunk at a time"""
+    chunk_size = chunk_size or settings.STREAMING_CHUNK_SIZE
+    for batch in batched(queryset.iterator(chunk_size=chunk_size), chunk_size):
+        yield from serializer_class(batch, many=True, context=context).data
+
+
+def encoder(name=None):
+    """A function encoding one row to bytes
+
+    The default matches `JSONRenderer` with the project's API settings.
+    """
+    name = name or settings.STREAMING_JSON_ENCODER
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError as ex:
+            raise ImproperlyConfigured(
+                "STREAMING_JSON_ENCODER is 'orjson' but orjson is not installed"
+            ) from ex
+        default = encoders.JSONEncoder().default
+        return lambda row: orjson.dumps(row, default=default)
+
+    if name != "json":
+        raise ImproperlyConfigured(f"Unknown STREAMING_JSON_ENCODER {name!r}")
+    encode = encoders.JSONEncoder(
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(",", ":") if api_settings.COMPACT_JSON else (", ", ": "),
+    ).encode
+    # JSONRenderer escapes these, since they end lines in JavaScript
+    return lambda row: encode(row).replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+def json_array(rows, encode=None):
+    """Encoded pieces of a JSON array holding every row"""
+    encode = encode or encoder()
+    pieces = [b"["]
+    size = 1
+    for index, row in enumerate(rows):
+        if index:
+            pieces.append(b",")
+        piece = encode(row)
+        pieces.append(piece)
+        size += len(piece) + 1
+        if size >= BUFFER_SIZE:
+            yield b"".join(pieces)
+            pieces = []
+            size = 0
+    pieces.append(b"]")
+    yield b"".join(pieces)
+
+
+def response(rows):
+    """A streaming JSON response for an iterable of rows"""
+    return StreamingHttpResponse(json_array(rows, encoder()), content_type="application/json")
@@ -0,0 +1,89 @@
+"""Trending products, from likes, ratings and sales with exponential decay
+
+A product's trending score at time t sums a weight for each of its
+likes, ratings and sales, halved for every `TRENDING_HALF_LIFE_HOURS`
+since it happened:
+
+    score(t) = sum of w * 2 ** -((t - event) / half_life)
+
+Multiply it by 2 ** ((t - EPOCH) / half_life) and the result no longer
+depends on t:
+
+    sum of w * 2 ** ((event - EPOCH) / half_life)
+
+Every product is scaled by the same factor, so this sum ranks them just
+as the true score does. It stays correct as time passes without being
+rewritten, and a new event simply adds one more term. `ProductTrend`
+stores its natural log, which grows linearly with time instead of
+overflowing, and indexes it per category.
+
+Model signals apply each event as one UPDATE that computes
+log(exp(stored) + exp(term)) in SQL. That is atomic, so concurrent
+events are never lost. `manage.py refresh_trending` rebuilds the table
+from the interaction timestamps. Run it once to backfill, and again
+after changing the half-life or the weights.
+"""
+import datetime
+import math
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+from bangazonapi.models import Product, ProductTrend
+
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+LIKE = "like"
+RATING = "rating"
+SALE = "sale"
+
+# Stops Ln(0) when an event is taken back from a score it was all of
+_SMALLEST = 1e-300
+
+
+def exponent(when):
+    """Natural log of 2 ** ((when - EPOCH) / half_life)"""
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return (when - EPOCH).total_seconds() / half_life * math.log(2)
+
+
+def log_term(kind, when):
+    return math.log(settings.TRENDING_WEIGHTS[kind]) + exponent(when)
+
+
+def score(log_score, now=None):
+    """The decayed score today for a stored log_score"""
+    return math.exp(log_score - exponent(now or timezone.now()))
+
+
+def _log_add(term):
+    stored = F("log_score")
+    return Greatest(stored, term) + Ln(1.0 + Exp(-Abs(stored - term)))
+
+
+def _log_subtract(term):
+    stored = F("log_score")
+    return stored + Ln(Greatest(1.0 - Exp(term - stored), Value(_SMALLEST)))
+
+
+def record(kind, product_id, when):
+    """Add an event to a product's score"""
+    term = Value(log_term(kind, when))
+    if ProductTrend.objects.filter(product_id=product_id).update(log_score=_log_add(term)):
+        return
+    category_id = (
+        Product.all_objects.filter(pk=product_id).values_list("category_id", flat=True).first()
+    )
+    if category_id is None:
+        return
+    if not ProductTrend.objects.insert_ignore(
+        product_id=product_id, category_id=category_id, log_score=term.value
+    ):
+        # Another event created the row first
+        ProductTrend.objects.filter(product_id=product_id).update(log_score=_log_add(term))
+
+
+def retract(kind, product_id, when):
+    """Take back an event recorded with record()"""
+    term = Value(log_term(kind, when))
+    ProductTrend.objects.filter(product_id=product_id).update(log_score=_log_subtract(term))
@@ -5,8 +5,12 @@ from .paymenttype import Payments
 from .product import Products
 from .profile import Profile
 from .productcategory import ProductCategories
+from .location import Locations
 from .lineitem import LineItems
 from .customer import Customers
 from .user import Users
 from .store import Stores 
 from .reports import Reports
+from .metrics import prometheus_metrics
+from .slowquery import SlowQueries
+from .batch import batch_requests
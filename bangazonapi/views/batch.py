@@ -0,0 +1,149 @@
+"""View module for running several API requests in one round trip"""
+import json
+import logging
+from io import BytesIO
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.urls import Resolver404, resolve
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.authentication import TokenAuthentication
+from bangazonapi import dbrouters
+from bangazonapi.middleware.customer import get_customer
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Request headers and server details a sub-request inherits from the batch
+INHERITED_META = ("SERVER_NAME", "SERVER_PORT", "REMOTE_ADDR", "SCRIPT_NAME")
+
+
+def _json(data, status_code):
+    return HttpResponse(json.dumps(data), content_type='application/json', status=status_code)
+
+
+def _item(status_code, body=b"null"):
+    return b'{"status":%d,"body":%s}' % (status_code, body)
+
+
+def _message(status_code, message):
+    return _item(status_code, json.dumps({"message": message}).encode())
+
+
+def _sub_request(request, method, path, query, body):
+    """A WSGIRequest for one item, carrying the batch's headers"""
+    data = json.dumps(body).encode() if body is not None else b""
+    environ = {
+        key: value for key, value in request.META.items()
+        if key.startswith("HTTP_") or key in INHERITED_META
+    }
+    environ.pop("HTTP_CONTENT_LENGTH", None)
+    environ.update({
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(data)),
+        "wsgi.input": BytesIO(data),
+        "wsgi.url_scheme": request.scheme,
+    })
+    return WSGIRequest(environ)
+
+
+def _content(response):
+    """The response body as JSON bytes"""
+    if hasattr(response, "render"):
+        response.render()
+    content = b"".join(response.streaming_content) if response.streaming else response.content
+    if not content:
+        return b"null"
+    if response.get("Content-Type", "").startswith("application/json"):
+        return content
+    # Plain text errors, such as HttpResponseServerError(ex), become strings
+    return json.dumps(content.decode("utf-8", "replace")).encode()
+
+
+def _dispatch(request, item, user, token, customer):
+    """Run one sub-request through the URL conf, returning its JSON bytes"""
+    if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+        return _message(status.HTTP_400_BAD_REQUEST, "Each request needs a path.")
+
+    method = str(item.get("method", "GET")).upper()
+    url = urlsplit(item["path"])
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        return _message(status.HTTP_404_NOT_FOUND, f"No route for {url.path}.")
+    if match.func is batch_requests:
+        return _message(status.HTTP_400_BAD_REQUEST, "Batches cannot be nested.")
+
+    sub = _sub_request(request, method, url.path, url.query, item.get("body"))
+    sub.resolver_match = match
+    sub.user = user
+    sub.customer = customer
+    # Reads after a write earlier in the batch see it
+    sub.primary_pin = getattr(request, "primary_pin", None)
+    if token is not None:
+        # DRF uses these instead of reading the token again
+        sub._force_auth_user = user
+        sub._force_auth_token = token
+
+    routing = dbrouters.begin_request(sub)
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+        content = _content(response)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.exception("Batched %s %s failed", method, item["path"])
+        return _message(status.HTTP_500_INTERNAL_SERVER_ERROR, str(ex))
+    finally:
+        dbrouters.end_request(routing)
+
+    if method not in SAFE_METHODS and response.status_code < 400 and user.is_authenticated:
+        dbrouters.stick_to_primary(request, user.pk)
+    return _item(response.status_code, content)
+
+
+@csrf_exempt
+def batch_requests(request):
+    '''Runs an array of API requests and returns every response together
+
+    Each request is `{"method": "GET", "path": "/products/1", "body": {...}}`.
+    Only `path` is required. The requests run in order through the URL
+    conf, without going back through HTTP. They share the caller's token,
+    which is checked once, and its customer, which is read once. Every
+    request succeeds or fails on its own, and nothing is rolled back.
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(permitted_methods=['POST'])
+
+    try:
+        items = json.loads(request.body.decode())
+    except ValueError:
+        return _json({"message": "Body must be a JSON array of requests."}, status.HTTP_400_BAD_REQUEST)
+    if not isinstance(items, list):
+        return _json({"message": "Body must be a JSON array of requests."}, status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        return _json(
+            {"message": f"A batch can hold at most {settings.BATCH_MAX_REQUESTS} requests."},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        authenticated = TokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed as ex:
+        return _json({"message": ex.detail}, status.HTTP_401_UNAUTHORIZED)
+    user, token = authenticated or (AnonymousUser(), None)
+    context = SimpleNamespace(user=user)
+    customer = SimpleLazyObject(lambda: get_customer(context))
+
+    responses = [_dispatch(request, item, user, token, customer) for item in items]
+    return HttpResponse(b"[" + b",".join(responses) + b"]", content_type='application/json')
@@ -3,10 +3,11 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
 from bangazonapi.models import Customer
 
 
-class CustomerSerializer(serializers.HyperlinkedModelSerializer):
+class CustomerSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for customers"""
     class Meta:
         model = Customer
@@ -33,7 +34,7 @@ class Customers(ViewSet):
         @apiSuccessExample {json} Success
             HTTP/1.1 204 No Content
         """
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
         customer.user.last_name = request.data["last_name"]
         customer.user.email = request.data["email"]
         customer.address = request.data["address"]
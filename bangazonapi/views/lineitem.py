@@ -4,10 +4,11 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
-from bangazonapi.models import OrderProduct, Customer
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
+from bangazonapi.models import OrderProduct
 
 
-class LineItemSerializer(serializers.HyperlinkedModelSerializer):
+class LineItemSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for line items """
     class Meta:
         model = OrderProduct
@@ -48,7 +49,7 @@ class LineItems(ViewSet):
             HTTP/1.1 204 No Content
         """
         try:
-            customer = Customer.objects.get(user=request.auth.user)
+            customer = request.customer
             line_item = OrderProduct.objects.get(pk=pk, order__customer=customer)
 
             serializer = LineItemSerializer(line_item, context={'request': request})
@@ -73,7 +74,7 @@ class LineItems(ViewSet):
             HTTP/1.1 204 No Content
         """
         try:
-            customer = Customer.objects.get(user=request.auth.user)
+            customer = request.customer
             order_product = OrderProduct.objects.get(pk=pk, order__customer=customer)
             order_product.delete()
 
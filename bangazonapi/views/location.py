@@ -0,0 +1,91 @@
+"""View module for handling requests about product locations"""
+from django.db.models import Count, Q
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+from bangazonapi.models import Location
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    """JSON serializer for locations with their live product counts"""
+
+    product_count = serializers.IntegerField()
+
+    class Meta:
+        model = Location
+        fields = ("id", "city", "region", "name", "product_count")
+
+
+def with_product_counts(locations):
+    return locations.annotate(
+        product_count=Count("products", filter=Q(products__deleted__isnull=True))
+    )
+
+
+class Locations(ViewSet):
+    """Cities products are listed in"""
+
+    def retrieve(self, request, pk=None):
+        """
+        @api {GET} /locations/:id GET location
+        @apiName GetLocation
+        @apiGroup Location
+
+        @apiParam {id} id Location Id
+
+        @apiSuccess (200) {Number} id Location id
+        @apiSuccess (200) {String} city City name
+        @apiSuccess (200) {String} region Region, or "" when none was given
+        @apiSuccess (200) {String} name City and region as displayed
+        @apiSuccess (200) {Number} product_count Products listed there
+        @apiSuccessExample {json} Success
+            {
+                "id": 4,
+                "city": "Pittsburgh",
+                "region": "PA",
+                "name": "Pittsburgh, PA",
+                "product_count": 12
+            }
+        """
+        try:
+            location = with_product_counts(Location.objects.all()).get(pk=pk)
+        except Location.DoesNotExist as ex:
+            return Response({"message": ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
+        return Response(LocationSerializer(location).data)
+
+    def list(self, request):
+        """
+        @api {GET} /locations GET locations with product counts
+        @apiName ListLocations
+        @apiGroup Location
+
+        @apiDescription Most products first. Pass an id as location_id to
+        GET /products or GET /products/facets to filter on it.
+
+        @apiParam {String} [city] Only locations in this city
+        @apiParam {Boolean} [listed] true to leave out locations with no products
+
+        @apiSuccess (200) {Object[]} locations Array of locations
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "id": 4,
+                    "city": "Pittsburgh",
+                    "region": "PA",
+                    "name": "Pittsburgh, PA",
+                    "product_count": 12
+                }
+            ]
+        """
+        locations = with_product_counts(Location.objects.all())
+
+        city = request.query_params.get("city", None)
+        if city is not None:
+            parsed = Location.parse(city)
+            locations = locations.filter(city=parsed[0] if parsed else "")
+
+        if request.query_params.get("listed", None) == "true":
+            locations = locations.filter(product_count__gt=0)
+
+        locations = locations.order_by("-product_count", "city", "region")
+        return Response(LocationSerializer(locations, many=True).data)
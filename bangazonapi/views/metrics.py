@@ -0,0 +1,17 @@
+"""View module for exposing request metrics to Prometheus"""
+from django.http import HttpResponse, HttpResponseNotAllowed
+from bangazonapi import metrics
+
+
+def prometheus_metrics(request):
+    '''Serves metrics merged from every worker process in text format
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(permitted_methods=['GET'])
+
+    return HttpResponse(
+        metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -1,16 +1,19 @@
 """View module for handling requests about customer order"""
 import datetime
+from django.conf import settings
 from django.http import HttpResponseServerError
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
 from rest_framework.decorators import action
-from bangazonapi.models import Order, Payment, Customer, Product, OrderProduct
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
+from bangazonapi import fastread, streaming
+from bangazonapi.models import Order, Payment, Product, OrderProduct
 from .product import ProductSerializer
 
 
-class OrderLineItemSerializer(serializers.HyperlinkedModelSerializer):
+class OrderLineItemSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for line items """
 
     product = ProductSerializer(many=False)
@@ -24,7 +27,7 @@ class OrderLineItemSerializer(serializers.HyperlinkedModelSerializer):
         fields = ('id', 'product')
         depth = 1
 
-class OrderSerializer(serializers.HyperlinkedModelSerializer):
+class OrderSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for customer orders"""
 
     lineitems = OrderLineItemSerializer(many=True)
@@ -93,7 +96,7 @@ class Orders(ViewSet):
             }
         """
         try:
-            customer = Customer.objects.get(user=request.auth.user)
+            customer = request.customer
             order = Order.objects.get(pk=pk, customer=customer)
             serializer = OrderSerializer(order, context={'request': request})
             return Response(serializer.data)
@@ -127,7 +130,7 @@ class Orders(ViewSet):
         @apiSuccessExample {json} Success
             HTTP/1.1 204 No Content
         """
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
         order = Order.objects.get(pk=pk, customer=customer)
         payment = Payment.objects.get(pk=request.data["payment_type"])
         order.payment_type = payment
@@ -166,13 +169,23 @@ class Orders(ViewSet):
                 }
             ]
         """
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
         orders = Order.objects.filter(customer=customer, payment_type__isnull=False)
 
         payment = self.request.query_params.get('payment_id', None)
         if payment is not None:
             orders = orders.filter(payment__id=payment)
 
+        if streaming.requested(request):
+            if settings.FAST_READ_SERIALIZERS:
+                return streaming.response(fastread.iter_order_rows(orders, request))
+            return streaming.response(
+                streaming.serialized(orders, OrderSerializer, {'request': request})
+            )
+
+        if settings.FAST_READ_SERIALIZERS:
+            return Response(fastread.order_rows(orders, request))
+
         json_orders = OrderSerializer(
             orders, many=True, context={'request': request})
 
@@ -180,7 +193,7 @@ class Orders(ViewSet):
     
     def destroy(self, request, pk=None):
         try:
-            customer = Customer.objects.get(user=request.auth.user)
+            customer = request.customer
             order = Order.objects.get(pk=pk, customer=customer)
 
             OrderProduct.objects.filter(order=order).delete()
@@ -4,10 +4,12 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
-from bangazonapi.models import Payment, Customer
+from rest_framework.settings import api_settings
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
+from bangazonapi.models import Payment
 
 
-class PaymentSerializer(serializers.HyperlinkedModelSerializer):
+class PaymentSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for Payment
 
     Arguments:
@@ -23,6 +25,10 @@ class PaymentSerializer(serializers.HyperlinkedModelSerializer):
                   'expiration_date', 'create_date')
 
 
+# The columns PaymentSerializer reads
+PAYMENT_COLUMNS = [field for field in PaymentSerializer.Meta.fields if field != 'url']
+
+
 class Payments(ViewSet):
 
     def create(self, request):
@@ -35,7 +41,7 @@ class Payments(ViewSet):
         new_payment.merchant_name = request.data["merchant_name"]
         new_payment.account_number = request.data["account_number"]
         new_payment.expiration_date = request.data["expiration_date"]
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
         new_payment.customer = customer
         new_payment.save()
 
@@ -77,16 +83,19 @@ class Payments(ViewSet):
             return Response({'message': ex.args[0]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def list(self, request):
-        """Handle GET requests to payment type resource"""
-        payment_types = Payment.objects.all()
-
-        customer = Customer.objects.get(user=request.auth.user)
-        customer_id = customer.id
-        
+        """Handle GET requests to payment type resource
 
-        if customer_id is not None:
-            payment_types = payment_types.filter(customer__id=customer_id)
+        The customer's own payment types, ten at a time by default, with
+        ?limit= and ?offset=.
+        """
+        payment_types = (
+            Payment.objects.filter(customer=request.customer)
+            .only(*PAYMENT_COLUMNS)
+            .order_by('id')
+        )
 
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        page = paginator.paginate_queryset(payment_types, request, view=self)
         serializer = PaymentSerializer(
-            payment_types, many=True, context={'request': request})
-        return Response(serializer.data)
+            page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
@@ -2,7 +2,9 @@
 
 import uuid
 import base64
+from django.conf import settings
 from django.core.files.base import ContentFile
+from django.utils import timezone
 from django.http import HttpResponseServerError
 from django.contrib.auth.models import User
 from rest_framework import serializers
@@ -11,13 +13,17 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from bangazonapi import autocomplete, facets, fanout, fastread, similarity, streaming, trending
 from bangazonapi.models.recommendation import Recommendation
 from bangazonapi.models import (
+    AlsoBought,
     Product,
     Customer,
+    Location,
     ProductCategory,
     ProductLike,
     ProductRating,
+    ProductTrend,
     Store
 )
 
@@ -64,10 +70,12 @@ class ProductDetailSerializer(ProductSerializer):
     def get_is_liked(self, obj):
         # Get current request
         request = self.context.get("request")
+        if not request.user.is_authenticated:
+            return False
 
         # Use data from the request to find whether the current user likes the current product
-        # Get the current user
-        current_user = Customer.objects.get(user=request.auth.user)
+        # Get the current user, resolved once per request
+        current_user = request.customer
 
         # Use the related name to check if this product has a like from this customer
         is_it_liked = ProductLike.objects.filter(
@@ -79,6 +87,57 @@ class ProductDetailSerializer(ProductSerializer):
         return is_it_liked
 
 
+# Query parameters filter_products() reads
+PRODUCT_FILTERS = (
+    "category", "location", "location_id", "name", "min_price", "number_sold",
+)
+# Answer to a filter_products() parameter that is not a whole number
+FILTER_ERROR = "min_price, number_sold and location_id must be whole numbers."
+
+
+def filter_products(products, params):
+    """Products matching the filters shared by the list and facets
+
+    `category`, `location`, `location_id`, `name`, `min_price` and
+    `number_sold` all run in the database, so they can be combined with
+    counts and limits. `location` is parsed like a product's location,
+    so "nashville" matches every Nashville and "Nashville, TN" only that
+    one.
+    """
+    category = params.get("category", None)
+    location = params.get("location", None)
+    location_id = params.get("location_id", None)
+    name = params.get("name", None)
+    min_price = params.get("min_price", None)
+    number_sold = params.get("number_sold", None)
+
+    if category is not None:
+        products = products.filter(category__id=category)
+
+    parsed = Location.parse(location) if location is not None else None
+    if parsed is not None:
+        city, region = parsed
+        products = products.filter(normalized_location__city=city)
+        if region:
+            products = products.filter(normalized_location__region=region)
+
+    if location_id is not None:
+        products = products.filter(normalized_location_id=int(location_id))
+
+    if name is not None:
+        products = products.filter(name__icontains=name)
+
+    if min_price is not None:
+        products = products.filter(price__gte=int(min_price))
+
+    if number_sold is not None:
+        products = products.alias(units_sold=fastread.sold_count()).filter(
+            units_sold__gte=int(number_sold)
+        )
+
+    return products
+
+
 class Products(ViewSet):
     """Request handlers for Products in the Bangazon Platform"""
 
@@ -165,8 +224,9 @@ class Products(ViewSet):
         new_product.description = request.data["description"]
         new_product.quantity = request.data["quantity"]
         new_product.location = request.data["location"]
+        new_product.normalized_location = Location.objects.for_text(new_product.location)
 
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
 
         new_product.customer = customer
 
@@ -238,9 +298,9 @@ class Products(ViewSet):
             }
         """
         try:
-            product = Product.objects.get(pk=pk)
+            product = Product.objects.select_related("customer__user", "category").get(pk=pk)
             serializer = ProductDetailSerializer(product, context={"request": request})
-            return Response(serializer.data)
+            return Response(fanout.serialize(serializer))
         except Product.DoesNotExist as ex:
             return Response({"message": ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
 
@@ -268,6 +328,7 @@ class Products(ViewSet):
         product.quantity = request.data["quantity"]
         product.created_date = product.created_date
         product.location = request.data["location"]
+        product.normalized_location = Location.objects.for_text(product.location)
 
         if float(product.price) > 17500:
             return Response(
@@ -275,7 +336,7 @@ class Products(ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
         product.customer = customer
 
         product_category = ProductCategory.objects.get(pk=request.data["category_id"])
@@ -329,6 +390,12 @@ class Products(ViewSet):
         @apiName ListProducts
         @apiGroup Product
 
+        @apiParam {String} [ids] Comma-separated product ids. Returns just
+            those products, in that order, with {"id": ..., "missing": true}
+            for ids that do not exist. Other filters are ignored.
+        @apiParam {String} [location] City, or "City, Region", the product is in
+        @apiParam {Number} [location_id] Id from GET /locations
+
         @apiSuccess (200) {Object[]} products Array of products
         @apiSuccessExample {json} Success
             [
@@ -351,17 +418,21 @@ class Products(ViewSet):
                 }
             ]
         """
-        products = Product.objects.all()
+        ids = self.request.query_params.get("ids", None)
+        if ids is not None:
+            return self._products_by_id(request, [value for value in ids.split(",") if value])
+
+        try:
+            products = filter_products(Product.objects.all(), self.request.query_params)
+        except ValueError:
+            return Response(
+                {"message": FILTER_ERROR}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Support filtering by category and/or quantity
-        category = self.request.query_params.get("category", None)
+        # Support ordering and limiting to the newest products
         quantity = self.request.query_params.get("quantity", None)
         order = self.request.query_params.get("order_by", None)
         direction = self.request.query_params.get("direction", None)
-        number_sold = self.request.query_params.get("number_sold", None)
-        min_price = self.request.query_params.get("min_price", None)
-        location = self.request.query_params.get("location", None)
-        name = self.request.query_params.get("name", None)
 
         if order is not None:
             order_filter = order
@@ -372,53 +443,402 @@ class Products(ViewSet):
 
             products = products.order_by(order_filter)
 
-        if category is not None:
-            products = products.filter(category__id=category)
-
         if quantity is not None:
             products = products.order_by("-created_date")[: int(quantity)]
 
-        if min_price is not None:
+        if streaming.requested(request):
+            if settings.FAST_READ_SERIALIZERS:
+                rows = fastread.ProductRows(request).iter_rows(products)
+            else:
+                rows = streaming.serialized(products, ProductSerializer, {"request": request})
+            return streaming.response(rows)
+
+        if settings.FAST_READ_SERIALIZERS:
+            return Response(fastread.ProductRows(request).rows(products))
+
+        serializer = ProductSerializer(
+            products, many=True, context={"request": request}
+        )
+        return Response(serializer.data)
 
-            def price_filter(product):
-                if product.price >= int(min_price):
-                    return True
-                return False
+    @action(methods=["get"], detail=False)
+    def facets(self, request):
+        """
+        @api {GET} /products/facets GET facet counts for the product filters
+        @apiName GetProductFacets
+        @apiGroup Product
 
-            products = filter(price_filter, products)
+        @apiDescription Takes the same category, location, location_id,
+        name, min_price and number_sold filters as GET /products. Counts
+        may be up to PRODUCT_FACETS_CACHE_SECONDS old.
 
-        if number_sold is not None:
+        @apiSuccess (200) {Number} count Products matching the filters
+        @apiSuccess (200) {Object[]} categories Products per category
+        @apiSuccess (200) {Object[]} price Products per price band, max is exclusive
+        @apiSuccess (200) {Object[]} locations Locations with the most products
+        @apiSuccess (200) {Object[]} ratings Products per whole star of average rating, null for unrated
+        @apiSuccessExample {json} Success
+            {
+                "count": 3,
+                "categories": [
+                    {"id": 2, "name": "Auto", "count": 3}
+                ],
+                "price": [
+                    {"min": 0, "max": 10, "count": 1},
+                    {"min": 10, "max": 25, "count": 2},
+                    ...
+                    {"min": 1000, "max": null, "count": 0}
+                ],
+                "locations": [
+                    {"id": 4, "location": "Pittsburgh, PA", "count": 2},
+                    {"id": 1, "location": "Nashville", "count": 1}
+                ],
+                "ratings": [
+                    {"stars": 0, "count": 0},
+                    ...
+                    {"stars": 5, "count": 1},
+                    {"stars": null, "count": 2}
+                ]
+            }
+        """
+        params = {
+            key: request.query_params[key]
+            for key in PRODUCT_FILTERS
+            if key in request.query_params
+        }
+        try:
+            products = filter_products(Product.objects.all(), params)
+            return Response(facets.facets(products, params))
+        except ValueError:
+            return Response(
+                {"message": FILTER_ERROR}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-            def sold_filter(product):
-                if product.number_sold >= int(number_sold):
-                    return True
-                return False
+    @action(methods=["get"], detail=False)
+    def autocomplete(self, request):
+        """
+        @api {GET} /products/autocomplete GET product and store name completions
+        @apiName AutocompleteProducts
+        @apiGroup Product
 
-            products = filter(sold_filter, products)
+        @apiDescription Matches names with a word that starts with q,
+        ignoring case. Products are ranked by units sold plus likes, and
+        stores by how many customers favorited them.
 
-        if location is not None:
-            products = products.filter(location__contains=location)
-        
-        if name is not None:
-            products = products.filter(name__icontains = name)
+        @apiParam {String} q What the customer has typed so far
+        @apiParam {Number} [limit=10] Most completions to return
 
-        serializer = ProductSerializer(
-            products, many=True, context={"request": request}
+        @apiSuccess (200) {Object[]} completions Best completions first
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "type": "product",
+                    "id": 101,
+                    "name": "Kite",
+                    "score": 12
+                },
+                {
+                    "type": "store",
+                    "id": 3,
+                    "name": "Kite Emporium",
+                    "score": 4
+                }
+            ]
+        """
+        prefix = request.query_params.get("q", "")
+        if not prefix.strip():
+            return Response(
+                {"message": "q is required."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"message": "limit must be a whole number."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(0, min(limit, settings.AUTOCOMPLETE_NODE_SIZE))
+        return Response(autocomplete.index().complete(prefix, limit))
+
+    @action(methods=["post"], detail=False)
+    def multiget(self, request):
+        """
+        @api {POST} /products/multiget POST products by id
+        @apiName MultigetProducts
+        @apiGroup Product
+
+        @apiDescription The body form of GET /products?ids=1,2,3, for lists
+        too long for a query string.
+
+        @apiParam {Number[]} ids Product ids
+        @apiParamExample {json} Input
+            {
+                "ids": [101, 7]
+            }
+
+        @apiSuccess (200) {Object[]} products Products in the order requested
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "id": 101,
+                    "name": "Kite",
+                    "price": 14.99,
+                    "number_sold": 0,
+                    "description": "It flies high",
+                    "quantity": 60,
+                    "created_date": "2019-10-23",
+                    "location": "Pittsburgh",
+                    "image_path": null,
+                    "average_rating": 0
+                },
+                {
+                    "id": 7,
+                    "missing": true
+                }
+            ]
+        """
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list):
+            return Response(
+                {"message": "ids must be a list of product ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self._products_by_id(request, ids)
+
+    def _products_by_id(self, request, values):
+        """Products for a list of ids, in request order
+
+        Ids with no live product get `{"id": ..., "missing": true}` in
+        their place, so clients can match results to ids by position.
+        """
+        try:
+            ids = [int(value) for value in values]
+        except (TypeError, ValueError):
+            return Response(
+                {"message": "ids must be a list of integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > settings.PRODUCT_MULTIGET_LIMIT:
+            return Response(
+                {"message": f"At most {settings.PRODUCT_MULTIGET_LIMIT} ids can be requested at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response([
+            row if row is not None else {"id": product_id, "missing": True}
+            for product_id, row in zip(ids, self._rows_by_id(request, ids))
+        ])
+
+    def _rows_by_id(self, request, ids):
+        """Serialized products for ids, in order, with None for unknown ids"""
+        if settings.FAST_READ_SERIALIZERS:
+            return fastread.products_by_id(ids, request)
+        products = Product.objects.filter(id__in=set(ids))
+        serializer = ProductSerializer(products, many=True, context={"request": request})
+        found = {row["id"]: row for row in serializer.data}
+        return [found.get(product_id) for product_id in ids]
+
+    @action(methods=["get"], detail=True)
+    def also_bought(self, request, pk=None):
+        """
+        @api {GET} /products/:id/also_bought GET products bought with this one
+        @apiName AlsoBoughtProducts
+        @apiGroup Product
+
+        @apiDescription Read from neighbors precomputed from paid orders by
+        `manage.py refresh_also_bought`, so new orders show up after its
+        next run.
+
+        @apiParam {id} id Product Id
+        @apiParam {Number} [limit] Most products to return
+
+        @apiSuccess (200) {Object[]} neighbors Best first
+        @apiSuccess (200) {Number} neighbors.orders Paid orders holding both products
+        @apiSuccess (200) {Number} neighbors.score Share of this product's paid orders that held the other
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "orders": 3,
+                    "score": 0.75,
+                    "product": {
+                        "id": 7,
+                        "name": "Kite String",
+                        "price": 4.99,
+                        "number_sold": 9,
+                        "description": "Fifty feet",
+                        "quantity": 200,
+                        "created_date": "2019-10-23",
+                        "location": "Pittsburgh",
+                        "image_path": null,
+                        "average_rating": 0
+                    }
+                }
+            ]
+        """
+        if not Product.objects.filter(pk=pk).exists():
+            return Response(
+                {"message": "Product matching query does not exist."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            limit = int(request.query_params.get("limit", settings.ALSO_BOUGHT_NEIGHBORS))
+        except ValueError:
+            return Response(
+                {"message": "limit must be a whole number."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Soft-deleted neighbors are left out until the next refresh drops them
+        neighbors = list(
+            AlsoBought.objects.filter(product_id=pk, other__deleted__isnull=True)
+            .order_by("-score", "other_id")
+            .values_list("other_id", "orders", "score")[:max(limit, 0)]
         )
-        return Response(serializer.data)
+        rows = self._rows_by_id(request, [other for other, _, _ in neighbors])
+        return Response([
+            {"orders": orders, "score": score, "product": row}
+            for (_, orders, score), row in zip(neighbors, rows)
+        ])
+
+    @action(methods=["get"], detail=True)
+    def similar(self, request, pk=None):
+        """
+        @api {GET} /products/:id/similar GET products with similar names and descriptions
+        @apiName SimilarProducts
+        @apiGroup Product
+
+        @apiDescription Ranked by the cosine similarity of TF-IDF vectors
+        over names, descriptions and categories. The vectors are built by
+        `manage.py build_similar_products`. A product added since the last
+        build is embedded on request, but cannot appear in other results.
+
+        @apiParam {id} id Product Id
+        @apiParam {Number} [limit=10] Most products to return
+
+        @apiSuccess (200) {Object[]} neighbors Most similar first
+        @apiSuccess (200) {Number} neighbors.score Cosine similarity, from 0 to 1
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "score": 0.82,
+                    "product": {
+                        "id": 12,
+                        "name": "Box Kite",
+                        "price": 24.99,
+                        "number_sold": 3,
+                        "description": "It flies high",
+                        "quantity": 20,
+                        "created_date": "2019-10-23",
+                        "location": "Pittsburgh",
+                        "image_path": null,
+                        "average_rating": 0
+                    }
+                }
+            ]
+        """
+        product = (
+            Product.objects.filter(pk=pk)
+            .values_list("name", "description", "category_id")
+            .first()
+        )
+        if product is None:
+            return Response(
+                {"message": "Product matching query does not exist."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            limit = max(int(request.query_params.get("limit", 10)), 0)
+        except ValueError:
+            return Response(
+                {"message": "limit must be a whole number."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        index = similarity.index()
+        if index is None:
+            return Response(
+                {"message": "The similar products index has not been built."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        # Extra candidates stand in for products deleted since the build
+        vector = index.vector(int(pk), *product)
+        nearest = index.nearest(vector, limit * 2, exclude=int(pk))
+        rows = self._rows_by_id(request, [other for other, _ in nearest])
+        return Response([
+            {"score": score, "product": row}
+            for (_, score), row in zip(nearest, rows) if row is not None
+        ][:limit])
+
+    @action(methods=["get"], detail=False)
+    def trending(self, request):
+        """
+        @api {GET} /products/trending GET products with the most recent likes, ratings and sales
+        @apiName TrendingProducts
+        @apiGroup Product
+
+        @apiDescription Every like, rating and paid line item adds to a
+        product's score, and its share halves every
+        `TRENDING_HALF_LIFE_HOURS`. Scores are kept in a ranked table as
+        interactions happen, so this reads the top rows of an index.
+
+        @apiParam {id} [category] Only products in this category
+        @apiParam {Number} [limit=20] Most products to return
+
+        @apiSuccess (200) {Object[]} products Highest score first
+        @apiSuccess (200) {Number} products.score Decayed score now
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "score": 7.42,
+                    "product": {
+                        "id": 12,
+                        "name": "Box Kite",
+                        "price": 24.99,
+                        "number_sold": 3,
+                        "description": "It flies high",
+                        "quantity": 20,
+                        "created_date": "2019-10-23",
+                        "location": "Pittsburgh",
+                        "image_path": null,
+                        "average_rating": 0
+                    }
+                }
+            ]
+        """
+        category = request.query_params.get("category")
+        try:
+            limit = max(int(request.query_params.get("limit", 20)), 0)
+            category = int(category) if category is not None else None
+        except ValueError:
+            return Response(
+                {"message": "limit and category must be whole numbers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        trends = ProductTrend.objects.filter(product__deleted__isnull=True)
+        if category is not None:
+            trends = trends.filter(category_id=category)
+        ranked = list(trends.order_by("-log_score", "product_id").values_list(
+            "product_id", "log_score"
+        )[:limit])
+
+        now = timezone.now()
+        rows = self._rows_by_id(request, [product for product, _ in ranked])
+        return Response([
+            {"score": trending.score(log_score, now), "product": row}
+            for (_, log_score), row in zip(ranked, rows) if row is not None
+        ])
 
     @action(methods=["post"], detail=True)
     def recommend(self, request, pk=None):
         """Recommend products to other users"""
 
         if request.method == "POST":
-            rec = Recommendation()
-            rec.recommender = Customer.objects.get(user=request.auth.user)
             the_user = User.objects.get(username=request.data["username"])
-            rec.customer = Customer.objects.get(user_id=the_user.id)
-            rec.product = Product.objects.get(pk=pk)
 
-            rec.save()
+            # Recommending the same product to the same customer twice is a no-op
+            Recommendation.objects.insert_ignore(
+                recommender=request.customer,
+                customer=Customer.objects.get(user_id=the_user.id),
+                product=Product.objects.get(pk=pk),
+            )
 
             return Response(None, status=status.HTTP_204_NO_CONTENT)
 
@@ -426,15 +846,14 @@ class Products(ViewSet):
 
     @action(methods=["post", "delete"], detail=True)
     def like(self, request, pk=None):
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
         product_instance = Product.objects.get(pk=pk)
 
         if request.method == "POST":
-            product_like = ProductLike()
-            product_like.customer = current_user
-            product_like.product = product_instance
-
-            product_like.save()
+            # Liking a product twice leaves the single existing like in place
+            ProductLike.objects.insert_ignore(
+                customer=current_user, product=product_instance
+            )
             return Response(None, status=status.HTTP_201_CREATED)
 
         if request.method == "DELETE":
@@ -461,7 +880,7 @@ class Products(ViewSet):
 
     @action(methods=["get"], detail=False)
     def liked(self, request):
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
 
         if request.method == "GET":
             try:
@@ -478,30 +897,25 @@ class Products(ViewSet):
 
     @action(methods=["post"], detail=True)
     def rate_product(self, request, pk=None):
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
         product_instance = Product.objects.get(pk=pk)
 
         if request.method == "POST":
             rating_value = request.data["rating"]
             review_text = request.data["review"]
 
-            try:
-                product_rating = ProductRating.objects.get(
-                    customer=current_user, product=product_instance
-                )
-                product_rating.rating = rating_value
-                product_rating.review = review_text
-                product_rating.save()
-                return Response(
-                    {"message": "Rating updated successfully"},
-                    status=status.HTTP_200_OK,
-                )
-            except ProductRating.DoesNotExist:
-                ProductRating.objects.create(
-                    customer=current_user, product=product_instance, rating=rating_value, review=review_text
-                )
+            created = ProductRating.objects.upsert(
+                {"rating": rating_value, "review": review_text},
+                customer=current_user,
+                product=product_instance,
+            )
+            if created:
                 return Response(
                     {"message": "Rating added successfully"},
                     status=status.HTTP_201_CREATED,
                 )
+            return Response(
+                {"message": "Rating updated successfully"},
+                status=status.HTTP_200_OK,
+            )
         return Response({}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
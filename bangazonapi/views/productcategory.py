@@ -12,10 +12,11 @@ from rest_framework import serializers
 from rest_framework import status
 from bangazonapi.models import ProductCategory
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
 from .product import ProductSerializer
 
 
-class ProductCategorySerializer(serializers.HyperlinkedModelSerializer):
+class ProductCategorySerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for product category"""
     products = serializers.SerializerMethodField()
 
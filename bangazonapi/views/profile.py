@@ -8,6 +8,8 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
+from bangazonapi import fanout
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
 from bangazonapi.models import Order, Customer, Product
 from bangazonapi.models import OrderProduct, Favorite, Store
 from bangazonapi.models import Recommendation
@@ -84,7 +86,7 @@ class Profile(ViewSet):
             }
         """
         try:
-            current_user = Customer.objects.get(user=request.auth.user)
+            current_user = request.customer
             current_user.recommends = Recommendation.objects.filter(
                 recommender=current_user
             )
@@ -96,7 +98,9 @@ class Profile(ViewSet):
                 current_user, many=False, context={"request": request}
             )
 
-            return Response(serializer.data)
+            # Payment types, recommendations, store and favorites are
+            # independent, so their queries run concurrently
+            return Response(fanout.serialize(serializer))
         except Exception as ex:
             return HttpResponseServerError(ex)
 
@@ -104,7 +108,7 @@ class Profile(ViewSet):
     def cart(self, request):
         """Shopping cart manipulation"""
 
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
 
         if request.method == "DELETE":
             """
@@ -314,7 +318,7 @@ class Profile(ViewSet):
                 }
             ]
         """
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
         favorites = Favorite.objects.filter(customer=current_user)
 
         if request.method == "GET":
@@ -326,14 +330,10 @@ class Profile(ViewSet):
         if request.method == "POST":
 
             store_liked = Store.objects.get(pk=request.data["store_id"])
-            if Favorite.objects.filter(customer=current_user, store=store_liked).exists():
+            created = Favorite.objects.insert_ignore(customer=current_user, store=store_liked)
+            if not created:
                 return Response({"message": "This store has already been liked by user."}, status=status.HTTP_409_CONFLICT)
-                
-            fav_seller = Favorite()
-            fav_seller.customer = current_user
-            fav_seller.store = store_liked
 
-            fav_seller.save()
             return Response(None, status=status.HTTP_201_CREATED)
             
         return Response({}, status=status.HTTP_400_BAD_REQUEST)
@@ -343,7 +343,7 @@ class Profile(ViewSet):
     def unfavorite(self, request, pk=None):
 
         if request.method == "DELETE":
-            current_user = Customer.objects.get(user=request.auth.user)
+            current_user = request.customer
 
             try:
                 unfavorite_store = Store.objects.get(pk=pk)
@@ -366,7 +366,7 @@ class Profile(ViewSet):
         
 
 
-class LineItemSerializer(serializers.HyperlinkedModelSerializer):
+class LineItemSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for products
 
     Arguments:
@@ -381,7 +381,7 @@ class LineItemSerializer(serializers.HyperlinkedModelSerializer):
         depth = 1
 
 
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+class UserSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for customer profile
 
     Arguments:
@@ -417,7 +417,7 @@ class CustomerSerializer(serializers.ModelSerializer):
 #             "name",
 #         )
 
-class FavoriteSerializer(serializers.HyperlinkedModelSerializer):
+class FavoriteSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for favorites
 
     Arguments:
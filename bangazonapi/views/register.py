@@ -7,6 +7,7 @@ from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from bangazonapi.models import Customer
+from bangazonapi.dbrouters import stick_to_primary
 
 
 @csrf_exempt
@@ -75,6 +76,9 @@ def register_user(request):
     # Use the REST Framework's token generator on the new user account
     token = Token.objects.create(user=new_user)
 
+    # Keep the new customer's reads on the primary until replicas catch up
+    stick_to_primary(request, new_user.id)
+
     # Return the token to the client
     data = json.dumps({"token": token.key, "id": new_user.id})
     return HttpResponse(data, content_type='application/json', status=status.HTTP_201_CREATED)
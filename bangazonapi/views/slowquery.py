@@ -0,0 +1,60 @@
+"""View module for browsing the slow query log"""
+from rest_framework import status
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from bangazonapi import slowqueries
+
+
+class SlowQueries(ViewSet):
+    """Slow SQL captured by SlowQueryLogMiddleware, for staff only"""
+
+    permission_classes = (IsAdminUser,)
+
+    def list(self, request):
+        """
+        @api {GET} /slowqueries GET logged slow queries
+        @apiName ListSlowQueries
+        @apiGroup Diagnostics
+
+        @apiHeader {String} Authorization Auth token of a staff user
+        @apiHeaderExample {String} Authorization
+            Token 9ba45f09651c5b0c404f37a2d2572c026c146611
+
+        @apiParam {String} route Only queries issued by this ViewSet action, e.g. Products.list
+        @apiParam {Number} min_ms Only queries at least this slow
+        @apiParam {Number} limit Maximum number of entries, newest first (default 100)
+
+        @apiSuccess (200) {Object[]} queries Array of slow queries
+        @apiSuccessExample {json} Success
+            [
+                {
+                    "logged_at": "2024-03-21T14:02:11.532040+00:00",
+                    "duration_ms": 182.4,
+                    "alias": "default",
+                    "route": "Products.list",
+                    "caller": "bangazonapi/views/product.py:389 in list",
+                    "sql": "SELECT ... WHERE \\"bangazonapi_product\\".\\"location\\" LIKE %s ESCAPE '\\\\'",
+                    "params": ["%Pittsburgh%"],
+                    "many": false,
+                    "plan": ["SCAN bangazonapi_product"]
+                }
+            ]
+        """
+        route = request.query_params.get("route", None)
+        min_ms = request.query_params.get("min_ms", None)
+        try:
+            limit = int(request.query_params.get("limit", 100))
+        except ValueError:
+            return Response(
+                {"message": "limit must be a whole number."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            min_ms = float(min_ms) if min_ms is not None else None
+        except ValueError:
+            return Response(
+                {"message": "min_ms must be a number."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = slowqueries.read_entries(route=route, min_ms=min_ms, limit=limit)
+        return Response(entries)
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.db.models import Q
 from django.http import HttpResponseServerError
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
@@ -5,7 +7,8 @@ from rest_framework import serializers
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from bangazonapi.models import Customer, Product, Store, OrderProduct, Favorite
+from bangazonapi import fanout, fastread
+from bangazonapi.models import ArchivedProduct, Product, Store, OrderProduct, Favorite
 from .product import ProductSerializer
 
 
@@ -37,9 +40,14 @@ class StoreSerializer(serializers.ModelSerializer):
     def get_sold_products(self, obj):
         owner_id = obj.owner.id
 
+        # Ordered so sold products are listed by their first sale
+        # Including products archived since they were sold
+        owned = Product.all_objects.filter(customer_id=owner_id).values("id")
+        archived = ArchivedProduct.objects.filter(customer_id=owner_id).values("id")
         all_products = OrderProduct.objects.filter(
-            product__customer_id=owner_id, order__payment_type__isnull=False
-        )
+            Q(product_id__in=owned) | Q(product_id__in=archived),
+            order__payment_type__isnull=False,
+        ).order_by("id")
         sold_products = []
 
         for product in all_products:
@@ -70,8 +78,10 @@ class StoreDetailSerializer(StoreSerializer):
     
     def get_is_favorite(self, obj):
         request = self.context.get("request")
+        if not request.user.is_authenticated:
+            return False
 
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
 
         is_it_favorite = Favorite.objects.filter(customer=current_user, store=obj.pk).exists()
 
@@ -83,7 +93,7 @@ class Stores(ViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly,)
 
     def create(self, request):
-        current_user = Customer.objects.get(user=request.auth.user)
+        current_user = request.customer
 
         if Store.objects.filter(owner=current_user).exists():
             return Response(
@@ -94,14 +104,8 @@ class Stores(ViewSet):
         new_store = Store()
         new_store.name = request.data["name"]
         new_store.description = request.data["description"]
-        # owner is coming in as the request.auth.user
-        # get user
-        user = request.auth.user
-        # set customer to user
-        customer = Customer.objects.get(user=user)
-        # set owner of the store to customer
-        new_store.owner = customer
-        # set the customer
+        # owner is the customer making the request
+        new_store.owner = current_user
 
         new_store.save()
 
@@ -112,17 +116,19 @@ class Stores(ViewSet):
     def list(self, request):
 
         stores = Store.objects.all()
+        if settings.FAST_READ_SERIALIZERS:
+            return Response(fastread.store_rows(stores))
         serializer = StoreSerializer(stores, many=True, context={"request": request})
         return Response(serializer.data)
 
     def retrieve(self, request, pk=None):
 
         try:
-            store = Store.objects.get(pk=pk)
+            store = Store.objects.select_related("owner__user").get(pk=pk)
             serializer = StoreDetailSerializer(
                 store, many=False, context={"request": request}
             )
-            return Response(serializer.data)
+            return Response(fanout.serialize(serializer))
         except Store.DoesNotExist as ex:
             return Response({"message": ex.args[0]}, status=status.HTTP_404_NOT_FOUND)
 
@@ -131,7 +137,7 @@ class Stores(ViewSet):
         store.name = request.data["name"]
         store.description = request.data["description"]
 
-        customer = Customer.objects.get(user=request.auth.user)
+        customer = request.customer
         store.owner = customer
 
         store.save()
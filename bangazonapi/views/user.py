@@ -3,10 +3,13 @@ from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
+from rest_framework.settings import api_settings
+from bangazonapi import streaming
+from bangazonapi.fields import TemplateHyperlinkedModelSerializer
 from django.contrib.auth.models import User
 
 
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+class UserSerializer(TemplateHyperlinkedModelSerializer):
     """JSON serializer for Users
 
     Arguments:
@@ -18,7 +21,11 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
             view_name='user',
             lookup_field = 'id'
         )
-        fields = ('id', 'url', 'username', 'password', 'first_name', 'last_name', 'email', 'is_active', 'date_joined')
+        fields = ('id', 'url', 'username', 'first_name', 'last_name', 'email', 'is_active', 'date_joined')
+
+
+# The columns UserSerializer reads, so password hashes never leave the database
+USER_COLUMNS = [field for field in UserSerializer.Meta.fields if field != 'url']
 
 
 class Users(ViewSet):
@@ -36,7 +43,7 @@ class Users(ViewSet):
             Response -- JSON serialized customer instance
         """
         try:
-            user = User.objects.get(pk=pk)
+            user = User.objects.only(*USER_COLUMNS).get(pk=pk)
             serializer = UserSerializer(user, context={'request': request})
             return Response(serializer.data)
         except Exception as ex:
@@ -45,8 +52,19 @@ class Users(ViewSet):
 
 
     def list(self, request):
-        """Handle GET requests to user resource"""
-        users = User.objects.all()
+        """Handle GET requests to user resource
+
+        Pages of ten users by default, with ?limit= and ?offset=. With
+        ?stream=true every user is streamed instead.
+        """
+        users = User.objects.only(*USER_COLUMNS).order_by('id')
+        if streaming.requested(request):
+            return streaming.response(
+                streaming.serialized(users, UserSerializer, {'request': request})
+            )
+
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        page = paginator.paginate_queryset(users, request, view=self)
         serializer = UserSerializer(
-            users, many=True, context={'request': request})
-        return Response(serializer.data)
\ No newline at end of file
+            page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""Read the API request collection as a replayable workload
+
+`api-requests-collection.json` is a Postman v2.1 collection. Each request
+in it becomes a WorkloadRequest with a path relative to the server root,
+so it can be replayed through the test client or against a live server.
+"""
+import json
+import re
+from dataclasses import dataclass, field, replace
+from urllib.parse import urlencode, urlsplit
+
+TOKEN_PATTERN = re.compile(r"^Token\s+\S+$")
+
+
+@dataclass(frozen=True)
+class WorkloadRequest:
+    """A single request from the collection"""
+
+    name: str
+    method: str
+    path: str
+    query: str = ""
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+    content_type: str = ""
+
+    @property
+    def url(self):
+        return f"{self.path}?{self.query}" if self.query else self.path
+
+    @property
+    def authenticated(self):
+        return "Authorization" in self.headers
+
+    def with_token(self, token):
+        """The same request authenticated with another token"""
+        if not self.authenticated:
+            return self
+        headers = dict(self.headers)
+        headers["Authorization"] = f"Token {token}"
+        return replace(self, headers=headers)
+
+    def with_path(self, path):
+        return replace(self, path=path)
+
+
+def _body(request):
+    body = request.get("body") or {}
+    mode = body.get("mode")
+
+    if mode == "raw" and body.get("raw"):
+        return body["raw"].encode("utf-8"), "application/json"
+    if mode in ("formdata", "urlencoded"):
+        pairs = [
+            (item["key"], item.get("value", ""))
+            for item in body.get(mode, [])
+            if not item.get("disabled") and item.get("type", "text") == "text"
+        ]
+        return urlencode(pairs).encode("utf-8"), "application/x-www-form-urlencoded"
+    return b"", ""
+
+
+def _request(name, request):
+    url = request["url"]
+    raw = url if isinstance(url, str) else url.get("raw", "")
+    parts = urlsplit(raw)
+
+    headers = {}
+    for header in request.get("header", []):
+        if header.get("disabled") or header["key"].lower() == "content-type":
+            continue
+        headers[header["key"]] = header["value"]
+    if "Authorization" in headers and not TOKEN_PATTERN.match(headers["Authorization"]):
+        del headers["Authorization"]
+
+    body, content_type = _body(request)
+    return WorkloadRequest(
+        name=name,
+        method=request["method"].upper(),
+        path=parts.path or "/",
+        query=parts.query,
+        headers=headers,
+        body=body,
+        content_type=content_type,
+    )
+
+
+def load_collection(path):
+    """Every request in a Postman collection, in the order they appear
+
+    Returns:
+        list -- WorkloadRequest instances
+    """
+    with open(path, encoding="utf-8") as source:
+        collection = json.load(source)
+
+    requests = []
+
+    def walk(items):
+        for item in items:
+            if "item" in item:
+                walk(item["item"])
+            elif "request" in item:
+                requests.append(_request(item.get("name", ""), item["request"]))
+
+    walk(collection.get("item", []))
+    return requests
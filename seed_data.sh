@@ -9,6 +9,7 @@ python3 manage.py loaddata tokens
 python3 manage.py loaddata customers
 python3 manage.py loaddata product_category
 python3 manage.py loaddata product
+python3 manage.py normalize_locations
 python3 manage.py loaddata productrating
 python3 manage.py loaddata payment
 python3 manage.py loaddata order
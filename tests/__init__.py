@@ -1,3 +1,25 @@
 from .product import ProductTests
 from .order import OrderTests
-from .payments import PaymentTests
\ No newline at end of file
+from .payments import PaymentTests
+from .customer import CurrentCustomerTests
+from .timing import RequestTimingTests
+from .metrics import MetricsTests
+from .slowqueries import SlowQueryLogTests
+from .replicas import ReplicaRouterTests
+from .archive import ArchiveDeletedTests
+from .indexadvisor import IndexAdvisorTests
+from .dataset import GenerateDatasetTests
+from .benchmarks import BenchmarkTests
+from .loadtest import LoadTestTests
+from .profiling import ProfilingTests
+from .fastread import FastReadTests
+from .fields import TemplateHyperlinkTests
+from .streaming import StreamingListTests
+from .fanout import FanoutTests
+from .batch import BatchTests
+from .user import UserTests
+from .autocomplete import AutocompleteTests
+from .location import LocationTests
+from .alsobought import AlsoBoughtTests
+from .similar import SimilarProductsTests
+from .trending import TrendingTests
@@ -0,0 +1,103 @@
+import json
+import random
+from collections import Counter
+from io import StringIO
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi import cooccurrence
+from bangazonapi.models import Customer, Order, OrderProduct, Payment
+
+
+class AlsoBoughtTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create a customer with a payment type and four products
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        for name in ("Kite", "Kite String", "Tent", "Mug"):
+            data = {"name": name, "price": 14.99, "quantity": 60, "description": "It flies high",
+                    "category_id": 1, "location": "Pittsburgh"}
+            response = self.client.post("/products", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = {"merchant_name": "Amex", "account_number": "000000000000", "expiration_date": "2023-12-12"}
+        self.client.post("/paymenttypes", data, format='json')
+        self.customer = Customer.objects.get(user__username="steve")
+
+    def order(self, *product_ids, paid=True):
+        order = Order.objects.create(
+            customer=self.customer,
+            payment_type=Payment.objects.first() if paid else None,
+            created_date="2024-01-01",
+        )
+        OrderProduct.objects.bulk_create(
+            OrderProduct(order=order, product_id=product_id) for product_id in product_ids
+        )
+
+    def also_bought(self, product_id):
+        response = self.client.get(f"/products/{product_id}/also_bought")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (neighbor["product"]["id"], neighbor["orders"], neighbor["score"])
+            for neighbor in json.loads(response.content)
+        ]
+
+    def test_neighbors_match_pairwise_counts(self):
+        """
+        Ensure the vectorized counts match counting every basket pair in Python
+        """
+        rng = random.Random(0)
+        rows = [(order, rng.randrange(1, 30)) for order in range(200) for _ in range(rng.randrange(1, 6))]
+        pairs = cooccurrence.baskets(rows)
+        found = cooccurrence.neighbors(pairs, list(range(1, 30)), top_k=1000)
+
+        baskets = {}
+        for order, product in rows:
+            baskets.setdefault(order, set()).add(product)
+        expected = Counter(
+            (product, other) for basket in baskets.values()
+            for product in basket for other in basket if product != other
+        )
+        self.assertEqual(
+            dict(zip(zip(found.product.tolist(), found.other.tolist()), found.together.tolist())),
+            dict(expected),
+        )
+        top = cooccurrence.neighbors(pairs, [5], top_k=3)
+        self.assertEqual(set(top.product.tolist()), {5})
+        self.assertEqual(top.together.tolist(), sorted(top.together.tolist(), reverse=True))
+        self.assertEqual(len(top), 3)
+
+    def test_also_bought_refreshes_incrementally(self):
+        """
+        Ensure neighbors come from paid orders and only changed products are recomputed
+        """
+        self.order(1, 2)
+        self.order(1, 2, 3)
+        self.order(1, 3, 3)
+        self.order(1, 4, paid=False)
+
+        call_command("refresh_also_bought", min_orders=1, stdout=StringIO())
+        self.assertEqual(self.also_bought(1), [(2, 2, 2 / 3), (3, 2, 2 / 3)])
+        self.assertEqual(self.also_bought(2), [(1, 2, 1.0), (3, 1, 0.5)])
+        self.assertEqual(self.also_bought(4), [])
+
+        self.order(3, 4)
+        output = StringIO()
+        call_command("refresh_also_bought", min_orders=1, stdout=output)
+        self.assertIn("Refreshed 2 of 4 sold products", output.getvalue())
+        self.assertEqual(self.also_bought(4), [(3, 1, 1.0)])
+        self.assertEqual(self.also_bought(3), [(1, 2, 2 / 3), (2, 1, 1 / 3), (4, 1, 1 / 3)])
+        # Product 1 was not recomputed, and product 4 is not in its paid orders
+        self.assertEqual(self.also_bought(1), [(2, 2, 2 / 3), (3, 2, 2 / 3)])
+
+        self.client.delete("/products/2")
+        self.assertEqual(self.also_bought(1), [(3, 2, 2 / 3)])
+        response = self.client.get("/products/99/also_bought")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
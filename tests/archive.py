@@ -0,0 +1,87 @@
+import datetime
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from safedelete.config import DELETED_VISIBLE
+from rest_framework.test import APITestCase
+from bangazonapi.models import (
+    ArchivedPayment, ArchivedProduct, Customer, OrderProduct, Payment, Product, Recommendation
+)
+
+
+class ArchiveDeletedTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create a customer with three products and two payment types
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        for _ in range(3):
+            data = {"name": "Kite", "price": 14.99, "quantity": 60, "description": "It flies high",
+                    "category_id": 1, "location": "Pittsburgh"}
+            response = self.client.post("/products", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        for _ in range(2):
+            data = {"merchant_name": "Amex", "account_number": "000000000000", "expiration_date": "2023-12-12"}
+            response = self.client.post("/paymenttypes", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_archives_old_rows(self):
+        """
+        Ensure old soft-deleted rows are archived and order history still resolves them
+        """
+        # Product 2 is in the cart, and the cart is paid with payment type 2
+        self.client.post("/profile/cart", {"product_id": 2}, format='json')
+        self.client.put("/orders/1", {"payment_type": 2}, format='json')
+        customer = Customer.objects.get(user__username="steve")
+        Recommendation.objects.create(customer=customer, recommender=customer, product_id=2)
+        self.client.post("/stores", {"name": "Kites R Us", "description": "Kites"}, format='json')
+        before = {fast: self.history(fast) for fast in (True, False)}
+        self.assertEqual(len(before[True][0]), 1)
+        self.assertEqual([product["id"] for product in before[True][1]], [2])
+
+        for url in ("/products/1", "/products/2", "/products/3", "/paymenttypes/1", "/paymenttypes/2"):
+            response = self.client.delete(url)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        long_ago = timezone.now() - datetime.timedelta(days=365)
+        Product.all_objects.all(force_visibility=DELETED_VISIBLE).filter(pk__in=[1, 2]).update(deleted=long_ago)
+        Payment.all_objects.all(force_visibility=DELETED_VISIBLE).update(deleted=long_ago)
+
+        call_command("archive_deleted", days=90, batch_size=1, stdout=StringIO())
+
+        self.assertEqual(sorted(ArchivedProduct.objects.values_list("id", flat=True)), [1, 2])
+        self.assertEqual(sorted(ArchivedPayment.objects.values_list("id", flat=True)), [1, 2])
+        self.assertEqual(list(Product.all_objects.values_list("id", flat=True)), [3])
+        self.assertFalse(Payment.all_objects.exists())
+        self.assertFalse(Recommendation.objects.exists())
+
+        archived = ArchivedProduct.objects.get(pk=1)
+        self.assertEqual(archived.name, "Kite")
+        self.assertEqual(archived.deleted, long_ago)
+
+        # Line items and orders read their archived product and payment type
+        line_item = OrderProduct.objects.get()
+        self.assertEqual((line_item.product.pk, line_item.product.name), (2, "Kite"))
+        self.assertEqual(line_item.order.payment_type.pk, 2)
+        for fast in (True, False):
+            self.assertEqual(self.history(fast), before[fast])
+
+    def history(self, fast):
+        """
+        Orders and the store's sold products, from the fast or serializer path
+        """
+        with override_settings(FAST_READ_SERIALIZERS=fast):
+            orders = self.client.get("/orders")
+            stores = self.client.get("/stores")
+        self.assertEqual(orders.status_code, status.HTTP_200_OK)
+        return json.loads(orders.content), json.loads(stores.content)[0]["sold_products"]
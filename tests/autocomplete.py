@@ -0,0 +1,104 @@
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi import autocomplete
+
+
+class AutocompleteTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create an account, a category and a few products to complete
+        """
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+
+        url = "/register"
+        data = {
+            "username": "steve",
+            "password": "Admin8*",
+            "email": "steve@stevebrownlee.com",
+            "address": "100 Infinity Way",
+            "phone_number": "555-1212",
+            "first_name": "Steve",
+            "last_name": "Brownlee",
+        }
+        response = self.client.post(url, data, format="json")
+        json_response = json.loads(response.content)
+        self.token = json_response["token"]
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format="json")
+        for name in ("Kite", "Red Kite", "Kettlebell"):
+            self.create_product(name)
+
+    def create_product(self, name):
+        data = {
+            "name": name,
+            "price": 14.99,
+            "quantity": 60,
+            "description": "It flies high",
+            "category_id": 1,
+            "location": "Pittsburgh",
+        }
+        response = self.client.post("/products", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return json.loads(response.content)["id"]
+
+    def complete(self, prefix):
+        response = self.client.get("/products/autocomplete", {"q": prefix})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row["type"], row["name"], row["score"]) for row in json.loads(response.content)]
+
+    def test_autocomplete_matches_word_prefixes(self):
+        """
+        Ensure completions match any word of a name and lookups skip the database
+        """
+        self.assertEqual(
+            self.complete("k"),
+            [("product", "Kettlebell", 0), ("product", "Kite", 0), ("product", "Red Kite", 0)],
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.complete(" KI"), [("product", "Kite", 0), ("product", "Red Kite", 0)])
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if 'FROM "bangazonapi_product"' in query["sql"]
+        ])
+        self.assertEqual(self.complete("red k"), [("product", "Red Kite", 0)])
+        self.assertEqual(self.complete("kites"), [])
+
+        response = self.client.get("/products/autocomplete?q=k&limit=1")
+        self.assertEqual(len(json.loads(response.content)), 1)
+        response = self.client.get("/products/autocomplete")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocomplete_follows_writes(self):
+        """
+        Ensure likes, renames, deletes and new stores update the index in place
+        """
+        self.complete("k")
+
+        self.client.post("/products/2/like")
+        self.assertEqual(self.complete("kit")[0], ("product", "Red Kite", 1))
+        self.client.delete("/products/2/like")
+        self.assertEqual(self.complete("kit")[0], ("product", "Kite", 0))
+
+        data = {
+            "name": "Box Kite",
+            "price": 14.99,
+            "quantity": 60,
+            "description": "It flies high",
+            "category_id": 1,
+            "location": "Pittsburgh",
+        }
+        self.client.put("/products/1", data, format="json")
+        self.assertEqual(self.complete("bo"), [("product", "Box Kite", 0)])
+        self.assertEqual(self.complete("kite"), [("product", "Box Kite", 0), ("product", "Red Kite", 0)])
+
+        self.client.delete("/products/3")
+        self.assertEqual(self.complete("ke"), [])
+
+        self.client.post("/stores", {"name": "Kite Emporium", "description": "Kites"}, format="json")
+        self.assertIn(("store", "Kite Emporium", 0), self.complete("kite e"))
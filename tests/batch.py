@@ -0,0 +1,133 @@
+import json
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class BatchTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create an account with a product, store and favorite seller
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        json_response = json.loads(response.content)
+        self.token = json_response["token"]
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        response = self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {"name": "Kite", "price": 14.99, "quantity": 60, "description": "It flies high",
+                "category_id": 1, "location": "Pittsburgh"}
+        response = self.client.post("/products", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {"name": "Steve's Kites", "description": "Kites and more kites"}
+        response = self.client.post("/stores", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post("/profile/favoritesellers", {"store_id": 1}, format='json')
+        self.assertLess(response.status_code, 400)
+
+    def batch(self, requests):
+        response = self.client.post("/batch", requests, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_product_page(self):
+        """
+        Ensure a batch returns what each request returns on its own
+        """
+        paths = ["/products/1", "/profile/cart", "/stores/1", "/profile/favoritesellers"]
+        results = self.batch([{"path": path} for path in paths])
+
+        self.assertEqual(len(results), len(paths))
+        for path, result in zip(paths, results):
+            response = self.client.get(path)
+            self.assertEqual(result["status"], response.status_code, path)
+            self.assertEqual(result["body"], json.loads(response.content) if response.content else None, path)
+
+    def test_token_read_once(self):
+        """
+        Ensure the token and customer are looked up once for the whole batch
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.batch([{"path": "/profile/cart"}, {"path": "/stores/1"}, {"path": "/profile"}])
+
+        token_lookups = [q for q in queries.captured_queries if '"authtoken_token"' in q["sql"]]
+        customer_lookups = [
+            q for q in queries.captured_queries
+            if q["sql"].startswith('SELECT "bangazonapi_customer"."id"') and '"auth_user"' in q["sql"]
+        ]
+        self.assertEqual(len(token_lookups), 1)
+        self.assertEqual(len(customer_lookups), 1)
+
+    def test_writes_and_query_strings(self):
+        """
+        Ensure sub-requests carry their method, body and query string
+        """
+        results = self.batch([
+            {"method": "POST", "path": "/profile/cart", "body": {"product_id": 1}},
+            {"path": "/profile/cart"},
+            {"path": "/products?name=kite"},
+        ])
+
+        self.assertEqual(results[0]["status"], status.HTTP_200_OK)
+        self.assertEqual(len(results[1]["body"]["lineitems"]), 1)
+        self.assertEqual([product["name"] for product in results[2]["body"]], ["Kite"])
+
+    def test_per_item_status(self):
+        """
+        Ensure failed items report their own status without failing the batch
+        """
+        results = self.batch([
+            {"path": "/products/999"},
+            {"path": "/nowhere"},
+            {"path": "/batch", "method": "POST", "body": []},
+            {"method": "GET"},
+            {"path": "/products/1"},
+        ])
+
+        self.assertEqual(
+            [result["status"] for result in results],
+            [status.HTTP_404_NOT_FOUND, status.HTTP_404_NOT_FOUND, status.HTTP_400_BAD_REQUEST,
+             status.HTTP_400_BAD_REQUEST, status.HTTP_200_OK],
+        )
+
+    def test_anonymous_batch(self):
+        """
+        Ensure a batch without a token runs its requests anonymously
+        """
+        self.client.credentials()
+        results = self.batch([
+            {"path": "/products/1"},
+            {"method": "POST", "path": "/stores", "body": {"name": "Nope", "description": "Nope"}},
+        ])
+
+        self.assertEqual(results[0]["status"], status.HTTP_200_OK)
+        self.assertFalse(results[0]["body"]["is_liked"])
+        self.assertEqual(results[1]["status"], status.HTTP_401_UNAUTHORIZED)
+
+    def test_rejected_batches(self):
+        """
+        Ensure bad tokens, bad bodies and oversized batches are rejected
+        """
+        response = self.client.post("/batch", {"path": "/products/1"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(BATCH_MAX_REQUESTS=2):
+            response = self.client.post("/batch", [{"path": "/products/1"}] * 3, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get("/batch")
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token nope')
+        response = self.client.post("/batch", [{"path": "/products/1"}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
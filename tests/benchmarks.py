@@ -0,0 +1,54 @@
+from io import StringIO
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from bangazonapi import benchmarks
+
+
+class BenchmarkTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Generate a tiny dataset to benchmark against
+        """
+        call_command("generate_dataset", customers=10, categories=2, products=20, orders=20,
+                     line_items=40, likes=20, ratings=10, favorites=5, stdout=StringIO())
+
+    def test_discovers_router_endpoints(self):
+        """
+        Ensure list, detail and GET action routes are all benchmarked
+        """
+        routes = {endpoint.route for endpoint in benchmarks.endpoints(benchmarks.benchmark_customer())}
+        self.assertIn("Products.list", routes)
+        self.assertIn("Products.retrieve", routes)
+        self.assertIn("Profile.cart", routes)
+        self.assertNotIn("Products.like", routes)
+
+    def test_query_budget(self):
+        """
+        Ensure an endpoint running more queries than its budget fails
+        """
+        results = benchmarks.run(iterations=2, routes={"Products.retrieve"})
+        self.assertEqual(results[0].status, 200)
+        self.assertGreater(results[0].queries, 0)
+
+        baseline = benchmarks.as_baseline(results)
+        self.assertEqual(benchmarks.compare(results, baseline), [])
+
+        baseline["Products.retrieve"]["queries"] -= 1
+        failures = benchmarks.compare(results, baseline)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("budget", failures[0])
+
+    def test_latency_is_opt_in(self):
+        """
+        Ensure a slower median only fails when latencies are compared
+        """
+        results = benchmarks.run(iterations=2, routes={"Products.retrieve"})
+        baseline = benchmarks.as_baseline(results)
+        latencies = benchmarks.as_latencies(results)
+        self.assertNotIn("p50_ms", baseline["Products.retrieve"])
+
+        results[0].p50_ms = latencies["Products.retrieve"]["p50_ms"] * 2 + 10
+        self.assertEqual(benchmarks.compare(results, baseline), [])
+        failures = benchmarks.compare(results, baseline, latencies, threshold=0.25)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("median", failures[0])
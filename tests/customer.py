@@ -0,0 +1,103 @@
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class CurrentCustomerTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create an account with a category, product, store and payment type
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        json_response = json.loads(response.content)
+        self.token = json_response["token"]
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        response = self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {"name": "Kite", "price": 14.99, "quantity": 60, "description": "It flies high",
+                "category_id": 1, "location": "Pittsburgh"}
+        response = self.client.post("/products", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {"name": "Steve's Kites", "description": "Kites and more kites"}
+        response = self.client.post("/stores", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {"merchant_name": "Amex", "account_number": "000000000000", "expiration_date": "2023-12-12"}
+        response = self.client.post("/paymenttypes", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post("/profile/cart", {"product_id": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def assertSingleCustomerLookup(self, method, url, data=None):
+        """
+        Issue a request and ensure the customer was fetched at most once
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+
+        self.assertLess(response.status_code, 500, url)
+        lookups = [
+            query["sql"] for query in queries.captured_queries
+            if 'FROM "bangazonapi_customer"' in query["sql"]
+            and '"bangazonapi_customer"."user_id" =' in query["sql"]
+        ]
+        self.assertLessEqual(len(lookups), 1, f"{method.upper()} {url}")
+
+    def test_each_endpoint_looks_up_customer_once(self):
+        """
+        Ensure views and serializers share the request's customer
+        """
+        self.assertSingleCustomerLookup("get", "/profile")
+        self.assertSingleCustomerLookup("get", "/profile/cart")
+        self.assertSingleCustomerLookup("get", "/profile/favoritesellers")
+        self.assertSingleCustomerLookup("post", "/profile/favoritesellers", {"store_id": 1})
+        self.assertSingleCustomerLookup("get", "/products")
+        self.assertSingleCustomerLookup("get", "/products/1")
+        self.assertSingleCustomerLookup("post", "/products/1/like")
+        self.assertSingleCustomerLookup("get", "/products/liked")
+        self.assertSingleCustomerLookup("post", "/products/1/rate_product", {"rating": 4, "review": "great"})
+        self.assertSingleCustomerLookup("get", "/stores")
+        self.assertSingleCustomerLookup("get", "/stores/1")
+        self.assertSingleCustomerLookup("get", "/paymenttypes")
+        self.assertSingleCustomerLookup("get", "/lineitems/1")
+        self.assertSingleCustomerLookup("put", "/orders/1", {"payment_type": 1})
+        self.assertSingleCustomerLookup("get", "/orders")
+        self.assertSingleCustomerLookup("get", "/orders/1")
+        self.assertSingleCustomerLookup("put", "/customers/1", {
+            "last_name": "Brownlee", "email": "steve@stevebrownlee.com",
+            "address": "100 Infinity Way", "phone_number": "555-1212"})
+
+    def test_favorite_store_twice(self):
+        """
+        Ensure favoriting a store twice is refused and leaves a single favorite
+        """
+        response = self.client.post("/profile/favoritesellers", {"store_id": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post("/profile/favoritesellers", {"store_id": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(json.loads(response.content)["message"], "This store has already been liked by user.")
+
+        response = self.client.get("/profile/favoritesellers", format='json')
+        self.assertEqual(len(json.loads(response.content)), 1)
+
+    def test_anonymous_product_detail(self):
+        """
+        Ensure anonymous requests do not need a customer
+        """
+        self.client.credentials()
+        response = self.client.get("/products/1")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(json_response["is_liked"])
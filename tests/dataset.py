@@ -0,0 +1,44 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db.models import Count
+from rest_framework.test import APITestCase
+from bangazonapi.models import Customer, Order, OrderProduct, Product, ProductLike, ProductRating
+
+
+class GenerateDatasetTests(APITestCase):
+    options = {"customers": 20, "categories": 3, "products": 50, "orders": 40, "line_items": 120,
+               "likes": 60, "ratings": 30, "favorites": 10, "batch_size": 7, "stdout": StringIO()}
+
+    def test_generates_requested_volumes(self):
+        """
+        Ensure the requested rows are created and every order has a line item
+        """
+        call_command("generate_dataset", **self.options)
+
+        self.assertEqual(Customer.objects.count(), 20)
+        self.assertEqual(Product.objects.count(), 50)
+        self.assertEqual(Order.objects.count(), 40)
+        self.assertEqual(OrderProduct.objects.count(), 120)
+        self.assertEqual(ProductLike.objects.count(), 60)
+        self.assertEqual(ProductRating.objects.count(), 30)
+        self.assertFalse(Order.objects.annotate(items=Count("lineitems")).filter(items=0).exists())
+
+        # A customer has at most one open cart
+        carts = Order.objects.filter(payment_type=None).values("customer").annotate(carts=Count("id"))
+        self.assertFalse(carts.filter(carts__gt=1).exists())
+
+    def test_same_seed_same_data(self):
+        """
+        Ensure two runs with the same seed generate the same rows
+        """
+        def snapshot(first_product):
+            return list(
+                Product.objects.filter(id__gte=first_product)
+                .order_by("id")
+                .values_list("name", "price", "quantity", "location")
+            )
+
+        call_command("generate_dataset", seed=7, **self.options)
+        first = snapshot(1)
+        call_command("generate_dataset", seed=7, **self.options)
+        self.assertEqual(snapshot(51), first)
@@ -0,0 +1,72 @@
+import threading
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITransactionTestCase
+from bangazonapi import benchmarks, fanout
+from bangazonapi.models import Favorite, Product, Store
+
+
+class FanoutTests(APITransactionTestCase):
+    """Worker threads only see committed rows, so these tests commit"""
+
+    def setUp(self) -> None:
+        """
+        Generate a dataset where the busiest customer has favorites and a store
+        """
+        call_command("generate_dataset", customers=10, categories=2, products=30, orders=20,
+                     line_items=40, likes=20, ratings=20, favorites=10, stdout=StringIO())
+        self.customer = benchmarks.benchmark_customer()
+        self.store = Store.objects.order_by("id").first()
+        Favorite.objects.get_or_create(customer=self.customer, store=self.store)
+        self.product = Product.objects.filter(customer=self.store.owner).first()
+
+        token = Token.objects.get(user_id=self.customer.user_id)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def paths(self):
+        return ["/profile", f"/stores/{self.store.id}", f"/products/{self.product.id}"]
+
+    def test_same_output(self):
+        """
+        Ensure concurrent rendering returns what the serializer does
+        """
+        for path in self.paths():
+            with override_settings(FANOUT_QUERIES=False):
+                expected = self.client.get(path)
+            with override_settings(FANOUT_QUERIES=True):
+                actual = self.client.get(path)
+            self.assertEqual(expected.status_code, status.HTTP_200_OK)
+            self.assertEqual(actual.content, expected.content)
+
+    def test_queries_run_on_workers_and_are_recorded(self):
+        """
+        Ensure fields query from worker threads through the caller's execute wrappers
+        """
+        threads = []
+
+        def record(execute, sql, params, many, context):
+            threads.append(threading.current_thread().name)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.client.get("/profile")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(any(name.startswith("fanout") for name in threads))
+        self.assertIn(threading.current_thread().name, threads)
+
+    def test_sequential_inside_transaction(self):
+        """
+        Ensure fields render in the calling thread inside a transaction
+        """
+        self.assertTrue(fanout.enabled())
+        with transaction.atomic():
+            self.assertFalse(fanout.enabled())
+            names = fanout.run(
+                lambda: threading.current_thread().name, lambda: threading.current_thread().name
+            )
+        self.assertEqual(set(names), {threading.current_thread().name})
@@ -0,0 +1,55 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from bangazonapi.benchmarks import benchmark_customer
+from bangazonapi.models import OrderProduct, Product
+
+
+class FastReadTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Generate a dataset with images and sold products that were later deleted
+        """
+        call_command("generate_dataset", customers=15, categories=3, products=60, orders=50,
+                     line_items=150, likes=20, ratings=80, favorites=5, stdout=StringIO())
+        Product.objects.filter(id__lte=10).update(image_path="products/kite.png")
+        sold = OrderProduct.objects.filter(order__payment_type__isnull=False).values("product_id")
+        for product in Product.objects.filter(id__in=sold)[:3]:
+            product.delete()
+
+        customer = benchmark_customer()
+        token = Token.objects.get(user_id=customer.user_id)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def assertSameBytes(self, url):
+        with override_settings(FAST_READ_SERIALIZERS=False):
+            expected = self.client.get(url)
+        with override_settings(FAST_READ_SERIALIZERS=True):
+            actual = self.client.get(url)
+        self.assertEqual(expected.status_code, status.HTTP_200_OK)
+        self.assertEqual(actual.status_code, status.HTTP_200_OK)
+        self.assertEqual(actual.content, expected.content)
+
+    def test_products_list(self):
+        """
+        Ensure the fast products list renders exactly what the serializer does
+        """
+        self.assertSameBytes("/products")
+        self.assertSameBytes("/products?category=2&order_by=price&direction=desc")
+        self.assertSameBytes("/products?quantity=7")
+        self.assertSameBytes("/products?min_price=40&number_sold=2")
+
+    def test_stores_list(self):
+        """
+        Ensure the fast stores list renders exactly what the serializer does
+        """
+        self.assertSameBytes("/stores")
+
+    def test_orders_list(self):
+        """
+        Ensure the fast orders list renders exactly what the serializer does
+        """
+        self.assertSameBytes("/orders")
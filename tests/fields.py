@@ -0,0 +1,70 @@
+from io import StringIO
+from django.core.management import call_command
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from bangazonapi.fields import (
+    TemplateHyperlinkedIdentityField,
+    TemplateHyperlinkedRelatedField,
+    hyperlink,
+)
+from bangazonapi.models import Customer, Order, OrderProduct, Payment
+
+
+class TemplateHyperlinkTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Generate a few orders, payment types and line items to link to
+        """
+        call_command("generate_dataset", customers=5, categories=1, products=10, orders=10,
+                     line_items=20, likes=0, ratings=0, favorites=0, stdout=StringIO())
+
+    def request(self, path="/orders"):
+        return Request(APIRequestFactory().get(path, HTTP_HOST="testserver:8000"))
+
+    def assertSameLinks(self, view_name, queryset, related=False):
+        stock_class = serializers.HyperlinkedRelatedField if related else serializers.HyperlinkedIdentityField
+        cached_class = TemplateHyperlinkedRelatedField if related else TemplateHyperlinkedIdentityField
+        options = {"queryset": queryset} if related else {}
+
+        for request in (self.request(), self.request("/orders?format=json"), None):
+            stock = stock_class(view_name=view_name, **options)
+            cached = cached_class(view_name=view_name, **options)
+            for obj in queryset:
+                self.assertEqual(
+                    cached.get_url(obj, view_name, request, None),
+                    stock.get_url(obj, view_name, request, None),
+                )
+
+    def test_identity_links_match_reverse(self):
+        """
+        Ensure url fields render the same URLs as DRF's reverse()
+        """
+        self.assertSameLinks("order-detail", Order.objects.all())
+        self.assertSameLinks("orderproduct-detail", OrderProduct.objects.all())
+
+    def test_related_links_match_reverse(self):
+        """
+        Ensure related fields render the same URLs as DRF's reverse()
+        """
+        self.assertSameLinks("payment-detail", Payment.objects.all(), related=True)
+        self.assertSameLinks("customer-detail", Customer.objects.all(), related=True)
+
+    def test_unsaved_object_has_no_link(self):
+        """
+        Ensure an object without a primary key has no URL
+        """
+        field = TemplateHyperlinkedIdentityField(view_name="order-detail")
+        self.assertIsNone(field.get_url(Order(), "order-detail", self.request(), None))
+
+    def test_template_cached_on_request(self):
+        """
+        Ensure each route is made absolute once per request
+        """
+        request = self.request()
+        first = hyperlink("order-detail", "pk", 1, request)
+        second = hyperlink("order-detail", "pk", 2, request)
+
+        self.assertEqual(first, "http://testserver:8000/orders/1")
+        self.assertEqual(second, "http://testserver:8000/orders/2")
+        self.assertIn(("order-detail", "pk"), request._hyperlink_templates)
@@ -0,0 +1,108 @@
+import json
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi.indexadvisor import IndexAdvisor, index_conditions, migration_source, model_for_table
+from bangazonapi.models import Customer, Order, OrderProduct, Payment, Product, ProductRating
+
+
+class IndexAdvisorTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create a customer with a few products
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        for quantity in range(3):
+            data = {"name": "Kite", "price": 14.99, "quantity": quantity, "description": "It flies high",
+                    "category_id": 1, "location": "Pittsburgh"}
+            response = self.client.post("/products", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_suggests_index_for_full_scan(self):
+        """
+        Ensure a filter on an unindexed column yields a ranked candidate
+        """
+        advisor = IndexAdvisor()
+        with advisor.capture():
+            for _ in range(4):
+                list(Product.objects.filter(quantity=2))
+
+        candidates = advisor.candidates()
+        self.assertEqual(len(candidates), 1)
+        self.assertEqual(candidates[0].fields, ["deleted", "quantity"])
+        self.assertEqual(candidates[0].executions, 4)
+        self.assertEqual(candidates[0].benefit, 12)
+        self.assertIn("migrations.AddIndex(", migration_source(candidates, ("bangazonapi", "0001_initial")))
+
+    def test_reports_scans_per_endpoint(self):
+        """
+        Ensure statements are grouped under the route that issued them
+        """
+        advisor = IndexAdvisor()
+        with advisor.capture():
+            response = self.client.get("/products?name=ite")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        routes = dict(advisor.endpoints())
+        self.assertIn("Products.list", routes)
+        self.assertGreater(routes["Products.list"]["executions"], 0)
+        self.assertIn("name", advisor.unindexable["bangazonapi_product"])
+
+    def test_subquery_aliases_resolve_per_select(self):
+        """
+        Ensure every suggested column belongs to its table when subqueries share an alias
+        """
+        # Two ratings per product make the product_id index a weak one
+        data = {"username": "sue", "password": "Admin8*", "email": "sue@example.com",
+                "address": "1 Main St", "phone_number": "555-1313", "first_name": "Sue", "last_name": "Smith"}
+        self.client.post("/register", data, format='json')
+        customer = Customer.objects.get(user__username="steve")
+        raters = list(Customer.objects.all())
+        payment = Payment.objects.create(
+            customer=customer, merchant_name="Amex", account_number="000000000000",
+            expiration_date="2023-12-12",
+        )
+        for product in Product.objects.all():
+            for rater in raters:
+                ProductRating.objects.create(customer=rater, product=product, rating=4)
+            order = Order.objects.create(customer=customer, payment_type=payment, created_date="2024-01-01")
+            OrderProduct.objects.create(order=order, product=product)
+
+        advisor = IndexAdvisor()
+        with advisor.capture():
+            for query in ("", "?min_price=1&number_sold=0", "?order_by=price"):
+                response = self.client.get(f"/products{query}")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for statement in advisor.statements.values():
+            for table, _, used, _, _ in statement.scans:
+                columns = {f.column for f in model_for_table(table)._meta.concrete_fields}
+                self.assertLessEqual(set(used), columns | {"rowid"})
+        for candidate in advisor.candidates():
+            columns = {f.column for f in candidate.model._meta.concrete_fields}
+            self.assertLessEqual(set(candidate.columns), columns)
+
+    def test_partial_index_covers_live_rows(self):
+        """
+        Ensure no candidate duplicates a partial index on live rows
+        """
+        customer = Customer.objects.get(user__username="steve")
+        advisor = IndexAdvisor()
+        with advisor.capture():
+            for _ in range(4):
+                list(Product.objects.filter(customer=customer))
+
+        conditions = index_conditions(connection, "bangazonapi_product")
+        self.assertEqual(conditions["product_live_customer"], {"deleted"})
+        for candidate in advisor.candidates():
+            self.assertNotEqual(
+                (candidate.table, set(candidate.columns)),
+                ("bangazonapi_product", {"customer_id", "deleted"}),
+            )
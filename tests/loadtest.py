@@ -0,0 +1,51 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from bangazonapi.loadtest import Sample, VirtualUsers, endpoint_name, summarize
+from bangazonapi.models import Order, Product
+from bangazonapi.workload import WorkloadRequest
+
+
+class LoadTestTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Generate a tiny dataset for virtual users to draw from
+        """
+        call_command("generate_dataset", customers=5, categories=2, products=10, orders=10,
+                     line_items=20, likes=5, ratings=5, favorites=2, stdout=StringIO())
+
+    def test_plans_use_real_tokens_and_ids(self):
+        """
+        Ensure replayed requests carry dataset tokens and ids the user owns
+        """
+        workload = [
+            WorkloadRequest("order", "GET", "/orders/1", headers={"Authorization": "Token stale"}),
+            WorkloadRequest("cart", "POST", "/profile/cart", headers={"Authorization": "Token stale"},
+                            body=b'{"product_id": 88}', content_type="application/json"),
+        ]
+        users = VirtualUsers(3, "Bangazon8*", seed=1)
+        plans = users.plans(workload)
+        self.assertEqual(len(plans), 3)
+
+        for (customer_id, _, token), (order, cart) in zip(users.users, plans):
+            self.assertEqual(order.headers["Authorization"], f"Token {token}")
+            order_id = int(order.path.rsplit("/", 1)[1])
+            if Order.objects.filter(customer_id=customer_id).exists():
+                self.assertEqual(Order.objects.get(pk=order_id).customer_id, customer_id)
+            self.assertTrue(Product.objects.filter(pk=json.loads(cart.body)["product_id"]).exists())
+
+    def test_summary_per_endpoint(self):
+        """
+        Ensure samples are grouped by endpoint with error rates
+        """
+        request = WorkloadRequest("product", "GET", "/products/7", query="order_by=price&direction=asc")
+        self.assertEqual(endpoint_name(request), "GET /products/{id}?direction&order_by")
+
+        samples = [Sample("GET /products", 200, 0.01), Sample("GET /products", 500, 0.03),
+                   Sample("GET /profile", 0, 1.0, "TimeoutError")]
+        summary = summarize(samples, elapsed=2)
+        self.assertEqual(summary["GET /products"]["requests"], 2)
+        self.assertEqual(summary["GET /products"]["error_rate"], 0.5)
+        self.assertEqual(summary["GET /profile"]["statuses"], {"TimeoutError": 1})
+        self.assertEqual(summary["total"]["rps"], 1.5)
@@ -0,0 +1,87 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi.models import Location, Product
+
+
+class LocationTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create an account and products listed under differently written locations
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        for location in ("nashville,  tn", "Nashville, TN", "Nashville", "Pittsburgh"):
+            data = {"name": "Kite", "price": 14.99, "quantity": 60, "description": "It flies high",
+                    "category_id": 1, "location": location}
+            response = self.client.post("/products", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def product_ids(self, query):
+        response = self.client.get(f"/products?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(product["id"] for product in json.loads(response.content))
+
+    def test_locations_are_deduplicated(self):
+        """
+        Ensure location text is parsed into shared locations with product counts
+        """
+        self.client.delete("/products/4")
+
+        response = self.client.get("/locations")
+        json_response = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(location["name"], location["product_count"]) for location in json_response],
+            [("Nashville, TN", 2), ("Nashville", 1), ("Pittsburgh", 0)],
+        )
+        self.assertEqual(json_response[0]["region"], "TN")
+
+        response = self.client.get("/locations?listed=true&city=NASHVILLE")
+        self.assertEqual(len(json.loads(response.content)), 2)
+        response = self.client.get(f"/locations/{json_response[0]['id']}")
+        self.assertEqual(json.loads(response.content), json_response[0])
+        response = self.client.get("/locations/99")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_products_by_location(self):
+        """
+        Ensure location filters match parsed cities and regions by equality
+        """
+        self.assertEqual(self.product_ids("location=NASHVILLE"), [1, 2, 3])
+        self.assertEqual(self.product_ids("location=nashville, tn"), [1, 2])
+        self.assertEqual(self.product_ids("location=burgh"), [])
+        pittsburgh = Location.objects.get(city="Pittsburgh")
+        self.assertEqual(self.product_ids(f"location_id={pittsburgh.id}"), [4])
+
+        for url in ("/products?location_id=abc", "/products/facets?location_id=abc"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+
+    def test_normalize_locations_command(self):
+        """
+        Ensure the command backfills products saved without a location
+        """
+        Product.objects.update(normalized_location=None)
+        Location.objects.all().delete()
+
+        output = StringIO()
+        call_command("normalize_locations", dry_run=True, stdout=output)
+        self.assertIn("Would map 4 location strings onto 3 locations, 3 of them new", output.getvalue())
+        self.assertFalse(Location.objects.exists())
+
+        call_command("normalize_locations", rewrite=True, stdout=StringIO())
+        self.assertEqual(Location.objects.count(), 3)
+        self.assertEqual(
+            list(Product.objects.order_by("id").values_list("location", "normalized_location__region")),
+            [("Nashville, TN", "TN"), ("Nashville, TN", "TN"), ("Nashville", ""), ("Pittsburgh", "")],
+        )
+        self.assertEqual(self.product_ids("location=Nashville, TN"), [1, 2])
@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi import metrics
+
+
+class MetricsTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Point the metrics store at an empty directory
+        """
+        self.metrics_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(METRICS_DIR=self.metrics_dir)
+        self.settings_override.enable()
+        metrics._process_metrics = None
+
+    def tearDown(self) -> None:
+        self.settings_override.disable()
+        metrics._process_metrics = None
+        shutil.rmtree(self.metrics_dir)
+
+    def test_request_histograms(self):
+        """
+        Ensure requests show up as latency and query histograms per action
+        """
+        self.client.get("/products")
+        self.client.get("/products")
+        self.client.get("/products/1000")
+
+        response = self.client.get("/metrics")
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn('bangazon_requests_total{view="Products",action="list"} 2', body)
+        self.assertIn(
+            'bangazon_request_duration_seconds_bucket{view="Products",action="list",le="+Inf"} 2',
+            body,
+        )
+        self.assertIn('bangazon_request_duration_seconds_count{view="Products",action="list"} 2', body)
+        self.assertIn('bangazon_request_queries_bucket{view="Products",action="list",le="1.0"}', body)
+        self.assertIn(
+            'bangazon_request_errors_total{view="Products",action="retrieve",status="404"} 1',
+            body,
+        )
+        self.assertIn('bangazon_db_queries_total{alias="default"}', body)
+
+    def test_merges_worker_processes(self):
+        """
+        Ensure counters written by other workers are summed into one scrape
+        """
+        metrics.record_cache("products", True)
+        metrics.record_cache("products", False)
+
+        other_worker = {
+            "pid": os.getpid(),
+            "counters": {
+                metrics.CACHE_REQUESTS.name: {
+                    json.dumps([["cache", "products"], ["result", "hit"]]): 2,
+                },
+            },
+            "histograms": {},
+        }
+        with open(os.path.join(self.metrics_dir, "metrics-1-other.json"), "w") as output:
+            json.dump(other_worker, output)
+
+        body = metrics.render()
+
+        self.assertIn('bangazon_cache_requests_total{cache="products",result="hit"} 3', body)
+        self.assertIn('bangazon_cache_requests_total{cache="products",result="miss"} 1', body)
+        self.assertIn('bangazon_cache_hit_ratio{cache="products"} 0.75', body)
+        self.assertIn("bangazon_worker_processes 2", body)
+
+    def test_retires_dead_worker_files(self):
+        """
+        Ensure a dead worker's file is folded away without losing its counts
+        """
+        worker = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                                capture_output=True, text=True, check=True)
+        dead_worker = {
+            "pid": int(worker.stdout),
+            "counters": {
+                metrics.CACHE_REQUESTS.name: {
+                    json.dumps([["cache", "products"], ["result", "hit"]]): 2,
+                },
+            },
+            "histograms": {},
+        }
+        dead_file = os.path.join(self.metrics_dir, "metrics-1-dead.json")
+        with open(dead_file, "w") as output:
+            json.dump(dead_worker, output)
+
+        for _ in range(2):
+            body = metrics.render()
+            self.assertIn('bangazon_cache_requests_total{cache="products",result="hit"} 2', body)
+            self.assertIn("bangazon_worker_processes 1", body)
+
+        self.assertFalse(os.path.exists(dead_file))
+        self.assertTrue(os.path.exists(os.path.join(self.metrics_dir, metrics.RETIRED_FILE)))
@@ -65,9 +65,28 @@ class PaymentTests(APITestCase):
 
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(json_response), 0)
+        self.assertEqual(json_response["count"], 0)
+        self.assertEqual(len(json_response["results"]), 0)
         # self.assertEqual(json_response["merchant_name"], 0)
         # self.assertEqual(json_response["account_number"], 0)
         # self.assertEqual(json_response["expiration_date"], 0)
         # self.assertEqual(json_response["create_date"], 0)
 
+    def test_list_payment_types_paginated(self):
+        """
+        Ensure payment types are listed a page at a time, newest last
+        """
+        for _ in range(3):
+            self.test_create_payment_type()
+
+        response = self.client.get("/paymenttypes?limit=2", None, format='json')
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_response["count"], 3)
+        self.assertEqual([payment["id"] for payment in json_response["results"]], [1, 2])
+        self.assertIsNotNone(json_response["next"])
+
+        response = self.client.get(json_response["next"], None, format='json')
+        json_response = json.loads(response.content)
+        self.assertEqual([payment["id"] for payment in json_response["results"]], [3])
@@ -1,7 +1,14 @@
 import json
 import datetime
+import warnings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
+from bangazonapi.models import ProductRating
+from bangazonapi.views.product import FILTER_ERROR
 import pdb
 
 
@@ -149,6 +156,8 @@ class ProductTests(APITestCase):
         json_response = json.loads(response.content)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(json_response["message"], "Rating updated successfully")
+        ratings = ProductRating.objects.filter(product_id=1)
+        self.assertEqual(list(ratings.values_list("rating", "review")), [(4, "great")])
 
         url = "/products/1"
 
@@ -158,3 +167,168 @@ class ProductTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("average_rating", json_response)
         self.assertEqual(json_response["average_rating"], 4.0)
+
+    def test_rerate_product_without_warnings(self):
+        """
+        Ensure re-rating a product raises no naive datetime warnings
+        """
+        self.test_create_product()
+
+        url = "/products/1/rate_product"
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            response = self.client.post(url, {"rating": 3, "review": "good"}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = self.client.post(url, {"rating": 5, "review": "great"}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_like_product_twice(self):
+        """
+        Ensure liking a product twice leaves a single like
+        """
+        self.test_create_product()
+
+        url = "/products/1/like"
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token)
+
+        response = self.client.post(url, None, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, None, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get("/products/liked", None, format="json")
+        json_response = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json_response), 1)
+
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_get_products_by_id(self):
+        """
+        Ensure products come back in request order with missing ids marked
+        """
+        self.test_create_product()
+        self.test_create_product()
+        self.test_create_product()
+        self.client.delete("/products/2")
+
+        for fast in (True, False):
+            with override_settings(FAST_READ_SERIALIZERS=fast):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get("/products?ids=3,2,99,1,3")
+                json_response = json.loads(response.content)
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual([product["id"] for product in json_response], [3, 2, 99, 1, 3])
+                self.assertEqual(json_response[1], {"id": 2, "missing": True})
+                self.assertEqual(json_response[2], {"id": 99, "missing": True})
+                self.assertEqual(json_response[0]["name"], "Kite")
+                if fast:
+                    product_queries = [
+                        query for query in queries.captured_queries
+                        if 'FROM "bangazonapi_product"' in query["sql"]
+                    ]
+                    self.assertEqual(len(product_queries), 1)
+
+    def test_multiget_products(self):
+        """
+        Ensure the POST form matches the query string form and validates ids
+        """
+        self.test_create_product()
+        self.test_create_product()
+
+        response = self.client.post("/products/multiget", {"ids": [2, 5, 1]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, self.client.get("/products?ids=2,5,1").content)
+
+        response = self.client.post("/products/multiget", {"ids": ["kite"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post("/products/multiget", {"ids": "1,2"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(PRODUCT_MULTIGET_LIMIT=2):
+            response = self.client.get("/products?ids=1,2,3")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_product_facets(self):
+        """
+        Ensure facets count the filtered products by category, price, location and rating
+        """
+        cache.clear()
+        for price, location in ((5, "Pittsburgh"), (14.99, "Pittsburgh"), (1200, "Nashville")):
+            data = {
+                "name": "Kite",
+                "price": price,
+                "quantity": 60,
+                "description": "It flies high",
+                "category_id": 1,
+                "location": location,
+            }
+            self.client.post("/products", data, format="json")
+        self.client.post("/products/2/rate_product", {"rating": 4, "review": "great"}, format="json")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/products/facets")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_response["count"], 3)
+        self.assertEqual(
+            json_response["categories"], [{"id": 1, "name": "Sporting Goods", "count": 3}]
+        )
+        prices = {band["min"]: band["count"] for band in json_response["price"]}
+        self.assertEqual((prices[0], prices[10], prices[1000]), (1, 1, 1))
+        self.assertIsNone(json_response["price"][-1]["max"])
+        self.assertEqual(
+            json_response["locations"],
+            [{"id": 1, "location": "Pittsburgh", "count": 2}, {"id": 2, "location": "Nashville", "count": 1}],
+        )
+        ratings = {bucket["stars"]: bucket["count"] for bucket in json_response["ratings"]}
+        self.assertEqual((ratings[4], ratings[None]), (1, 2))
+        product_queries = [
+            query for query in queries.captured_queries
+            if 'FROM "bangazonapi_product"' in query["sql"]
+        ]
+        self.assertEqual(len(product_queries), 3)
+
+        response = self.client.get("/products/facets?location=pittsburgh&min_price=10")
+        json_response = json.loads(response.content)
+        self.assertEqual(json_response["count"], 1)
+        self.assertEqual(json_response["locations"], [{"id": 1, "location": "Pittsburgh", "count": 1}])
+
+        for url in ("/products/facets?min_price=cheap", "/products?min_price=cheap", "/products?number_sold=x"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+            self.assertEqual(json.loads(response.content)["message"], FILTER_ERROR)
+
+        # Zero stars is a rating too, so the buckets still add up to the count
+        self.client.post("/products/3/rate_product", {"rating": 0, "review": "awful"}, format="json")
+        json_response = json.loads(self.client.get("/products/facets?min_price=0").content)
+        ratings = {bucket["stars"]: bucket["count"] for bucket in json_response["ratings"]}
+        self.assertEqual((ratings[0], ratings[4], ratings[None]), (1, 1, 1))
+        self.assertEqual(sum(ratings.values()), json_response["count"])
+
+    def test_filters_apply_before_quantity(self):
+        """
+        Ensure min_price and number_sold filter in the database, before the quantity limit
+        """
+        self.test_create_product()
+        self.client.post("/products", {
+            "name": "Bike",
+            "price": 120,
+            "quantity": 2,
+            "description": "Two wheels",
+            "category_id": 1,
+            "location": "Nashville",
+        }, format="json")
+
+        for fast in (True, False):
+            with override_settings(FAST_READ_SERIALIZERS=fast):
+                response = self.client.get("/products?min_price=100&quantity=5")
+                json_response = json.loads(response.content)
+                self.assertEqual([product["name"] for product in json_response], ["Bike"])
+
+                response = self.client.get("/products?number_sold=1")
+                self.assertEqual(json.loads(response.content), [])
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class ProfilingTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Register a customer and make them staff
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        User.objects.filter(username="steve").update(is_staff=True)
+
+        cache.clear()
+        self.reports = tempfile.TemporaryDirectory()
+        self.addCleanup(self.reports.cleanup)
+
+    def test_cpu_and_memory_reports(self):
+        """
+        Ensure staff get a profiler report in place of the response
+        """
+        with override_settings(PROFILING_DIR=self.reports.name):
+            response = self.client.get("/profile?__profile=cpu")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["X-Profiled-Status"], "200")
+            self.assertIn("function calls", response.content.decode())
+            self.assertIn("Profile.list", response["X-Profile-Report"])
+
+            response = self.client.get("/profile?__profile=mem")
+            self.assertIn("Peak traced memory", response.content.decode())
+
+        stored = sorted(os.listdir(self.reports.name))
+        self.assertEqual(len(stored), 3)
+        self.assertTrue(stored[0].endswith("-cpu.prof"))
+
+    def test_ignored_for_customers(self):
+        """
+        Ensure the parameter does nothing for non-staff users
+        """
+        User.objects.filter(username="steve").update(is_staff=False)
+        response = self.client.get("/profile?__profile=cpu")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["user"]["first_name"], "Steve")
+
+    def test_rate_limit(self):
+        """
+        Ensure staff are limited to PROFILING_RATE_LIMIT reports a minute
+        """
+        with override_settings(PROFILING_DIR=self.reports.name, PROFILING_RATE_LIMIT=1):
+            response = self.client.get("/products?__profile=cpu")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.get("/products?__profile=cpu")
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
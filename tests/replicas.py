@@ -0,0 +1,109 @@
+import json
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, APITestCase
+from bangazonapi import dbrouters
+from bangazonapi.middleware import ReplicaRoutingMiddleware
+from bangazonapi.models import Product
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRouterTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create a new account
+        """
+        self.router = dbrouters.ReplicaRouter()
+        self.factory = APIRequestFactory()
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.user = User.objects.get(username="steve")
+
+    def route_read(self, method, user=None, **headers):
+        """
+        Return the alias chosen for a Product read during a request
+        """
+        request = getattr(self.factory, method)("/products", headers=headers)
+        if user is not None:
+            request.user = user
+        token = dbrouters.begin_request(request)
+        try:
+            return self.router.db_for_read(Product)
+        finally:
+            dbrouters.end_request(token)
+
+    def test_safe_methods_read_from_replica(self):
+        """
+        Ensure GET requests read from a replica and writes use the primary
+        """
+        self.assertEqual(self.route_read("get", self.user), "replica1")
+        self.assertEqual(self.route_read("post", self.user), "default")
+        self.assertEqual(self.router.db_for_write(Product), "default")
+        self.assertEqual(self.router.db_for_read(Product), "default")
+
+    def test_authentication_reads_primary(self):
+        """
+        Ensure token and user lookups never go to a replica
+        """
+        request = self.factory.get("/products")
+        token = dbrouters.begin_request(request)
+        try:
+            self.assertEqual(self.router.db_for_read(User), "default")
+        finally:
+            dbrouters.end_request(token)
+
+    def test_read_your_writes(self):
+        """
+        Ensure a customer reads from the primary right after writing, on any worker
+        """
+        def view(request):
+            request.user = self.user
+            return HttpResponse(status=status.HTTP_201_CREATED)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        response = middleware(self.factory.post("/products"))
+        pin = response[dbrouters.PIN_HEADER]
+        self.assertEqual(response.cookies[dbrouters.PIN_COOKIE].value, pin)
+
+        # Nothing is remembered server side, the next request carries the pin
+        self.assertEqual(self.route_read("get", self.user), "replica1")
+        self.assertEqual(self.route_read("get", self.user, cookie=f"{dbrouters.PIN_COOKIE}={pin}"), "default")
+        self.assertEqual(self.route_read("get", self.user, x_bangazon_primary=pin), "default")
+        other = User(pk=self.user.pk + 1)
+        self.assertEqual(self.route_read("get", other, x_bangazon_primary=pin), "replica1")
+        self.assertEqual(self.route_read("get", self.user, x_bangazon_primary=pin + "x"), "replica1")
+
+        with override_settings(REPLICA_STICKY_SECONDS=-1):
+            self.assertEqual(self.route_read("get", self.user, x_bangazon_primary=pin), "replica1")
+
+    def test_register_is_sticky(self):
+        """
+        Ensure a newly registered customer reads their own profile from the primary
+        """
+        url = "/register"
+        data = {"username": "joe", "password": "Admin8*", "email": "joe@joeshepherd.com",
+                "address": "100 Endless Way", "phone_number": "555-1212", "first_name": "Joe", "last_name": "Shepherd"}
+        response = self.client.post(url, data, format='json')
+        new_user = User.objects.get(pk=json.loads(response.content)["id"])
+
+        pin = response[dbrouters.PIN_HEADER]
+        self.assertEqual(self.route_read("get", new_user, x_bangazon_primary=pin), "default")
+
+    def test_batch_write_returns_pin(self):
+        """
+        Ensure a write inside a batch pins the caller for the requests that follow
+        """
+        token = Token.objects.get(user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        batch = [{"method": "POST", "path": "/productcategories", "body": {"name": "Kites"}}]
+        response = self.client.post("/batch", batch, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        pin = response[dbrouters.PIN_HEADER]
+        self.assertEqual(self.route_read("get", self.user, x_bangazon_primary=pin), "default")
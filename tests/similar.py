@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi import similarity
+
+
+class SimilarProductsTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create two categories of products and an empty index directory
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        overridden = override_settings(SIMILAR_PRODUCTS_DIR=self.directory,
+                                       SIMILAR_PRODUCTS_REBUILD_FRACTION=0.5)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        self.client.post("/productcategories", {"name": "Camping"}, format='json')
+        for name, description, category in (
+            ("Kite", "It flies high", 1),
+            ("Box Kite", "A kite that flies very high", 1),
+            ("Tent", "Sleeps four campers", 2),
+            ("Camping Tent", "Sleeps two campers", 2),
+        ):
+            self.create_product(name, description, category)
+
+    def create_product(self, name, description, category):
+        data = {"name": name, "price": 14.99, "quantity": 60, "description": description,
+                "category_id": category, "location": "Pittsburgh"}
+        response = self.client.post("/products", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return json.loads(response.content)["id"]
+
+    def build(self, **options):
+        output = StringIO()
+        call_command("build_similar_products", stdout=output, **options)
+        return output.getvalue()
+
+    def similar(self, product_id):
+        response = self.client.get(f"/products/{product_id}/similar")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [neighbor["product"]["name"] for neighbor in json.loads(response.content)]
+
+    def test_similar_products_by_text_and_category(self):
+        """
+        Ensure neighbors are ranked by shared words and category
+        """
+        response = self.client.get("/products/1/similar")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        self.assertIn("embedded 4 products and reused 0", self.build())
+        self.assertEqual(self.similar(1)[0], "Box Kite")
+        self.assertEqual(self.similar(4)[0], "Tent")
+        self.assertNotIn("Kite", self.similar(1))
+
+        response = self.client.get("/products/1/similar?limit=1")
+        json_response = json.loads(response.content)
+        self.assertEqual(len(json_response), 1)
+        self.assertGreater(json_response[0]["score"], 0)
+        self.assertLessEqual(json_response[0]["score"], 1.0001)
+        response = self.client.get("/products/99/similar")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_index_updates_incrementally(self):
+        """
+        Ensure builds only embed changed products and readers pick up new versions
+        """
+        self.build()
+        kite = self.create_product("Stunt Kite", "Flies high with two lines", 1)
+        # Not indexed yet, so it is embedded on request but never a result
+        self.assertEqual(self.similar(kite)[0], "Kite")
+        self.assertNotIn("Stunt Kite", self.similar(1))
+
+        self.assertIn("embedded 1 products and reused 4", self.build())
+        self.assertIn("Stunt Kite", self.similar(1))
+        self.client.delete(f"/products/{kite}")
+        self.assertNotIn("Stunt Kite", self.similar(1))
+
+        self.assertIn("embedded 0 products and reused 4", self.build())
+
+        # A third change passes the rebuild fraction, so every row is rebuilt
+        self.create_product("Kite Line", "For kites", 1)
+        self.assertIn("embedded 5 products and reused 0", self.build())
+        self.assertIn("embedded 5 products and reused 0", self.build(full=True))
+        versions = sorted(name for name in os.listdir(self.directory) if name.startswith("vectors-"))
+        self.assertEqual(versions, ["vectors-4.f32", "vectors-5.f32"])
+
+    def test_build_after_empty_catalog(self):
+        """
+        Ensure an index built before any products exist can be updated incrementally
+        """
+        directory = os.path.join(self.directory, "empty")
+        self.assertEqual(similarity.build([], directory)["documents"], 0)
+        meta = similarity.build([(1, "Kite", "A red kite", 1)], directory)
+        self.assertEqual((meta["embedded"], meta["reused"]), (1, 0))
+        meta = similarity.build([(1, "Kite", "A red kite", 1), (2, "Tent", "Sleeps two", 2)], directory)
+        self.assertEqual((meta["embedded"], meta["reused"]), (1, 1))
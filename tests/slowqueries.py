@@ -0,0 +1,106 @@
+import json
+import logging
+import shutil
+import tempfile
+from logging.handlers import RotatingFileHandler
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class SlowQueryLogTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Log every query to a scratch file and create a customer and a staff user
+        """
+        self.log_dir = tempfile.mkdtemp()
+        log_path = f"{self.log_dir}/slow.log"
+        self.logger = logging.getLogger("bangazonapi.slowqueries")
+        self.original_handlers = self.logger.handlers
+        handler = RotatingFileHandler(log_path, maxBytes=1024 * 1024, backupCount=1)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.handlers = [handler]
+        self.settings_override = override_settings(
+            SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG=log_path, SLOW_QUERY_LOG_BACKUPS=1
+        )
+        self.settings_override.enable()
+
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        staff = User.objects.create_user(username="admin", password="Admin8*", is_staff=True)
+        self.staff_token = Token.objects.create(user=staff).key
+
+    def tearDown(self) -> None:
+        for handler in self.logger.handlers:
+            handler.close()
+        self.logger.handlers = self.original_handlers
+        self.settings_override.disable()
+        shutil.rmtree(self.log_dir)
+
+    def test_logs_query_plan_and_caller(self):
+        """
+        Ensure slow queries are logged with their plan, route and calling frame
+        """
+        response = self.client.get("/products?location=Pittsburgh")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.staff_token)
+        response = self.client.get("/slowqueries?route=Products.list")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(len(json_response), 1)
+        entry = json_response[0]
+        self.assertIn("bangazonapi_product", entry["sql"])
+        self.assertIn("Pittsburgh", entry["params"])
+        self.assertTrue(any("bangazonapi_product" in step for step in entry["plan"]))
+        self.assertTrue(entry["caller"].startswith("bangazonapi/fastread.py"))
+
+    def test_staff_only(self):
+        """
+        Ensure customers cannot read the slow query log
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        response = self.client.get("/slowqueries")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rejects_malformed_filters(self):
+        """
+        Ensure a non-numeric limit or min_ms is a bad request
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.staff_token)
+        response = self.client.get("/slowqueries?limit=abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content)["message"], "limit must be a whole number.")
+
+        response = self.client.get("/slowqueries?min_ms=x")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content)["message"], "min_ms must be a number.")
+
+    def test_redacts_token_lookups(self):
+        """
+        Ensure API tokens bound to slow statements are not written to the log
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+        response = self.client.get("/products")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.staff_token)
+        response = self.client.get("/slowqueries?limit=1000")
+        entries = json.loads(response.content)
+
+        token_lookups = [entry for entry in entries if '"authtoken_token"' in entry["sql"]]
+        self.assertGreaterEqual(len(token_lookups), 1)
+        for entry in token_lookups:
+            self.assertEqual(set(entry["params"]), {"[redacted]"})
+        with open(self.settings_override.options["SLOW_QUERY_LOG"], encoding="utf-8") as log:
+            text = log.read()
+        self.assertNotIn(self.token, text)
+        self.assertNotIn(self.staff_token, text)
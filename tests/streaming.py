@@ -0,0 +1,90 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from bangazonapi import streaming
+from bangazonapi.benchmarks import benchmark_customer
+from bangazonapi.models import Product
+
+
+class StreamingListTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Generate enough rows that lists span several chunks
+        """
+        call_command("generate_dataset", customers=15, categories=3, products=60, orders=50,
+                     line_items=150, likes=20, ratings=80, favorites=5, stdout=StringIO())
+        Product.objects.filter(id__lte=10).update(image_path="products/kite.png")
+
+        customer = benchmark_customer()
+        token = Token.objects.get(user_id=customer.user_id)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def assertStreamsSameBytes(self, url):
+        separator = "&" if "?" in url else "?"
+        for fast in (False, True):
+            with override_settings(FAST_READ_SERIALIZERS=fast, STREAMING_CHUNK_SIZE=7):
+                expected = self.client.get(url)
+                streamed = self.client.get(f"{url}{separator}stream=true")
+                self.assertEqual(expected.status_code, status.HTTP_200_OK)
+                self.assertEqual(streamed.status_code, status.HTTP_200_OK)
+                self.assertTrue(streamed.streaming)
+                self.assertEqual(streamed["Content-Type"], "application/json")
+                self.assertEqual(b"".join(streamed.streaming_content), expected.content)
+
+    def test_users_list(self):
+        """
+        Ensure streaming returns every user, as one page holding them all would
+        """
+        with override_settings(STREAMING_CHUNK_SIZE=7):
+            streamed = self.client.get("/users?stream=true")
+        expected = self.client.get("/users?limit=1000")
+
+        self.assertTrue(streamed.streaming)
+        users = json.loads(b"".join(streamed.streaming_content))
+        self.assertEqual(len(users), 15)
+        self.assertEqual(users, json.loads(expected.content)["results"])
+
+    def test_products_list(self):
+        """
+        Ensure the streamed products list matches the rendered one, with filters
+        """
+        self.assertStreamsSameBytes("/products")
+        self.assertStreamsSameBytes("/products?min_price=30&number_sold=1")
+        self.assertStreamsSameBytes("/products?quantity=5")
+
+    def test_orders_list(self):
+        """
+        Ensure the streamed order history matches the rendered one
+        """
+        self.assertStreamsSameBytes("/orders")
+
+    def test_empty_list(self):
+        """
+        Ensure an empty list streams as an empty array
+        """
+        response = self.client.get("/products?name=nothing-by-this-name&stream=true")
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
+
+    def test_rows_written_in_pieces(self):
+        """
+        Ensure large arrays are written in several pieces
+        """
+        rows = ({"id": index, "name": "x" * 100} for index in range(2000))
+        with mock.patch.object(streaming, "BUFFER_SIZE", 4096):
+            pieces = list(streaming.json_array(rows, streaming.encoder("json")))
+
+        self.assertGreater(len(pieces), 10)
+        self.assertEqual(len(json.loads(b"".join(pieces))), 2000)
+
+    def test_unknown_encoder(self):
+        """
+        Ensure a misconfigured encoder fails before the response starts
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            streaming.encoder("yaml")
@@ -0,0 +1,52 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class RequestTimingTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create a new account and a product to list
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        json_response = json.loads(response.content)
+        self.token = json_response["token"]
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        data = {"name": "Kite", "price": 14.99, "quantity": 60, "description": "It flies high",
+                "category_id": 1, "location": "Pittsburgh"}
+        response = self.client.post("/products", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_server_timing_header(self):
+        """
+        Ensure responses carry app, db and serialize timings
+        """
+        response = self.client.get("/products")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        server_timing = response["Server-Timing"]
+        self.assertIn("app;dur=", server_timing)
+        self.assertIn("db;dur=", server_timing)
+        self.assertIn("serialize;dur=", server_timing)
+
+    def test_structured_log_line(self):
+        """
+        Ensure each request logs one JSON line tagged by ViewSet and action
+        """
+        with self.assertLogs("bangazonapi.timing", level="INFO") as logs:
+            response = self.client.get("/profile/cart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(logs.records), 1)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["route"], "Profile.cart")
+        self.assertEqual(record["method"], "GET")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["bytes"], len(response.content))
+        self.assertGreater(record["queries"], 0)
@@ -0,0 +1,120 @@
+import datetime
+import json
+import math
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from bangazonapi import trending
+from bangazonapi.models import OrderProduct, ProductLike, ProductTrend
+
+
+class TrendingTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create a customer, two categories, three products and a payment type
+        """
+        url = "/register"
+        data = {"username": "steve", "password": "Admin8*", "email": "steve@stevebrownlee.com",
+                "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": "Steve", "last_name": "Brownlee"}
+        response = self.client.post(url, data, format='json')
+        self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+        self.client.post("/productcategories", {"name": "Sporting Goods"}, format='json')
+        self.client.post("/productcategories", {"name": "Kitchen"}, format='json')
+        for name, category in (("Kite", 1), ("Tent", 1), ("Mug", 2)):
+            data = {"name": name, "price": 14.99, "quantity": 60, "description": "It flies high",
+                    "category_id": category, "location": "Pittsburgh"}
+            response = self.client.post("/products", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = {"merchant_name": "Amex", "account_number": "000000000000", "expiration_date": "2023-12-12"}
+        self.client.post("/paymenttypes", data, format='json')
+
+    def trending(self, query=""):
+        response = self.client.get(f"/products/trending{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row["product"]["id"], row["score"]) for row in json.loads(response.content)]
+
+    def test_interactions_update_trending(self):
+        """
+        Ensure likes, ratings and paid sales raise a product's score as they happen
+        """
+        self.assertEqual(self.trending(), [])
+
+        self.client.post("/products/1/like")
+        self.client.post("/products/2/rate_product", {"rating": 4, "review": "great"}, format='json')
+        # A second rating replaces the first rather than adding to the score
+        self.client.post("/products/2/rate_product", {"rating": 5, "review": "best"}, format='json')
+        found = self.trending()
+        self.assertEqual([product for product, _ in found], [2, 1])
+        self.assertAlmostEqual(found[0][1], 2.0, places=3)
+        self.assertAlmostEqual(found[1][1], 1.0, places=3)
+
+        # Items in a cart only count once the order is paid for
+        self.client.post("/profile/cart", {"product_id": 3}, format='json')
+        self.assertNotIn(3, dict(self.trending()))
+        response = self.client.put("/orders/1", {"payment_type": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        found = self.trending()
+        self.assertEqual(found[0][0], 3)
+        self.assertAlmostEqual(found[0][1], 3.0, places=3)
+        # Saving a paid order again does not count its sales twice
+        self.client.put("/orders/1", {"payment_type": 1}, format='json')
+        self.assertAlmostEqual(dict(self.trending())[3], 3.0, places=3)
+
+        self.assertEqual([product for product, _ in self.trending("?category=1")], [2, 1])
+        self.assertEqual(len(self.trending("?limit=1")), 1)
+        response = self.client.get("/products/trending?category=kites")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.delete("/products/1/like")
+        self.assertAlmostEqual(dict(self.trending())[1], 0.0, places=6)
+        self.client.delete("/products/2")
+        self.assertNotIn(2, dict(self.trending()))
+
+    def test_scores_decay(self):
+        """
+        Ensure older interactions count for less, halving every half-life
+        """
+        now = timezone.now()
+        log_score = trending.log_term(trending.LIKE, now - datetime.timedelta(hours=72))
+        self.assertAlmostEqual(trending.score(log_score, now), 0.5)
+
+        # A fresh like outranks an older sale
+        ProductLike.objects.insert_ignore(
+            customer_id=1, product_id=1, created_at=now - datetime.timedelta(days=10)
+        )
+        self.client.post("/profile/cart", {"product_id": 1}, format='json')
+        OrderProduct.objects.update(created_at=now - datetime.timedelta(days=10))
+        self.client.put("/orders/1", {"payment_type": 1}, format='json')
+        self.client.post("/products/2/like")
+        self.assertEqual([product for product, _ in self.trending()], [2, 1])
+
+    def test_refresh_rebuilds_scores(self):
+        """
+        Ensure refresh_trending recomputes the scores signals keep current
+        """
+        self.client.post("/products/1/like")
+        self.client.post("/products/3/like")
+        self.client.post("/products/3/rate_product", {"rating": 4, "review": "great"}, format='json')
+        self.client.post("/profile/cart", {"product_id": 3}, format='json')
+        self.client.put("/orders/1", {"payment_type": 1}, format='json')
+        kept = dict(ProductTrend.objects.values_list("product_id", "log_score"))
+
+        ProductTrend.objects.all().delete()
+        out = StringIO()
+        call_command("refresh_trending", stdout=out)
+        self.assertIn("Scored 2 products from 4 events", out.getvalue())
+        rebuilt = dict(ProductTrend.objects.values_list("product_id", "log_score"))
+        self.assertEqual(rebuilt.keys(), kept.keys())
+        for product, log_score in kept.items():
+            self.assertAlmostEqual(rebuilt[product], log_score)
+
+        # A new half-life takes effect once the scores are rebuilt
+        with override_settings(TRENDING_HALF_LIFE_HOURS=24):
+            call_command("refresh_trending", stdout=StringIO())
+            score = dict(self.trending())[3]
+        self.assertTrue(math.isclose(score, 6.0, rel_tol=1e-3))
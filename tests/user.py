@@ -0,0 +1,46 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class UserTests(APITestCase):
+    def setUp(self) -> None:
+        """
+        Create three accounts
+        """
+        for username in ("steve", "joe", "jisie"):
+            data = {"username": username, "password": "Admin8*", "email": f"{username}@example.com",
+                    "address": "100 Infinity Way", "phone_number": "555-1212", "first_name": username.title(),
+                    "last_name": "Brownlee"}
+            response = self.client.post("/register", data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.token = json.loads(response.content)["token"]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token)
+
+    def test_list_users_paginated(self):
+        """
+        Ensure users are listed a page at a time
+        """
+        response = self.client.get("/users?limit=2", None, format='json')
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_response["count"], 3)
+        self.assertEqual([user["username"] for user in json_response["results"]], ["steve", "joe"])
+
+        response = self.client.get("/users?limit=2&offset=2", None, format='json')
+        json_response = json.loads(response.content)
+        self.assertEqual([user["username"] for user in json_response["results"]], ["jisie"])
+        self.assertIsNone(json_response["next"])
+
+    def test_password_hashes_not_exposed(self):
+        """
+        Ensure neither the list nor a single user includes the password
+        """
+        response = self.client.get("/users", None, format='json')
+        for user in json.loads(response.content)["results"]:
+            self.assertNotIn("password", user)
+
+        response = self.client.get("/users/1", None, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("password", json.loads(response.content))